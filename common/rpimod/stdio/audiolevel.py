@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : audiolevel.py
+# Description : Silence bounds and loudness analysis of decoded clips, and their application
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import numpy
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+
+################################################################
+# Configuration
+################################################################
+
+# Clips are analysed as signed 16-bit little-endian PCM, in windows of the given duration
+AUDIO_PCM_DTYPE = numpy.dtype('<i2')
+AUDIO_PCM_FULL_SCALE = 32768.0
+AUDIO_WINDOW_SEC = 0.01
+
+# A window is silent if its level is below the absolute floor, or the given level below the loudest window
+AUDIO_SILENCE_FLOOR_DB = -60.0
+AUDIO_SILENCE_RELATIVE_DB = -35.0
+
+# Silence kept around speech, so that soft onsets and decays are not clipped
+AUDIO_SILENCE_PAD_SEC = 0.05
+
+# Speech is normalised to the given RMS level, within the given gain range and without exceeding the peak limit
+AUDIO_TARGET_RMS_DB = -20.0
+AUDIO_MIN_GAIN_DB = -12.0
+AUDIO_MAX_GAIN_DB = 12.0
+AUDIO_PEAK_LIMIT_DB = -1.0
+
+# Gains closer to unity than the given tolerance are not applied
+AUDIO_GAIN_TOLERANCE = 0.01
+
+
+def db_to_ratio(levelDB):
+    return 10.0 ** (levelDB / 20.0)
+
+
+def read_samples(pcmData, channels):
+    # Returns PCM data as an array of mono samples scaled to [-1.0, 1.0)
+
+    samples = numpy.frombuffer(pcmData, dtype=AUDIO_PCM_DTYPE).astype(numpy.float32) / AUDIO_PCM_FULL_SCALE
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def analyse_pcm(pcmData, sampleRate, channels):
+    # Returns the clip levels of decoded PCM data, i.e. the bounds of speech in seconds and the gain to apply to it
+
+    samples = read_samples(pcmData, channels)
+    duration = len(samples) / sampleRate
+    clipLevels = {'speech_start': 0.0, 'speech_end': round(duration, 3), 'gain': 1.0}
+
+    windowSize = max(1, int(sampleRate * AUDIO_WINDOW_SEC))
+    windowCount = len(samples) // windowSize
+    if windowCount == 0:
+        return clipLevels
+
+    windowLevels = numpy.sqrt(numpy.mean(numpy.square(samples[:windowCount * windowSize].reshape(windowCount, windowSize)), axis=1))
+    silenceLevel = max(db_to_ratio(AUDIO_SILENCE_FLOOR_DB), windowLevels.max() * db_to_ratio(AUDIO_SILENCE_RELATIVE_DB))
+
+    speechWindows = numpy.flatnonzero(windowLevels >= silenceLevel)
+    if len(speechWindows) == 0:
+        coutput.print_debug("No speech found")
+        return clipLevels
+
+    speechSamples = samples[speechWindows[0] * windowSize:(speechWindows[-1] + 1) * windowSize]
+    speechLevel = float(numpy.sqrt(numpy.mean(numpy.square(speechSamples))))
+    peakLevel = float(numpy.abs(speechSamples).max())
+
+    gain = db_to_ratio(AUDIO_TARGET_RMS_DB) / speechLevel
+    gain = min(gain, db_to_ratio(AUDIO_PEAK_LIMIT_DB) / peakLevel)
+    gain = min(max(gain, db_to_ratio(AUDIO_MIN_GAIN_DB)), db_to_ratio(AUDIO_MAX_GAIN_DB))
+
+    clipLevels['speech_start'] = round(max(0.0, speechWindows[0] * windowSize / sampleRate - AUDIO_SILENCE_PAD_SEC), 3)
+    clipLevels['speech_end'] = round(min(duration, (speechWindows[-1] + 1) * windowSize / sampleRate + AUDIO_SILENCE_PAD_SEC), 3)
+    clipLevels['gain'] = round(gain, 3)
+
+    coutput.print_watcher('clipLevels')
+    return clipLevels
+
+
+def apply_levels(pcmData, clipLevels, sampleRate, channels):
+    # Returns decoded PCM data trimmed to its speech bounds, with its gain applied
+
+    frameSize = channels * AUDIO_PCM_DTYPE.itemsize
+    startOffset = int(clipLevels['speech_start'] * sampleRate) * frameSize
+    endOffset = int(clipLevels['speech_end'] * sampleRate) * frameSize
+    pcmData = pcmData[startOffset:endOffset]
+
+    if abs(clipLevels['gain'] - 1.0) > AUDIO_GAIN_TOLERANCE:
+        samples = numpy.frombuffer(pcmData, dtype=AUDIO_PCM_DTYPE).astype(numpy.float32) * clipLevels['gain']
+        pcmData = numpy.clip(samples, -AUDIO_PCM_FULL_SCALE, AUDIO_PCM_FULL_SCALE - 1).astype(AUDIO_PCM_DTYPE).tobytes()
+
+    return bytes(pcmData)
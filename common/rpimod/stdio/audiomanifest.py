@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : audiomanifest.py
+# Description : Persistent index of audio clip state and properties
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import glob
+import json
+import fnmatch
+import wave
+import hashlib
+import threading
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+# Files are hashed in blocks of the given size
+AUDIO_HASH_BLOCK_SIZE = 64 * 1024
+
+
+def hash_file(fileName):
+    fileHash = hashlib.sha1()
+    with open(fileName, 'rb') as hashFile:
+        for fileBlock in iter(lambda: hashFile.read(AUDIO_HASH_BLOCK_SIZE), b''):
+            fileHash.update(fileBlock)
+    return fileHash.hexdigest()
+
+
+def get_file_state(fileName, fileStat=None):
+    if fileStat is None:
+        fileStat = os.stat(fileName)
+    return {'size': fileStat.st_size, 'mtime_ns': fileStat.st_mtime_ns}
+
+
+def read_audio_info(fileName):
+    # Returns the duration, sample rate, channels, sample size and codec of a clip
+    # WAV headers are read in process, while other formats are probed through pydub, imported only when needed
+
+    if fileName.lower().endswith('.wav'):
+        try:
+            with wave.open(fileName, 'rb') as wavFile:
+                bitsPerSample = 8 * wavFile.getsampwidth()
+                return {
+                    'duration': round(wavFile.getnframes() / wavFile.getframerate(), 3),
+                    'sample_rate': wavFile.getframerate(),
+                    'channels': wavFile.getnchannels(),
+                    'bits_per_sample': bitsPerSample,
+                    'codec': 'pcm_u8' if bitsPerSample == 8 else "pcm_s{0}le".format(bitsPerSample)
+                }
+        except (wave.Error, EOFError) as e:
+            coutput.print_debug("Unable to read WAV header from {0} :: {1}".format(fileName, e))
+
+    from pydub.utils import mediainfo
+    fileInfo = mediainfo(fileName)
+
+    return {
+        'duration': round(float(fileInfo.get('duration', 0)), 3),
+        'sample_rate': int(fileInfo.get('sample_rate', 0)),
+        'channels': int(fileInfo.get('channels', 0)),
+        'bits_per_sample': int(fileInfo.get('bits_per_sample', 0)),
+        'codec': fileInfo.get('codec_name', '')
+    }
+
+
+def validate_clip(fileName):
+    # Returns the format and playable duration of a clip, and whether it is complete
+    # Truncated WAV files hold fewer frames than their header declares
+
+    clipFormat = os.path.splitext(fileName)[1].lower().lstrip('.')
+    clipProperties = {'format': clipFormat, 'duration': 0.0, 'validated': False}
+
+    try:
+        if clipFormat == 'wav':
+            with wave.open(fileName, 'rb') as wavFile:
+                frameCount = wavFile.getnframes()
+                frameSize = wavFile.getsampwidth() * wavFile.getnchannels()
+                readFrameCount = len(wavFile.readframes(frameCount)) // frameSize
+                clipProperties['duration'] = round(readFrameCount / wavFile.getframerate(), 3)
+                clipProperties['validated'] = frameCount > 0 and readFrameCount == frameCount
+        else:
+            clipProperties['duration'] = read_audio_info(fileName)['duration']
+            clipProperties['validated'] = clipProperties['duration'] > 0
+
+    except (wave.Error, EOFError, OSError, ValueError, KeyError) as e:
+        coutput.print_debug("Unable to validate {0} :: {1}".format(fileName, e))
+
+    return clipProperties
+
+
+def read_clip_properties(fileName, fileStat=None):
+    # Returns the file state, hash, format, duration and validity of a clip
+
+    clipProperties = get_file_state(fileName, fileStat)
+    clipProperties['sha1'] = hash_file(fileName)
+    clipProperties.update(validate_clip(fileName))
+    return clipProperties
+
+
+class AudioManifest(object):
+    """
+    Index of audio clips persisted as JSON, holding one entry per clip path with its file state (size, mtime,
+    sha1) and audio properties (e.g. format, sample rate, channels). Entries are refreshed incrementally:
+    a clip whose size and mtime match its entry is not read again.
+    """
+    def __init__(self, manifestFile):
+        self.manifestFile = manifestFile
+        self.lock = threading.Lock()
+        self.entries = {}
+
+        try:
+            with open(self.manifestFile, 'r') as manifestFileHandle:
+                self.entries = json.load(manifestFileHandle)
+        except (IOError, OSError, ValueError) as e:
+            coutput.print_debug("Unable to load audio manifest from {0} :: {1}".format(self.manifestFile, e))
+
+
+    def get_entry_key(self, fileName):
+        return os.path.normpath(fileName)
+
+
+    def get_entry(self, fileName):
+        with self.lock:
+            return self.entries.get(self.get_entry_key(fileName))
+
+
+    def is_current(self, fileName, fileStat=None):
+        # Returns True if the clip has an entry and is unchanged since
+
+        clipEntry = self.get_entry(fileName)
+        if clipEntry is None:
+            return False
+
+        try:
+            fileState = get_file_state(fileName, fileStat)
+        except OSError:
+            return False
+
+        return clipEntry.get('size') == fileState['size'] and clipEntry.get('mtime_ns') == fileState['mtime_ns']
+
+
+    def get_clip_levels(self, fileName):
+        # Returns the speech bounds and gain of a clip (see audiolevel.analyse_pcm), None if not analysed since changed
+
+        if not self.is_current(fileName):
+            return None
+
+        clipEntry = self.get_entry(fileName)
+        if 'gain' not in clipEntry:
+            return None
+
+        return {'speech_start': clipEntry['speech_start'], 'speech_end': clipEntry['speech_end'], 'gain': clipEntry['gain']}
+
+
+    def lookup_audio_info(self, fileName):
+        # Returns the file state, hash and audio info of a clip, reading them only if the clip changed since last read
+
+        fileStat = os.stat(fileName)
+        if self.is_current(fileName, fileStat):
+            clipEntry = self.get_entry(fileName)
+            if 'codec' in clipEntry:
+                return dict(clipEntry)
+
+        clipProperties = get_file_state(fileName, fileStat)
+        clipProperties['sha1'] = hash_file(fileName)
+        clipProperties.update(read_audio_info(fileName))
+
+        self.set_entry(fileName, clipProperties)
+        self.save()
+        return dict(self.get_entry(fileName))
+
+
+    def is_valid_clip(self, fileName):
+        # Returns True if the clip was recorded as complete when last refreshed or registered
+        # The file is not accessed once validated, so lookups cost no I/O; clips not yet validated, e.g. while
+        # validation runs in the background, are validated on demand
+
+        clipEntry = self.get_entry(fileName)
+        if clipEntry is not None and 'validated' in clipEntry:
+            return clipEntry['validated']
+
+        if not os.path.isfile(fileName):
+            return False
+
+        try:
+            self.refresh_clip(fileName)
+        except OSError:
+            return False
+
+        return self.get_entry(fileName).get('validated', False)
+
+
+    def refresh_clip(self, fileName, fileStat=None):
+        # Validates a clip and records it, keeping the properties recorded for the same content, e.g. its levels
+
+        clipProperties = read_clip_properties(fileName, fileStat)
+        entryKey = self.get_entry_key(fileName)
+
+        with self.lock:
+            clipEntry = self.entries.get(entryKey)
+            if clipEntry is not None and clipEntry.get('sha1') == clipProperties['sha1']:
+                clipEntry.update(clipProperties)
+            else:
+                self.entries[entryKey] = clipProperties
+
+
+    def register_clip(self, fileName):
+        # Records a clip, e.g. once downloaded, and returns True if it is valid
+
+        try:
+            self.refresh_clip(fileName)
+        except OSError:
+            self.remove_entry(fileName)
+
+        self.save()
+        return self.is_valid_clip(fileName)
+
+
+    def refresh_clips(self, clipDir, clipPattern):
+        # Drops the entries of clips in a directory no longer present, and marks clips new or changed since
+        # last recorded as not validated, reading no more than their file state
+        # Returns the list of clips to be validated, e.g. in the background by validate_clips
+
+        clipFileNames = set(self.get_entry_key(fileName) for fileName in glob.glob(os.path.join(clipDir, clipPattern)))
+        pendingFileNames = []
+        refreshCount = 0
+
+        for fileName in clipFileNames:
+            fileStat = os.stat(fileName)
+            if not self.is_current(fileName, fileStat):
+                with self.lock:
+                    self.entries.setdefault(fileName, {}).pop('validated', None)
+                refreshCount += 1
+
+            if 'validated' not in self.get_entry(fileName):
+                pendingFileNames.append(fileName)
+
+        # Entries of clips matching other patterns, e.g. MP3 clips recorded by spellit_resample_audio.py, are kept
+        clipDirKey = self.get_entry_key(clipDir)
+        with self.lock:
+            for entryKey in list(self.entries):
+                if (os.path.dirname(entryKey) == clipDirKey and fnmatch.fnmatch(os.path.basename(entryKey), clipPattern)
+                        and entryKey not in clipFileNames):
+                    del self.entries[entryKey]
+                    refreshCount += 1
+
+        coutput.print_debug("Refreshed {0} audio manifest entries in {1}".format(refreshCount, clipDir))
+        if refreshCount > 0:
+            self.save()
+
+        return sorted(pendingFileNames)
+
+
+    def validate_clips(self, fileNames):
+        # Validates the given clips, e.g. those returned by refresh_clips
+        # Returns the list of invalid clips
+
+        for fileName in fileNames:
+            try:
+                self.refresh_clip(fileName)
+            except OSError as e:
+                coutput.print_debug("Unable to validate {0} :: {1}".format(fileName, e))
+                self.remove_entry(fileName)
+
+        if len(fileNames) > 0:
+            self.save()
+
+        return [fileName for fileName in fileNames if self.get_entry(fileName) is not None and not self.get_entry(fileName).get('validated', False)]
+
+
+    def get_invalid_clips(self, clipDir, clipPattern):
+        # Returns the list of clips in a directory recorded as invalid
+
+        clipDirKey = self.get_entry_key(clipDir)
+        with self.lock:
+            return sorted(entryKey for [entryKey, clipEntry] in self.entries.items()
+                          if os.path.dirname(entryKey) == clipDirKey and fnmatch.fnmatch(os.path.basename(entryKey), clipPattern)
+                          and clipEntry.get('validated') is False)
+
+
+    def set_entry(self, fileName, clipProperties):
+        # Replaces the entry of a clip, dropping properties recorded before it changed
+
+        with self.lock:
+            self.entries[self.get_entry_key(fileName)] = dict(clipProperties)
+
+
+    def update_entry(self, fileName, clipProperties):
+        # Merges properties into the entry of a clip, creating it if required
+
+        with self.lock:
+            self.entries.setdefault(self.get_entry_key(fileName), {}).update(clipProperties)
+
+
+    def remove_entry(self, fileName):
+        with self.lock:
+            self.entries.pop(self.get_entry_key(fileName), None)
+
+
+    def save(self):
+        # The manifest is written while locked, as clips may be registered while others are validated in the background
+        with self.lock:
+            manifestText = json.dumps(self.entries, indent=1, sort_keys=True)
+
+            try:
+                tempManifestFile = self.manifestFile + ".tmp"
+                with open(tempManifestFile, 'w') as manifestFileHandle:
+                    manifestFileHandle.write(manifestText)
+                os.replace(tempManifestFile, self.manifestFile)
+            except (IOError, OSError) as e:
+                coutput.print_err("Unable to save audio manifest to {0} :: {1}".format(self.manifestFile, e))
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : audiopack.py
+# Description : Pack files holding the decoded clips of a word list back to back, with an offset index
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import json
+import mmap
+import struct
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+import common.rpimod.stdio.audioplayer as caudio
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+
+################################################################
+# Configuration
+################################################################
+
+# A pack starts with a header of the magic number, version and index size, followed by the index as JSON
+# and the clips in the playback format, each padded to whole chunks
+AUDIO_PACK_MAGIC = b'SBPK'
+AUDIO_PACK_VERSION = 1
+AUDIO_PACK_HEADER = struct.Struct('<4sII')
+
+
+class InvalidAudioPackException(Exception):
+    pass
+
+
+def build_pack(packFileName, wordClips, loadClip=caudio.load_clip, getClipLevels=None):
+    # Accepts a list of (word, clip file name, source) entries, where source describes the clip, e.g. offline or override
+    # Writes the decoded clips to a pack file, indexed by word with their offsets from the start of the clip data,
+    # and with the levels returned by getClipLevels(clipFileName), if given, that the clips were decoded at
+    # Returns the number of clips packed
+
+    packIndex = {}
+    clipOffset = 0
+    clipDataList = []
+
+    for [word, clipFileName, clipSource] in wordClips:
+        clipStat = os.stat(clipFileName)
+        clipData = loadClip(clipFileName)
+        packIndex[word] = {'path': clipFileName, 'source': clipSource, 'mtime_ns': clipStat.st_mtime_ns, 'size': clipStat.st_size,
+                           'offset': clipOffset, 'length': len(clipData)}
+        if getClipLevels is not None:
+            packIndex[word]['levels'] = getClipLevels(clipFileName)
+        clipDataList.append(clipData)
+        clipOffset += len(clipData)
+
+    indexData = json.dumps(packIndex, sort_keys=True).encode('utf-8')
+    tempFileName = "{0}.{1}.tmp".format(packFileName, os.getpid())
+
+    try:
+        with open(tempFileName, 'wb') as packFile:
+            packFile.write(AUDIO_PACK_HEADER.pack(AUDIO_PACK_MAGIC, AUDIO_PACK_VERSION, len(indexData)))
+            packFile.write(indexData)
+            for clipData in clipDataList:
+                packFile.write(clipData)
+        os.replace(tempFileName, packFileName)
+
+    finally:
+        if os.path.isfile(tempFileName):
+            os.remove(tempFileName)
+
+    coutput.print_debug("Packed {0} clips into {1}".format(len(packIndex), packFileName))
+    return len(packIndex)
+
+
+class AudioPack(object):
+    """
+    Read-only view of a pack file, opened and memory-mapped once.
+    Clips are looked up by word or source path in the in-memory index, and returned as memoryview
+    slices of the mapping, so that they are played without reading or copying.
+    """
+    def __init__(self, packFileName):
+        self.packFileName = packFileName
+
+        with open(packFileName, 'rb') as packFile:
+            self.packData = memoryview(mmap.mmap(packFile.fileno(), 0, access=mmap.ACCESS_READ))
+
+        if len(self.packData) < AUDIO_PACK_HEADER.size:
+            raise InvalidAudioPackException("Pack {0} is truncated".format(packFileName))
+
+        [packMagic, packVersion, indexSize] = AUDIO_PACK_HEADER.unpack_from(self.packData)
+        if packMagic != AUDIO_PACK_MAGIC or packVersion != AUDIO_PACK_VERSION:
+            raise InvalidAudioPackException("Pack {0} is not in version {1} format".format(packFileName, AUDIO_PACK_VERSION))
+
+        self.dataOffset = AUDIO_PACK_HEADER.size + indexSize
+        self.index = json.loads(bytes(self.packData[AUDIO_PACK_HEADER.size:self.dataOffset]).decode('utf-8'))
+        self.pathIndex = {os.path.normpath(clipEntry['path']): clipEntry for clipEntry in self.index.values()}
+
+
+    def get_entry(self, word):
+        # Returns the index entry of a word, i.e. its clip path, source, levels, offset and length, None if not packed
+        return self.index.get(word)
+
+
+    def get_clip(self, clipFileName):
+        # Returns the decoded PCM data of a packed clip, None if not packed
+
+        clipEntry = self.pathIndex.get(os.path.normpath(clipFileName))
+        if clipEntry is None:
+            return None
+
+        clipOffset = self.dataOffset + clipEntry['offset']
+        return self.packData[clipOffset:clipOffset + clipEntry['length']]
@@ -0,0 +1,637 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : audioplayer.py
+# Description : Persistent audio playback engine feeding decoded PCM to a long-lived output process
+# Author      : Dito Manavalan
+# Date        : 2019/03/09
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import time
+import wave
+import mmap
+import atexit
+import json
+import hashlib
+import threading
+import subprocess
+import collections
+import urllib.parse
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+
+################################################################
+# Configuration
+################################################################
+
+# Clips are decoded to a single playback format: signed 16-bit little-endian mono PCM at 22.05 kHz
+AUDIO_SAMPLE_RATE = 22050
+AUDIO_CHANNELS = 1
+AUDIO_SAMPLE_WIDTH = 2
+AUDIO_FRAME_SIZE = AUDIO_CHANNELS * AUDIO_SAMPLE_WIDTH
+AUDIO_BYTE_RATE = AUDIO_SAMPLE_RATE * AUDIO_FRAME_SIZE
+
+# PCM is written to the output process one raw packet (1024 frames) at a time, so that it never waits on
+# a partial packet at the end of a clip; decoded clips are padded with silence to a whole number of chunks
+AUDIO_CHUNK_SIZE = 1024 * AUDIO_FRAME_SIZE
+AUDIO_CHUNK_DURATION = AUDIO_CHUNK_SIZE / AUDIO_BYTE_RATE
+
+# Maximum audio queued ahead of the output device, which bounds the time taken to stop playback
+AUDIO_MAX_LEAD_SEC = 0.15
+
+# Delay to ensure that the end of the audio is not clipped before a clip is repeated or followed
+AUDIO_DRAIN_MARGIN_SEC = 0.06
+
+# Maximum time to wait for stopped playback to release the sink, beyond which it is abandoned, e.g. if stalled on the network
+AUDIO_STOP_TIMEOUT_SEC = 1.0
+
+# Decoded clips are stored as PCM files in the cache directory, and trimmed oldest first to the given ratio
+# of the size limit when it is exceeded; the most recently played clips are kept memory-mapped
+AUDIO_PCM_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "rpimod", "pcm")
+AUDIO_PCM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+AUDIO_PCM_CACHE_TRIM_RATIO = 0.9
+AUDIO_PCM_CACHE_MAPPED_CLIPS = 64
+
+# Encoded audio is read from the network and fed to the decoder in chunks of the given size
+AUDIO_STREAM_READ_SIZE = 4096
+AUDIO_STREAM_FORMATS = {'.mp3': 'mp3', '.wav': 'wav'}
+
+AUDIO_DEFAULT_DEVICE = "default"
+
+
+################################################################
+# Decoder
+################################################################
+
+def pad_pcm(pcmData):
+    remainder = len(pcmData) % AUDIO_CHUNK_SIZE
+    if remainder > 0:
+        pcmData = pcmData + bytes(AUDIO_CHUNK_SIZE - remainder)
+    return pcmData
+
+
+def read_wav_pcm(fileName):
+    # Returns the PCM data of WAV files already in the playback format, None otherwise
+
+    try:
+        with wave.open(fileName, 'rb') as wavFile:
+            wavFormat = (wavFile.getframerate(), wavFile.getnchannels(), wavFile.getsampwidth(), wavFile.getcomptype())
+            if wavFormat != (AUDIO_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_SAMPLE_WIDTH, 'NONE'):
+                return None
+            return wavFile.readframes(wavFile.getnframes())
+
+    except (wave.Error, EOFError):
+        return None
+
+
+def decode_file(fileName, clipLevels=None):
+    # Reference:
+    # https://trac.ffmpeg.org/wiki/audio%20types
+    # Clip levels, if given, trim the clip to its speech and apply its gain (see audiolevel.analyse_pcm)
+
+    pcmData = None
+    if fileName.lower().endswith('.wav'):
+        pcmData = read_wav_pcm(fileName)
+
+    if pcmData is None:
+        coutput.print_debug("Decoding {0}".format(fileName))
+        decodeCommand = ["ffmpeg", "-loglevel", "quiet", "-i", fileName,
+                         "-f", "s16le", "-ac", str(AUDIO_CHANNELS), "-ar", str(AUDIO_SAMPLE_RATE), "pipe:1"]
+        pcmData = subprocess.run(decodeCommand, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, check=True).stdout
+
+    if clipLevels is not None:
+        # Imported here, as NumPy is only needed when a levelled clip is first decoded into the cache
+        import common.rpimod.stdio.audiolevel as clevel
+        pcmData = clevel.apply_levels(pcmData, clipLevels, AUDIO_SAMPLE_RATE, AUDIO_CHANNELS)
+
+    return pad_pcm(pcmData)
+
+
+################################################################
+# Decoded Clip Cache
+################################################################
+
+class PCMClipCache(object):
+    """
+    Cache of decoded clips, stored as PCM files in the playback format and memory-mapped when loaded.
+    Clips are returned as read-only memoryviews of the mapping, so that playback hands them to the sink
+    without copying. Recently loaded clips stay mapped in an in-memory LRU, and pinned clips stay mapped
+    until unpinned. Files are keyed by source path, mtime, size and clip levels, so a changed source or
+    level is decoded again.
+    """
+    def __init__(self, cacheDir, maxBytes=AUDIO_PCM_CACHE_MAX_BYTES, mappedClipCount=AUDIO_PCM_CACHE_MAPPED_CLIPS):
+        self.cacheDir = cacheDir
+        self.maxBytes = maxBytes
+        self.mappedClipCount = mappedClipCount
+        self.mappedClips = collections.OrderedDict()
+        self.pinnedClips = {}
+        self.lock = threading.Lock()
+
+
+    def get_cache_key(self, fileName, clipLevels=None):
+        fileStat = os.stat(fileName)
+        keyText = "{0}|{1}|{2}".format(os.path.abspath(fileName), fileStat.st_mtime_ns, fileStat.st_size)
+        if clipLevels is not None:
+            keyText += "|" + json.dumps(clipLevels, sort_keys=True)
+        return hashlib.sha1(keyText.encode('utf-8')).hexdigest()
+
+
+    def get_cache_file_name(self, cacheKey):
+        return os.path.join(self.cacheDir, cacheKey + ".pcm")
+
+
+    def store(self, cacheKey, pcmData):
+        # Files are written under a temporary name and renamed, so that a partial file is never mapped
+
+        os.makedirs(self.cacheDir, exist_ok=True)
+        cacheFileName = self.get_cache_file_name(cacheKey)
+        tempFileName = "{0}.{1}.tmp".format(cacheFileName, os.getpid())
+
+        with open(tempFileName, 'wb') as cacheFile:
+            cacheFile.write(pcmData)
+        os.replace(tempFileName, cacheFileName)
+
+        self.trim()
+
+
+    def map(self, cacheKey):
+        with open(self.get_cache_file_name(cacheKey), 'rb') as cacheFile:
+            if os.fstat(cacheFile.fileno()).st_size == 0:
+                return memoryview(b'')
+            return memoryview(mmap.mmap(cacheFile.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+    def trim(self):
+        # Removes the oldest files once the cache exceeds its size limit
+        # Mapped clips remain valid, as removing a file does not unmap it
+
+        cacheFiles = [cacheFile for cacheFile in os.scandir(self.cacheDir) if cacheFile.name.endswith(".pcm")]
+        cacheBytes = sum(cacheFile.stat().st_size for cacheFile in cacheFiles)
+
+        if cacheBytes > self.maxBytes:
+            for cacheFile in sorted(cacheFiles, key=lambda cacheFile: cacheFile.stat().st_mtime):
+                if cacheBytes <= self.maxBytes * AUDIO_PCM_CACHE_TRIM_RATIO:
+                    break
+                cacheBytes -= cacheFile.stat().st_size
+                os.remove(cacheFile.path)
+
+
+    def lookup(self, fileName, clipLevels=None):
+        # Returns the cache key and decoded PCM data of a clip, decoding it only if not already cached
+
+        cacheKey = self.get_cache_key(fileName, clipLevels)
+
+        with self.lock:
+            if cacheKey in self.pinnedClips:
+                return (cacheKey, self.pinnedClips[cacheKey])
+            if cacheKey in self.mappedClips:
+                self.mappedClips.move_to_end(cacheKey)
+                return (cacheKey, self.mappedClips[cacheKey])
+
+        try:
+            pcmData = self.map(cacheKey)
+        except FileNotFoundError:
+            self.store(cacheKey, decode_file(fileName, clipLevels))
+            pcmData = self.map(cacheKey)
+
+        # Evicted clips are unmapped once playback releases them
+        with self.lock:
+            self.mappedClips[cacheKey] = pcmData
+            while len(self.mappedClips) > self.mappedClipCount:
+                self.mappedClips.popitem(last=False)
+
+        return (cacheKey, pcmData)
+
+
+    def load(self, fileName, clipLevels=None):
+        return self.lookup(fileName, clipLevels)[1]
+
+
+    def pin(self, fileName, clipLevels=None):
+        [cacheKey, pcmData] = self.lookup(fileName, clipLevels)
+
+        with self.lock:
+            self.pinnedClips[cacheKey] = pcmData
+            self.mappedClips.pop(cacheKey, None)
+
+
+    def unpin_all(self):
+        with self.lock:
+            self.pinnedClips.clear()
+
+
+AUDIO_CLIP_CACHE = PCMClipCache(AUDIO_PCM_CACHE_DIR)
+
+
+def load_clip(fileName, clipLevels=None):
+    # Returns the decoded PCM data of a clip, decoding it only once for as long as the file is unchanged
+    return AUDIO_CLIP_CACHE.load(fileName, clipLevels)
+
+
+def pin_clip(fileName, clipLevels=None):
+    # Keeps a clip permanently resident, e.g. feedback sounds played after every answer
+    AUDIO_CLIP_CACHE.pin(fileName, clipLevels)
+
+
+################################################################
+# Stream Decoder
+################################################################
+
+def get_stream_format(sourceURL):
+    # Returns the ffmpeg input format of an audio URL, None if it is to be probed
+
+    sourcePath = urllib.parse.urlparse(sourceURL).path.lower()
+    for [streamExtension, streamFormat] in AUDIO_STREAM_FORMATS.items():
+        if sourcePath.endswith(streamExtension):
+            return streamFormat
+    return None
+
+
+class StreamDecoder(object):
+    """
+    Decodes an encoded audio stream (e.g. an HTTP response body) to PCM in the playback format as it arrives.
+    Encoded chunks are fed to an ffmpeg process from a separate thread, while decoded PCM is read back
+    in whole chunks. The decoder may be read only once.
+    """
+    def __init__(self, encodedChunks, streamFormat=None):
+        self.encodedChunks = encodedChunks
+        self.streamFormat = streamFormat
+        self.process = None
+        self.feeder = None
+        self.completed = False          # Set once the whole stream has been fed to the decoder
+        self.error = None
+
+
+    def feed(self):
+        try:
+            for encodedChunk in self.encodedChunks:
+                self.process.stdin.write(encodedChunk)
+            self.completed = True
+
+        except BrokenPipeError:
+            # Decoder closed, as playback was stopped
+            pass
+
+        except Exception as e:
+            self.error = e
+
+        finally:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+
+
+    def read_chunks(self):
+        # Yields decoded PCM in whole chunks, padding the last with silence
+
+        # Probing is skipped for known formats, so that decoding starts on the first packets received
+        decodeCommand = ["ffmpeg", "-loglevel", "quiet", "-analyzeduration", "0"]
+        if self.streamFormat is not None:
+            decodeCommand += ["-f", self.streamFormat]
+        decodeCommand += ["-i", "pipe:0", "-f", "s16le", "-ac", str(AUDIO_CHANNELS), "-ar", str(AUDIO_SAMPLE_RATE), "pipe:1"]
+
+        self.process = subprocess.Popen(decodeCommand, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, bufsize=0)
+        self.feeder = threading.Thread(target=self.feed, daemon=True)
+        self.feeder.start()
+
+        try:
+            while True:
+                pcmChunk = self.read_pcm(AUDIO_CHUNK_SIZE)
+                if len(pcmChunk) == 0:
+                    break
+                yield pad_pcm(pcmChunk)
+
+        finally:
+            self.close()
+
+        if self.error is not None:
+            raise self.error
+
+
+    def read_pcm(self, size):
+        # Reads up to size bytes, returning fewer only at the end of the stream
+
+        pcmData = b''
+        while len(pcmData) < size:
+            pcmRead = self.process.stdout.read(size - len(pcmData))
+            if not pcmRead:
+                break
+            pcmData += pcmRead
+        return pcmData
+
+
+    def cancel(self):
+        # Stops decoding from another thread, so that a read waiting on a stalled stream ends
+        process = self.process
+        if process is not None and process.poll() is None:
+            process.kill()
+
+
+    def close(self):
+        if self.process is not None:
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            self.process.stdout.close()
+
+            # A feeder waiting on the network exits on its next write, hence it is not waited on beyond the lead time
+            self.feeder.join(AUDIO_MAX_LEAD_SEC)
+
+
+################################################################
+# Audio Sink
+################################################################
+
+class AudioSink(object):
+    """
+    Long-lived ffmpeg process that reads PCM in the playback format from a pipe and plays it on an ALSA device.
+    The device is opened once, and audio is written to the pipe paced by a playback clock, so that only a
+    short lead is ever queued ahead of the device.
+    """
+    def __init__(self, device):
+        self.device = device if device else AUDIO_DEFAULT_DEVICE
+        self.process = None
+        self.clockTime = 0.0            # Time at which audio written so far will have been played
+        self.lock = threading.Lock()
+
+
+    def start(self):
+        # Reference:
+        # https://www.ffmpeg.org/ffmpeg-devices.html#alsa-1
+
+        if self.process is None or self.process.poll() is not None:
+            coutput.print_debug("Starting audio sink on {0}".format(self.device))
+            sinkCommand = ["ffmpeg", "-loglevel", "quiet", "-fflags", "nobuffer", "-probesize", "32", "-analyzeduration", "0",
+                           "-f", "s16le", "-ar", str(AUDIO_SAMPLE_RATE), "-ac", str(AUDIO_CHANNELS), "-i", "pipe:0",
+                           "-f", "alsa", self.device]
+            self.process = subprocess.Popen(sinkCommand, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, bufsize=0)
+            self.clockTime = 0.0
+
+
+    def write(self, pcmData, stopEvent):
+        # Writes PCM data padded to whole chunks, keeping at most AUDIO_MAX_LEAD_SEC queued ahead of the device
+        # Returns False if stopped before all the data was written
+
+        pcmView = memoryview(pcmData)
+
+        with self.lock:
+            self.start()
+
+            for chunkOffset in range(0, len(pcmView), AUDIO_CHUNK_SIZE):
+                leadTime = self.clockTime - time.monotonic()
+                if leadTime > AUDIO_MAX_LEAD_SEC and stopEvent.wait(leadTime - AUDIO_MAX_LEAD_SEC):
+                    return False
+                if stopEvent.is_set():
+                    return False
+
+                self.process.stdin.write(pcmView[chunkOffset:chunkOffset + AUDIO_CHUNK_SIZE])
+                self.clockTime = max(self.clockTime, time.monotonic()) + AUDIO_CHUNK_DURATION
+
+        return True
+
+
+    def drain(self, stopEvent):
+        # Waits until the audio written so far has been played
+        # Returns False if stopped before then
+
+        leadTime = self.clockTime - time.monotonic()
+        if leadTime > 0:
+            return not stopEvent.wait(leadTime + AUDIO_DRAIN_MARGIN_SEC)
+        return True
+
+
+    def close(self):
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=AUDIO_MAX_LEAD_SEC + 1)
+                except (OSError, subprocess.TimeoutExpired):
+                    self.process.kill()
+                self.process = None
+
+
+################################################################
+# Audio Player
+################################################################
+
+class PlaybackHandle(object):
+    """
+    Handle to playback running in the background, which may be cancelled or waited on.
+    Cancelling also cancels the PCM source through cancelSource, if given, as the source may be blocked on a stream.
+    """
+    def __init__(self, cancelSource=None):
+        self.stopEvent = threading.Event()
+        self.doneEvent = threading.Event()
+        self.cancelSource = cancelSource
+        self.error = None
+
+
+    def cancel(self):
+        self.stopEvent.set()
+        if self.cancelSource is not None:
+            self.cancelSource()
+
+
+    def is_cancelled(self):
+        return self.stopEvent.is_set()
+
+
+    def is_done(self):
+        return self.doneEvent.is_set()
+
+
+    def wait(self, timeout=None):
+        # Returns True once playback has finished or stopped, False on timeout
+        return self.doneEvent.wait(timeout)
+
+
+class AudioPlayer(object):
+    """
+    Plays clips on an output device through a persistent AudioSink.
+    Clips are decoded once and replayed from the PCM clip cache.
+    Playback runs in a background thread, one clip at a time: starting a clip stops the one playing.
+    """
+    def __init__(self, device):
+        self.sink = AudioSink(device)
+        self.activePlayback = None
+        self.lock = threading.Lock()
+
+
+    def start(self):
+        with self.sink.lock:
+            self.sink.start()
+
+
+    def play_chunks(self, pcmChunks, stopEvent, playedChunks=None):
+        # Writes PCM chunks to the sink as they are produced, collecting them into playedChunks if given
+        # Returns False if stopped before they were played
+
+        for pcmChunk in pcmChunks:
+            if playedChunks is not None:
+                playedChunks.append(pcmChunk)
+            if not self.sink.write(pcmChunk, stopEvent):
+                return False
+
+        return self.sink.drain(stopEvent)
+
+
+    def run_playback(self, playbackHandle, readPCM, loopCount, loopDelaySec, reportError):
+        stopEvent = playbackHandle.stopEvent
+
+        try:
+            # The first loop plays PCM as it is read, and repeats replay the chunks played
+            pcmSource = readPCM()
+            playedChunks = []
+            try:
+                playCompleted = self.play_chunks(pcmSource, stopEvent, playedChunks)
+            finally:
+                if hasattr(pcmSource, 'close'):
+                    pcmSource.close()
+
+            for loopIndex in range(1, loopCount):
+                if not playCompleted or stopEvent.wait(loopDelaySec):
+                    break
+                playCompleted = self.play_chunks(playedChunks, stopEvent)
+
+        except Exception as e:
+            playbackHandle.error = e
+            coutput.print_debug("Playback failed :: {0}".format(e))
+            if reportError is not None and not stopEvent.is_set():
+                reportError(e)
+
+        finally:
+            playbackHandle.doneEvent.set()
+
+
+    def start_playback(self, readPCM, loopCount, loopDelaySec, cancelPCM=None, reportError=None):
+        # Accepts a function returning an iterable of PCM chunks, so that loading and decoding also run in the background,
+        # and optionally a function unblocking that iterable once playback is stopped
+        # Errors are recorded in the handle, and passed to reportError(error), if given, unless playback was stopped
+
+        playbackHandle = PlaybackHandle(cancelPCM)
+
+        with self.lock:
+            self.stop()
+            self.activePlayback = playbackHandle
+            threading.Thread(target=self.run_playback, args=(playbackHandle, readPCM, loopCount, loopDelaySec, reportError), daemon=True).start()
+
+        return playbackHandle
+
+
+    def wait_playback(self, playbackHandle):
+        # Waits for playback to finish, stopping it if interrupted, and raises any playback error
+
+        try:
+            playbackHandle.wait()
+        except BaseException:
+            playbackHandle.cancel()
+            raise
+
+        if playbackHandle.error is not None:
+            raise playbackHandle.error
+
+
+    def play_pcm_async(self, pcmData, loopCount=1, loopDelaySec=0):
+        return self.start_playback(lambda: [pcmData], loopCount, loopDelaySec)
+
+
+    def play_file_async(self, fileName, loopCount=1, loopDelaySec=0):
+        coutput.print_watcher("fileName")
+        return self.start_playback(lambda: [load_clip(fileName)], loopCount, loopDelaySec)
+
+
+    def play_stream_async(self, streamDecoder, loopCount=1, loopDelaySec=0, reportError=None):
+        return self.start_playback(streamDecoder.read_chunks, loopCount, loopDelaySec, streamDecoder.cancel, reportError)
+
+
+    def play_pcm(self, pcmData, loopCount=1, loopDelaySec=0):
+        self.wait_playback(self.play_pcm_async(pcmData, loopCount, loopDelaySec))
+
+
+    def play_file(self, fileName, loopCount=1, loopDelaySec=0):
+        self.wait_playback(self.play_file_async(fileName, loopCount, loopDelaySec))
+
+
+    def play_stream(self, streamDecoder, loopCount=1, loopDelaySec=0):
+        self.wait_playback(self.play_stream_async(streamDecoder, loopCount, loopDelaySec))
+
+
+    def stop(self):
+        # Stops active playback and waits for it to release the sink
+        # The wait is bounded, as a source may not notice the stop, e.g. a decoder blocked on a stalled stream
+
+        playbackHandle = self.activePlayback
+        if playbackHandle is not None:
+            playbackHandle.cancel()
+            if not playbackHandle.wait(AUDIO_STOP_TIMEOUT_SEC):
+                coutput.print_debug("Playback did not stop within {0}s".format(AUDIO_STOP_TIMEOUT_SEC))
+
+
+    def close(self):
+        self.stop()
+        self.sink.close()
+
+
+# Audio players by output device, shared for the lifetime of the process
+audioPlayers = {}
+audioPlayersLock = threading.Lock()
+
+
+def get_audio_player(device):
+    with audioPlayersLock:
+        if device not in audioPlayers:
+            audioPlayers[device] = AudioPlayer(device)
+        return audioPlayers[device]
+
+
+def stop_audio_players():
+    with audioPlayersLock:
+        for audioPlayer in audioPlayers.values():
+            audioPlayer.stop()
+
+
+@atexit.register
+def close_audio_players():
+    with audioPlayersLock:
+        for audioPlayer in audioPlayers.values():
+            audioPlayer.close()
+        audioPlayers.clear()
+
+
+########################################################################
+# Sample application to test the python module
+########################################################################
+
+'''
+cd ~/projects/py3-raspi/common/rpimod/stdio
+python3 audioplayer.py
+'''
+
+'''
+audioPlayer = get_audio_player('plughw:0,0')
+pin_clip("../../../spelling-bee/data/sb_feedback_correct.wav")
+
+startTime = time.monotonic()
+audioPlayer.play_file("../../../spelling-bee/data/sb_feedback_correct.wav")
+print("First play: {0:.3f}s".format(time.monotonic() - startTime))
+
+startTime = time.monotonic()
+audioPlayer.play_file("../../../spelling-bee/data/sb_feedback_correct.wav", 2, 0.5)
+print("Repeat play: {0:.3f}s".format(time.monotonic() - startTime))
+
+playbackHandle = audioPlayer.play_file_async("../../../spelling-bee/data/sb_feedback_correct.wav", 3, 0.5)
+time.sleep(0.5)
+playbackHandle.cancel()
+print("Stopped in time: {0}".format(playbackHandle.wait(AUDIO_MAX_LEAD_SEC)))
+'''
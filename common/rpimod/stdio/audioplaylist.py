@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : audioplaylist.py
+# Description : Pre-rendering of clip sequences into a single playlist file with a cue sheet
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import wave
+import hashlib
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+import common.rpimod.stdio.audioplayer as caudio
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+
+################################################################
+# Configuration
+################################################################
+
+# Cue sheet positions are in minutes, seconds and frames of 1/75 second
+# Reference:
+# https://wiki.hydrogenaud.io/index.php?title=Cue_sheet
+AUDIO_CUE_FRAME_RATE = 75
+
+# Gap between the clips of a track, e.g. an index number and its word
+AUDIO_TRACK_CLIP_GAP_SEC = 0.4
+
+
+def get_silence(durationSec):
+    # Returns silence in the playback format, rounded up to whole chunks so that tracks start on chunk boundaries
+    return caudio.pad_pcm(bytes(int(durationSec * caudio.AUDIO_SAMPLE_RATE) * caudio.AUDIO_FRAME_SIZE))
+
+
+def get_render_key(trackClips, gapSec, getClipLevels=None):
+    # Returns a key identifying the playlist rendered from the given clips, which changes if any clip changes,
+    # or if the levels returned by getClipLevels(clipFileName), if given, change, e.g. once a clip is analysed
+
+    renderKey = hashlib.sha1("{0}".format(gapSec).encode('utf-8'))
+    for [trackTitle, clipFileNames] in trackClips:
+        renderKey.update(trackTitle.encode('utf-8'))
+        for clipFileName in clipFileNames:
+            clipStat = os.stat(clipFileName)
+            renderKey.update("|{0}|{1}|{2}".format(os.path.abspath(clipFileName), clipStat.st_mtime_ns, clipStat.st_size).encode('utf-8'))
+            if getClipLevels is not None:
+                renderKey.update("|{0}".format(getClipLevels(clipFileName)).encode('utf-8'))
+
+    return renderKey.hexdigest()
+
+
+def format_cue_time(positionSec):
+    cueFrames = int(round(positionSec * AUDIO_CUE_FRAME_RATE))
+    return "{0:02d}:{1:02d}:{2:02d}".format(cueFrames // (60 * AUDIO_CUE_FRAME_RATE), (cueFrames // AUDIO_CUE_FRAME_RATE) % 60, cueFrames % AUDIO_CUE_FRAME_RATE)
+
+
+def parse_cue_time(cueTime):
+    [minutes, seconds, frames] = [int(cueField) for cueField in cueTime.split(":")]
+    return minutes * 60 + seconds + frames / AUDIO_CUE_FRAME_RATE
+
+
+def write_cue_sheet(cueFileName, playlistFileName, renderKey, tracks):
+
+    cueLines = ["REM RENDER_KEY {0}".format(renderKey), "FILE \"{0}\" WAVE".format(os.path.basename(playlistFileName))]
+    for trackIndex, [trackTitle, trackStart] in enumerate(tracks, start=1):
+        cueLines.append("  TRACK {0:02d} AUDIO".format(trackIndex))
+        cueLines.append("    TITLE \"{0}\"".format(trackTitle.replace('"', "'")))
+        cueLines.append("    INDEX 01 {0}".format(format_cue_time(trackStart)))
+
+    with open(cueFileName, 'w', encoding='utf-8') as cueFile:
+        cueFile.write("\n".join(cueLines) + "\n")
+
+
+def read_cue_sheet(cueFileName):
+    # Returns the render key and the list of (title, start in seconds) of the tracks in a cue sheet
+
+    renderKey = None
+    tracks = []
+    trackTitle = None
+
+    with open(cueFileName, 'r', encoding='utf-8') as cueFile:
+        for cueLine in cueFile:
+            cueFields = cueLine.strip().split(" ", 2)
+            if cueFields[0] == "REM" and len(cueFields) > 2 and cueFields[1] == "RENDER_KEY":
+                renderKey = cueFields[2]
+            elif cueFields[0] == "TITLE":
+                trackTitle = cueLine.strip()[len("TITLE "):].strip('"')
+            elif cueFields[0] == "INDEX" and len(cueFields) > 2 and cueFields[1] == "01":
+                tracks.append((trackTitle, parse_cue_time(cueFields[2])))
+
+    return [renderKey, tracks]
+
+
+def render_playlist(playlistFileName, cueFileName, trackClips, gapSec, loadClip=caudio.load_clip, getClipLevels=None):
+    # Accepts a list of (title, clip file names) tracks, whose clips are played in order
+    # Renders the tracks into a WAV file in the playback format separated by the given gap, and a cue sheet of
+    # their start positions, unless already rendered from the same clips at the same levels
+    # Returns the list of (title, start in seconds) of the tracks
+
+    renderKey = get_render_key(trackClips, gapSec, getClipLevels)
+
+    try:
+        [cueRenderKey, tracks] = read_cue_sheet(cueFileName)
+        if cueRenderKey == renderKey and os.path.isfile(playlistFileName):
+            coutput.print_debug("Playlist {0} is up to date".format(playlistFileName))
+            return tracks
+    except (IOError, OSError, ValueError) as e:
+        coutput.print_debug("Unable to read cue sheet {0} :: {1}".format(cueFileName, e))
+
+    coutput.print_debug("Rendering playlist {0}".format(playlistFileName))
+    tracks = []
+    frameCount = 0
+    clipGap = get_silence(AUDIO_TRACK_CLIP_GAP_SEC)
+    trackGap = get_silence(gapSec)
+    tempFileName = "{0}.{1}.tmp".format(playlistFileName, os.getpid())
+
+    try:
+        with wave.open(tempFileName, 'wb') as playlistFile:
+            playlistFile.setnchannels(caudio.AUDIO_CHANNELS)
+            playlistFile.setsampwidth(caudio.AUDIO_SAMPLE_WIDTH)
+            playlistFile.setframerate(caudio.AUDIO_SAMPLE_RATE)
+
+            for [trackTitle, clipFileNames] in trackClips:
+                tracks.append((trackTitle, frameCount / caudio.AUDIO_SAMPLE_RATE))
+
+                # Clips are decoded in whole chunks, so every track starts on a chunk boundary
+                for clipIndex, clipFileName in enumerate(clipFileNames):
+                    trackPCM = loadClip(clipFileName)
+                    if clipIndex < len(clipFileNames) - 1:
+                        trackPCM = bytes(trackPCM) + clipGap
+                    playlistFile.writeframes(trackPCM)
+                    frameCount += len(trackPCM) // caudio.AUDIO_FRAME_SIZE
+
+                playlistFile.writeframes(trackGap)
+                frameCount += len(trackGap) // caudio.AUDIO_FRAME_SIZE
+
+        os.replace(tempFileName, playlistFileName)
+        write_cue_sheet(cueFileName, playlistFileName, renderKey, tracks)
+
+    finally:
+        if os.path.isfile(tempFileName):
+            os.remove(tempFileName)
+
+    return tracks
+
+
+def get_track_index(tracks, positionSec):
+    # Returns the index of the track playing at the given position
+
+    trackIndex = 0
+    for candidateIndex, [trackTitle, trackStart] in enumerate(tracks):
+        if trackStart > positionSec:
+            break
+        trackIndex = candidateIndex
+    return trackIndex
+
+
+def get_track_offset(trackStart):
+    # Returns the offset in the playlist PCM data of a track start, rounded to the chunk boundary it was rendered on,
+    # as cue sheet positions are rounded to 1/75 second
+    return int(round(trackStart * caudio.AUDIO_BYTE_RATE / caudio.AUDIO_CHUNK_SIZE)) * caudio.AUDIO_CHUNK_SIZE
+
+
+########################################################################
+# Sample application to test the python module
+########################################################################
+
+'''
+cd ~/projects/py3-raspi/common/rpimod/stdio
+python3 audioplaylist.py
+'''
+
+'''
+SAMPLE_CLIP_DIR = "../../../spelling-bee/data/"
+
+tracks = render_playlist("/tmp/sample_playlist.wav", "/tmp/sample_playlist.cue",
+                         [("correct", [SAMPLE_CLIP_DIR + "sb_feedback_correct.wav"]), ("incorrect", [SAMPLE_CLIP_DIR + "sb_feedback_incorrect.wav"])], 1.0)
+print(tracks)
+
+pcmData = caudio.load_clip("/tmp/sample_playlist.wav")
+caudio.get_audio_player('plughw:0,0').play_pcm(pcmData[get_track_offset(tracks[1][1]):])
+'''
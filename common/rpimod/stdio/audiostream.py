@@ -0,0 +1,395 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : audiostream.py
+# Description : Chunked streaming playback of WAV and MP3 audio through a bounded ring buffer
+# Author      : Dito Manavalan
+# Date        : 2019/03/16
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import wave
+import threading
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+import common.rpimod.stdio.audioplayer as caudio
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+
+################################################################
+# Configuration
+################################################################
+
+# Decoded PCM held between the network and the output device, about 0.75 seconds in the playback format
+AUDIO_RING_BUFFER_SIZE = 16 * caudio.AUDIO_CHUNK_SIZE
+
+# Decoded PCM required before playback starts, and again after an underrun, about 0.1 seconds
+AUDIO_PREBUFFER_SIZE = 2 * caudio.AUDIO_CHUNK_SIZE
+
+# Number of frames read at a time from WAV streams in the playback format
+AUDIO_WAV_READ_FRAMES = caudio.AUDIO_CHUNK_SIZE // caudio.AUDIO_FRAME_SIZE
+
+
+################################################################
+# Ring Buffer
+################################################################
+
+class RingBuffer(object):
+    """
+    Bounded byte FIFO between a producer and a consumer thread, backed by a fixed bytearray.
+    Writers block while the buffer is full and readers block until data is available, so that memory
+    use stays flat however long the stream. Closing ends the stream once the remaining data is read,
+    while cancelling discards it and releases both sides.
+    """
+    def __init__(self, capacity):
+        self.buffer = bytearray(capacity)
+        self.capacity = capacity
+        self.readOffset = 0
+        self.size = 0
+        self.closed = False
+        self.cancelled = False
+        self.condition = threading.Condition()
+
+
+    def available(self):
+        with self.condition:
+            return self.size
+
+
+    def is_finished(self):
+        # Returns True once the stream is closed and all its data has been read
+        with self.condition:
+            return self.cancelled or (self.closed and self.size == 0)
+
+
+    def write(self, data):
+        # Blocks until all the data is written
+        # Returns False if the buffer was cancelled or closed before then
+
+        dataView = memoryview(data)
+
+        with self.condition:
+            while len(dataView) > 0:
+                while self.size == self.capacity and not (self.closed or self.cancelled):
+                    self.condition.wait()
+                if self.closed or self.cancelled:
+                    return False
+
+                writeOffset = (self.readOffset + self.size) % self.capacity
+                writeSize = min(len(dataView), self.capacity - self.size, self.capacity - writeOffset)
+                self.buffer[writeOffset:writeOffset + writeSize] = dataView[:writeSize]
+                self.size += writeSize
+                dataView = dataView[writeSize:]
+                self.condition.notify_all()
+
+        return True
+
+
+    def wait_available(self, size, timeout=None):
+        # Blocks until size bytes are available or the stream is closed
+        # Returns False on timeout
+
+        with self.condition:
+            return self.condition.wait_for(lambda: self.size >= size or self.closed or self.cancelled, timeout)
+
+
+    def read(self, size):
+        # Blocks until size bytes are available, returning fewer only at the end of the stream
+
+        self.wait_available(size)
+
+        with self.condition:
+            if self.cancelled:
+                return b''
+
+            readSize = min(size, self.size)
+            firstSize = min(readSize, self.capacity - self.readOffset)
+            data = bytes(self.buffer[self.readOffset:self.readOffset + firstSize]) + bytes(self.buffer[:readSize - firstSize])
+
+            self.readOffset = (self.readOffset + readSize) % self.capacity
+            self.size -= readSize
+            self.condition.notify_all()
+
+        return data
+
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+    def cancel(self):
+        with self.condition:
+            self.cancelled = True
+            self.size = 0
+            self.condition.notify_all()
+
+
+################################################################
+# Encoded Stream Reader
+################################################################
+
+class ChunkReader(object):
+    """
+    File-like reader over an iterable of encoded chunks, used to parse WAV headers as they arrive.
+    Data read is retained until released, so that the stream can be replayed from the start to a
+    decoder when it is not in the playback format.
+    """
+    def __init__(self, encodedChunks):
+        self.encodedChunks = iter(encodedChunks)
+        self.pending = b''
+        self.retained = []
+        self.retaining = True
+
+
+    def read(self, size=-1):
+        while size < 0 or len(self.pending) < size:
+            encodedChunk = next(self.encodedChunks, None)
+            if encodedChunk is None:
+                break
+            self.pending += encodedChunk
+
+        if size < 0:
+            size = len(self.pending)
+
+        data = self.pending[:size]
+        self.pending = self.pending[size:]
+        if self.retaining:
+            self.retained.append(data)
+        return data
+
+
+    def release(self):
+        self.retaining = False
+        self.retained = []
+
+
+    def replay_chunks(self):
+        # Yields the stream from the start, i.e. the data read so far followed by the rest of the stream
+
+        retainedData = b''.join(self.retained) + self.pending
+        self.release()
+        self.pending = b''
+
+        if len(retainedData) > 0:
+            yield retainedData
+        for encodedChunk in self.encodedChunks:
+            yield encodedChunk
+
+
+################################################################
+# Audio Stream
+################################################################
+
+class AudioStream(object):
+    """
+    Streams WAV or MP3 audio from an iterable of encoded chunks (e.g. an HTTP response body) to an AudioPlayer.
+    A producer thread decodes audio as it arrives into a bounded PCM ring buffer, which playback drains:
+    WAV in the playback format is read in process, while other audio is decoded by ffmpeg.
+    Playback starts once a short prebuffer is filled, and waits for it to refill whenever it runs dry.
+    Encoded data may be teed to a file, and the stream may be read only once.
+    """
+    def __init__(self, encodedChunks, streamFormat=None, teeFile=None, bufferSize=AUDIO_RING_BUFFER_SIZE, prebufferSize=AUDIO_PREBUFFER_SIZE):
+        self.encodedChunks = encodedChunks
+        self.streamFormat = streamFormat
+        self.teeFile = teeFile
+        self.ringBuffer = RingBuffer(bufferSize)
+        self.prebufferSize = prebufferSize
+        self.producer = None
+        self.completed = False          # Set once the whole stream has been received
+        self.underrunCount = 0
+        self.error = None
+
+
+    def receive_chunks(self):
+        for encodedChunk in self.encodedChunks:
+            if self.teeFile is not None:
+                self.teeFile.write(encodedChunk)
+            yield encodedChunk
+
+        self.completed = True
+
+
+    def cancel(self):
+        # Stops the stream from another thread, e.g. when playback is stopped, so that a read waiting on the buffer ends
+        self.ringBuffer.cancel()
+
+
+    def decode_chunks(self):
+        encodedChunks = self.receive_chunks()
+
+        if self.streamFormat == 'wav':
+            chunkReader = ChunkReader(encodedChunks)
+            try:
+                wavFile = wave.open(chunkReader, 'rb')
+                wavFormat = (wavFile.getframerate(), wavFile.getnchannels(), wavFile.getsampwidth(), wavFile.getcomptype())
+            except (wave.Error, EOFError):
+                wavFormat = None
+
+            if wavFormat == (caudio.AUDIO_SAMPLE_RATE, caudio.AUDIO_CHANNELS, caudio.AUDIO_SAMPLE_WIDTH, 'NONE'):
+                coutput.print_debug("Reading WAV stream in process")
+                chunkReader.release()
+                while True:
+                    pcmChunk = wavFile.readframes(AUDIO_WAV_READ_FRAMES)
+                    if len(pcmChunk) == 0:
+                        break
+                    yield pcmChunk
+
+                # Receive any trailing chunks, so that a teed stream is complete, unless playback was stopped
+                for encodedChunk in encodedChunks:
+                    if self.ringBuffer.is_finished():
+                        break
+                return
+
+            encodedChunks = chunkReader.replay_chunks()
+
+        # Closing this generator closes the decoder, as it is delegated to
+        yield from caudio.StreamDecoder(encodedChunks, self.streamFormat).read_chunks()
+
+
+    def produce(self):
+        decodedChunks = self.decode_chunks()
+
+        try:
+            for pcmChunk in decodedChunks:
+                if not self.ringBuffer.write(pcmChunk):
+                    break
+
+        except Exception as e:
+            self.error = e
+
+        finally:
+            decodedChunks.close()
+            self.ringBuffer.close()
+
+
+    def read_chunks(self):
+        # Yields decoded PCM in whole chunks, padding the last with silence
+
+        self.producer = threading.Thread(target=self.produce, daemon=True)
+        self.producer.start()
+
+        try:
+            self.ringBuffer.wait_available(self.prebufferSize)
+
+            while not self.ringBuffer.is_finished():
+                if self.ringBuffer.available() < caudio.AUDIO_CHUNK_SIZE and not self.ringBuffer.closed:
+                    self.underrunCount += 1
+                    coutput.print_debug("Audio stream underrun #{0}".format(self.underrunCount))
+                    self.ringBuffer.wait_available(self.prebufferSize)
+
+                pcmChunk = self.ringBuffer.read(caudio.AUDIO_CHUNK_SIZE)
+                if len(pcmChunk) > 0:
+                    yield caudio.pad_pcm(pcmChunk)
+
+        finally:
+            self.ringBuffer.cancel()
+            self.producer.join(caudio.AUDIO_MAX_LEAD_SEC)
+
+        if self.error is not None:
+            raise self.error
+
+
+################################################################
+# URL Stream
+################################################################
+
+class URLStream(object):
+    """
+    Streams WAV or MP3 audio from a URL to an AudioPlayer through an AudioStream.
+    The URL is requested only once read, i.e. in the playback thread, so that starting playback does not wait
+    on the network. The audio is saved to targetFileName, if given, once the whole clip has been received,
+    and passed to saveClip, if given, e.g. to record it in an audio manifest.
+    """
+    def __init__(self, connectionPool, sourceURL, targetFileName=None, saveClip=None):
+        self.connectionPool = connectionPool
+        self.sourceURL = sourceURL
+        self.targetFileName = targetFileName
+        self.saveClip = saveClip
+        self.audioStream = None
+        self.receivedSize = 0
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+
+    def receive_chunks(self, response):
+        # Yields the response body, raising an error if it ends short of its declared length, so that a truncated
+        # clip is neither saved nor reported as played
+
+        for encodedChunk in response.stream(caudio.AUDIO_STREAM_READ_SIZE):
+            self.receivedSize += len(encodedChunk)
+            yield encodedChunk
+
+        contentLength = response.headers.get('Content-Length')
+        if contentLength is not None and response.headers.get('Content-Encoding') is None and self.receivedSize < int(contentLength):
+            raise IOError("Stream truncated at {0} of {1} bytes".format(self.receivedSize, contentLength))
+
+
+    def read_chunks(self):
+        # Yields decoded PCM in whole chunks, padding the last with silence
+
+        response = self.connectionPool.request('GET', self.sourceURL, preload_content=False)
+
+        targetFile = None
+        if self.targetFileName is not None:
+            tempFileName = "{0}.{1}.tmp".format(self.targetFileName, os.getpid())
+            targetFile = open(tempFileName, "wb")
+
+        try:
+            if response.status != 200:
+                raise IOError("HTTP status {0}".format(response.status))
+
+            with self.lock:
+                if self.cancelled:
+                    return
+                self.audioStream = AudioStream(self.receive_chunks(response), caudio.get_stream_format(self.sourceURL), targetFile)
+
+            yield from self.audioStream.read_chunks()
+
+        finally:
+            response.release_conn()
+
+            if targetFile is not None:
+                targetFile.close()
+                if self.audioStream is not None and self.audioStream.completed:
+                    os.replace(tempFileName, self.targetFileName)
+                    if self.saveClip is not None:
+                        self.saveClip(self.targetFileName)
+                else:
+                    os.remove(tempFileName)
+
+
+    def cancel(self):
+        # Stops the stream from another thread, including one not yet started, e.g. while the URL is requested
+        with self.lock:
+            self.cancelled = True
+            if self.audioStream is not None:
+                self.audioStream.cancel()
+
+
+########################################################################
+# Sample application to test the python module
+########################################################################
+
+'''
+cd ~/projects/py3-raspi/common/rpimod/stdio
+python3 audiostream.py
+'''
+
+'''
+from urllib.request import urlopen
+
+SAMPLE_WAV_URL = "http://media.merriam-webster.com/soundc11/c/cloud001.wav"
+
+response = urlopen(SAMPLE_WAV_URL)
+audioStream = AudioStream(iter(lambda: response.read(caudio.AUDIO_STREAM_READ_SIZE), b''), caudio.get_stream_format(SAMPLE_WAV_URL))
+caudio.get_audio_player('plughw:0,0').play_stream(audioStream)
+print("Underruns: {0}".format(audioStream.underrunCount))
+'''
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : filecatalog.py
+# Description : Persistent catalog of data parsed from text files, invalidated by file mtime
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import pickle
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.output as coutput
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+# Catalogs written in an older format are discarded and rebuilt
+CATALOG_VERSION = 2
+
+
+def get_file_key(fileName):
+    # Returns the state of a file, which changes whenever the file is written
+    fileStat = os.stat(fileName)
+    return (os.path.normpath(fileName), fileStat.st_mtime_ns, fileStat.st_size)
+
+
+class FileCatalog(object):
+    """
+    Catalog of parsed file contents persisted as a single pickle, so that text files are read and parsed
+    only once after they change. Each entry holds the data built from one or more files along with the
+    state (path, mtime, size) of those files; an entry is rebuilt when that state no longer matches.
+    """
+    def __init__(self, catalogFile):
+        self.catalogFile = catalogFile
+        self.entries = {}
+        self.modified = False
+
+        try:
+            with open(self.catalogFile, 'rb') as catalogFileHandle:
+                [catalogVersion, catalogEntries] = pickle.load(catalogFileHandle)
+            if catalogVersion == CATALOG_VERSION:
+                self.entries = catalogEntries
+        except (IOError, OSError, EOFError, ValueError, TypeError, pickle.UnpicklingError) as e:
+            coutput.print_debug("Unable to load file catalog from {0} :: {1}".format(self.catalogFile, e))
+
+
+    def load(self, entryKey, fileNames, buildData):
+        # Returns the data built from the given files by buildData(fileNames), building it only if the files
+        # changed since last built, e.g. a parsed word list, or a rulebook merged from several files
+
+        fileKeys = [get_file_key(fileName) for fileName in fileNames]
+
+        catalogEntry = self.entries.get(entryKey)
+        if catalogEntry is not None and catalogEntry['files'] == fileKeys:
+            return catalogEntry['data']
+
+        coutput.print_debug("Building catalog entry {0}".format(entryKey))
+        entryData = buildData(fileNames)
+        self.entries[entryKey] = {'files': fileKeys, 'data': entryData}
+        self.modified = True
+        return entryData
+
+
+    def load_file(self, fileName, parseFile):
+        # Returns the data parsed from a file by parseFile(fileName), parsing it only if changed since last parsed
+        return self.load(os.path.normpath(fileName), [fileName], lambda fileNames: parseFile(fileNames[0]))
+
+
+    def save(self):
+        # Writes the catalog if any entry was built, dropping entries of files no longer present
+
+        if not self.modified:
+            return
+
+        for entryKey in list(self.entries):
+            if not all(os.path.isfile(fileKey[0]) for fileKey in self.entries[entryKey]['files']):
+                del self.entries[entryKey]
+
+        try:
+            tempCatalogFile = self.catalogFile + ".tmp"
+            with open(tempCatalogFile, 'wb') as catalogFileHandle:
+                pickle.dump([CATALOG_VERSION, self.entries], catalogFileHandle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tempCatalogFile, self.catalogFile)
+            self.modified = False
+        except (IOError, OSError, pickle.PicklingError) as e:
+            coutput.print_err("Unable to save file catalog to {0} :: {1}".format(self.catalogFile, e))
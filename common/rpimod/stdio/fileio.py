@@ -10,7 +10,6 @@
 
 import os, errno
 import sys
-import uuid
 import time
 import glob
 import re
@@ -21,11 +20,13 @@ import platform
 
 sys.path.insert(0, "../../..")
 import common.rpimod.stdio.output as coutput
+import common.rpimod.stdio.audioplayer as caudio
+import common.rpimod.stdio.audiostream as castream
+import common.rpimod.stdio.audiomanifest as cmanifest
+import common.rpimod.stdio.audioplaylist as cplaylist
+import common.rpimod.stdio.audiopack as cpack
 
 import codecs
-from pydub.utils import mediainfo
-os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
-import pygame
 
 
 # Set to True to turn debug messages on
@@ -42,6 +43,16 @@ alsaAudioOutputConfig = {
     'RaspberryPi' : { 'speaker': '', 'hdmi': '', 'auto': ''}
 }
 
+# Audio manifest holding the silence bounds and gain of clips, if loaded
+audioManifest = None
+
+# Audio metadata is read once per clip and cached across sessions, keyed by path, size and mtime
+AUDIO_INFO_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "rpimod", "audio_info.json")
+audioInfoCache = None
+
+# Audio pack holding the decoded clips of the active word list, if loaded
+audioPack = None
+
 
 ################################################################
 # File handlers
@@ -95,6 +106,13 @@ def read(inputFileName):
     return fileText
 
 
+def read_lines(inputFileName):
+    # Yields the lines of a file without line endings, reading one line at a time rather than the whole file
+    with open(inputFileName, mode='r', encoding='utf-8') as inputFile:
+        for inputLine in inputFile:
+            yield inputLine.rstrip('\n')
+
+
 def write(outputFileName, outputText):
     outputFile = codecs.open(outputFileName, mode='w', encoding='utf-8')
     print(outputText, file=outputFile)
@@ -168,18 +186,33 @@ def get_audio_output(audioOutput):
     return alsaAudioOutputConfig[platform.node()][audioOutput.lower()]
 
 
+def get_audio_info(fileName):
+    # Returns the duration, sample rate, channels, sample size, codec, size and hash of a clip
+    global audioInfoCache
+
+    if audioInfoCache is None:
+        os.makedirs(os.path.dirname(AUDIO_INFO_CACHE_FILE), exist_ok=True)
+        audioInfoCache = cmanifest.AudioManifest(AUDIO_INFO_CACHE_FILE)
+
+    return audioInfoCache.lookup_audio_info(os.path.abspath(fileName))
+
+
 def play_legacy(fileName, audioOutput, loopCount, loopDelaySec):
     # Reference:
     # https://www.pygame.org/docs/ref/mixer.html#pygame.mixer.init
     # http://techqa.info/programming/question/27745134/how-can-i-extract-the-metadata-and-bitrate-info-from-a-audio/video-file-in-python
 
+    # Imported on first use, as pygame is slow to import and only used by legacy playback
+    os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
+    import pygame
+
     try:
         #Enable for RaspberryPi
         coutput.print_debug("Executing set_audio_output")
         set_audio_output(audioOutput)
 
-        coutput.print_debug("Executing mediainfo")
-        fileInfo = mediainfo(fileName)
+        coutput.print_debug("Executing get_audio_info")
+        fileInfo = get_audio_info(fileName)
         
         coutput.print_watcher("fileName")
         coutput.print_watcher("fileInfo['sample_rate']")
@@ -216,81 +249,211 @@ def play_legacy(fileName, audioOutput, loopCount, loopDelaySec):
 
 def play(fileName, audioOutput, loopCount, loopDelaySec):
     # Reference:
-    # https://realpython.com/playing-and-recording-sound-python/#playing-audio-files
-    # https://askubuntu.com/questions/115369/how-to-play-mp3-files-from-the-command-line
-    # https://www.ffmpeg.org/ffplay.html
     # https://www.ffmpeg.org/ffmpeg-devices.html#Examples-8
     # Use aplay -L to find audio output device. e.g. HDMI is plughw
-
-    playCommand = "ffmpeg -f alsa {outputdevice} -loglevel quiet -i {filename} 2>/dev/null".format(outputdevice=get_audio_output(audioOutput), filename=fileName)
+    # Clips are decoded once and played through a persistent audio sink, which keeps the device open
 
     try:
-
         coutput.print_watcher("fileName")
+        pcmData = load_audio(fileName)
+        caudio.get_audio_player(get_audio_output(audioOutput)).play_pcm(pcmData, loopCount, loopDelaySec)
 
-        for loopIndex in range (0, loopCount):
-            coutput.print_debug("Executing play")
-            coutput.print_watcher("playCommand")
-            os.system(playCommand)
+    except:
+        coutput.print_err("Unable to play audio from " + fileName)
+        coutput.print_watcher("sys.exc_info()")
+
+
+def report_audio_error(sourceName):
+    # Returns a function reporting errors of playback running in the background, e.g. a clip failing to decode
+
+    def report_error(error):
+        coutput.print_err("Unable to play audio from {0} :: {1}".format(sourceName, error))
+
+    return report_error
 
-            if loopIndex != (loopCount - 1):
-                time.sleep(loopDelaySec)
+
+def play_async(fileName, audioOutput, loopCount, loopDelaySec):
+    # Starts playback in the background and returns a handle to cancel or wait on it, None if unable to play
+    # The clip is loaded in the background, so that the call returns at once; loading errors are recorded in the
+    # handle and reported as they occur
+
+    try:
+        coutput.print_watcher("fileName")
+        return caudio.get_audio_player(get_audio_output(audioOutput)).start_playback(lambda: [load_audio(fileName)], loopCount, loopDelaySec,
+                                                                                     reportError=report_audio_error(fileName))
 
     except:
         coutput.print_err("Unable to play audio from " + fileName)
         coutput.print_watcher("sys.exc_info()")
+        return None
+
+
+def stop_audio():
+    # Stops playback on all audio outputs
+    caudio.stop_audio_players()
+
+
+def pin_audio(fileNames):
+    # Decodes clips ahead of play and keeps them resident for the rest of the session
+
+    for fileName in fileNames:
+        try:
+            caudio.pin_clip(fileName, get_clip_levels(fileName))
+        except:
+            coutput.print_err("Unable to load audio from " + fileName)
+            coutput.print_watcher("sys.exc_info()")
+
+
+def load_audio_manifest(manifestFile):
+    # Loads the audio manifest written by the clip ingest step, so that clips are played trimmed and normalised
+    # Returns the manifest, so that callers may record and look up clips in it
+    global audioManifest
+    audioManifest = cmanifest.AudioManifest(manifestFile)
+    return audioManifest
+
+
+def get_clip_levels(fileName):
+    # Returns the clip levels recorded in the audio manifest, None if not recorded
+
+    if audioManifest is None:
+        return None
+    return audioManifest.get_clip_levels(fileName)
+
+
+def load_audio(fileName):
+    # Returns the decoded PCM data of a clip from the audio pack if packed, else from the clip cache
+
+    if audioPack is not None:
+        pcmData = audioPack.get_clip(fileName)
+        if pcmData is not None:
+            return pcmData
+
+    return caudio.load_clip(fileName, get_clip_levels(fileName))
+
+
+def build_audio_pack(packFileName, wordClips):
+    # Packs the decoded clips of a word list, trimmed and normalised as recorded in the audio manifest
+
+    return cpack.build_pack(packFileName, wordClips, lambda clipFileName: caudio.load_clip(clipFileName, get_clip_levels(clipFileName)), get_clip_levels)
+
+
+def load_audio_pack(packFileName):
+    # Maps the audio pack of a word list, so that its clips are played from the pack
+    # Returns the pack, None if unable to load
+    global audioPack
+
+    try:
+        audioPack = cpack.AudioPack(packFileName)
+    except (IOError, OSError, ValueError, cpack.InvalidAudioPackException) as e:
+        coutput.print_debug("Unable to load audio pack from {0} :: {1}".format(packFileName, e))
+        audioPack = None
+
+    return audioPack
+
+
+def unload_audio_pack():
+    # Stops playing clips from the audio pack, e.g. once it is found stale, so that clips are loaded from their files
+    global audioPack
+    audioPack = None
+
+
+def render_playlist(playlistFileName, cueFileName, trackClips, gapSec):
+    # Renders tracks of clips into a single playlist file and cue sheet, with clips trimmed and normalised
+    # as recorded in the audio manifest, and returns the list of (title, start in seconds) of the tracks
+
+    return cplaylist.render_playlist(playlistFileName, cueFileName, trackClips, gapSec,
+                                     lambda clipFileName: caudio.load_clip(clipFileName, get_clip_levels(clipFileName)), get_clip_levels)
+
+
+def play_playlist_async(playlistFileName, audioOutput, startSec):
+    # Plays a rendered playlist in the background from the given position, e.g. the start of a track
+    # Returns a handle to cancel or wait on playback, None if unable to play
+
+    try:
+        coutput.print_watcher("playlistFileName")
+        pcmData = caudio.load_clip(playlistFileName)
+        return caudio.get_audio_player(get_audio_output(audioOutput)).play_pcm_async(pcmData[cplaylist.get_track_offset(startSec):])
+
+    except:
+        coutput.print_err("Unable to play audio from " + playlistFileName)
+        coutput.print_watcher("sys.exc_info()")
+        return None
 
 
-def play_url(connectionPool, sourceURL, audioOutput, loopCount, loopDelay):
+def open_audio_output(audioOutput):
+    # Starts the audio sink ahead of the first clip, so that the device open is not paid on first play
+
+    try:
+        caudio.get_audio_player(get_audio_output(audioOutput)).start()
+    except:
+        coutput.print_err("Unable to open audio output " + audioOutput)
+        coutput.print_watcher("sys.exc_info()")
+
+
+def register_clip(fileName):
+    # Records a downloaded clip in the audio manifest, if loaded
+    if audioManifest is not None:
+        audioManifest.register_clip(fileName)
+
+
+def play_url_async(connectionPool, sourceURL, audioOutput, loopCount, loopDelay, targetFileName=None, reportErrors=True):
+    # Starts streaming audio from a URL in the background and returns a handle to cancel or wait on it, None if unable to play
+    # The URL is requested in the background, so that the call returns at once. The downloaded audio is saved to
+    # targetFileName, if given, and recorded in the audio manifest, once the whole clip has been received
+    # Errors, e.g. HTTP errors or a truncated stream, are recorded in the handle, and reported as they occur if reportErrors is set
+
+    try:
+        if '.mp3' not in sourceURL and '.wav' not in sourceURL:
+            coutput.print_err("Unable to play audio from " + sourceURL)
+            return None
+
+        coutput.print_watcher("sourceURL")
+        urlStream = castream.URLStream(connectionPool, sourceURL, targetFileName, register_clip)
+        reportError = report_audio_error(sourceURL) if reportErrors else None
+        return caudio.get_audio_player(get_audio_output(audioOutput)).play_stream_async(urlStream, loopCount, loopDelay, reportError)
+
+    except Exception:
+        coutput.print_err("Unable to play audio from " + sourceURL)
+        coutput.print_watcher("sys.exc_info()")
+        return None
+
+
+def play_url(connectionPool, sourceURL, audioOutput, loopCount, loopDelay, targetFileName=None):
+    # Streams audio through a ring buffer as it is downloaded, so that playback starts on the first chunks
+    # The downloaded audio is saved to targetFileName, if given, once the whole clip has been received
 
     try:
         coutput.print_debug("Executing set_audio_output")
         set_audio_output(audioOutput)
 
-        if '.mp3' in sourceURL or '.wav' in sourceURL:
-            tempFileName = "dlfile_ts{TIMESTAMP}_rnd{RAND}.tmp".format(TIMESTAMP=time.strftime("%Y%m%d%H%M%S"), RAND=str(uuid.uuid4()))
-            download(connectionPool, sourceURL, tempFileName)
-            play(tempFileName, audioOutput, loopCount, loopDelay)
-            delete(tempFileName)
-        else:
-            coutput.print_err("Unable to play audio from " + sourceURL)
+        # Errors are raised here by wait_playback, hence not reported in the background
+        playbackHandle = play_url_async(connectionPool, sourceURL, audioOutput, loopCount, loopDelay, targetFileName, False)
+        if playbackHandle is not None:
+            caudio.get_audio_player(get_audio_output(audioOutput)).wait_playback(playbackHandle)
 
         set_audio_output('auto')
-    except:
+    except Exception:
         coutput.print_err("Unable to play audio from " + sourceURL)
 
 
 def stream_wav(sourceURL, audioOutput):
     # Reference:
-    # http://people.csail.mit.edu/hubert/pyaudio/#examples
     # http://stackoverflow.com/questions/33320218/get-an-audio-file-with-http-get-and-then-play-it-in-python-3-tts-in-python-3
+    # Streams WAV or MP3 audio from a URL without a connection pool, through the shared audio output
 
     from urllib.request import urlopen
-    import wave
-    import pyaudio
-
-    WAV_CHUNK_SIZE = 4096
-
-    set_audio_output(audioOutput)
 
-    r = urlopen(sourceURL)
-    wf = wave.open(r, 'rb')
-    p = pyaudio.PyAudio()
-    stream = p.open(format=p.get_format_from_width(wf.getsampwidth()),
-                    channels=wf.getnchannels(),
-                    rate=wf.getframerate(),
-                    output=True)
-    data = wf.readframes(WAV_CHUNK_SIZE)
-
-    while data != '':
-        stream.write(data)
-        data = wf.readframes(WAV_CHUNK_SIZE)
+    try:
+        set_audio_output(audioOutput)
 
-    stream.stop_stream()
-    stream.close()
-    p.terminate()
+        with urlopen(sourceURL) as response:
+            audioStream = castream.AudioStream(iter(lambda: response.read(caudio.AUDIO_STREAM_READ_SIZE), b''), caudio.get_stream_format(sourceURL))
+            caudio.get_audio_player(get_audio_output(audioOutput)).play_stream(audioStream)
 
-    set_audio_output('auto')
+        set_audio_output('auto')
+    except Exception:
+        coutput.print_err("Unable to stream audio from " + sourceURL)
+        coutput.print_watcher("sys.exc_info()")
 
 
 ################################################################
@@ -27,56 +27,55 @@ import common.rpimod.wordproc.dict.generic as cdict
 ################################################################
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
-
-
-def initialize_source():
-    cdict.DICT_SOURCE_NAME = unicode("Cambridge Dictionaries Online", 'utf-8')
-    cdict.DICT_ENTRY_URL = unicode("http://dictionary.cambridge.org/us/dictionary/english/{WORD}", 'utf-8')
-    cdict.DICT_AUDIO_URL = unicode("http://dictionary.cambridge.org{PATH}", 'utf-8')
-
-    cdict.DICT_CLEAN_TEXT_PATTERNS = [
-    u'\u200b',
-    u': '
-    ]
-    cdict.DICT_CLEAN_INNER_TEXT_PATTERNS = []
-    cdict.DICT_CLEAN_OUTER_TEXT_PATTERNS = [
-    [r'<a.*?>', r'</a>'],
-    [r'<b>', r'</b>'],
-    [r'<i>', r'</i>'],
-    [r'<u>', r'</u>']
-    ]
-
-    # The dictionary definition line is identified by the HTML tag '<span class="def">...</span>'
-    # The pronunciation audio line is identified by the HTML tag 'data-src-mp3="http://www.oxforddictionaries.com/us/media/american_english/us_pron/c/clo/cloud/cloud__us_1.mp3"'
-    # The pronunciation audio header word is identified by the HTML tag '<span class="hw">'
-    cdict.DICT_MARKER_DEFINITION = [
-    [r'<span class="def">', r'</span>']
-    ]
-    cdict.DICT_MARKER_PRONUNCIATION_URL = [r'data-src-mp3="', r'"']
-    cdict.DICT_MARKER_PRONUNCIATION_WORD = [r'<span class="hw">', r'</span>']
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+
+class DictionaryConfig(cdict.DictionaryConfig):
+    def __init__(self):
+
+        # Configuration Attributes
+        self.name = "Cambridge Dictionaries Online"
+        self.entry_url_format = "http://dictionary.cambridge.org/us/dictionary/english/{WORD}"
+        self.audio_url_format = "http://dictionary.cambridge.org{PATH}"
+
+        self.clean_text_patterns = [
+        u'\u200b',
+        u': '
+        ]
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = [
+        [r'<a.*?>', r'</a>'],
+        [r'<b>', r'</b>'],
+        [r'<i>', r'</i>'],
+        [r'<u>', r'</u>']
+        ]
+
+        # The dictionary definition line is identified by the HTML tag '<span class="def">...</span>'
+        # The pronunciation audio line is identified by the HTML tag 'data-src-mp3="http://www.oxforddictionaries.com/us/media/american_english/us_pron/c/clo/cloud/cloud__us_1.mp3"'
+        # The pronunciation audio header word is identified by the HTML tag '<span class="hw">'
+        self.definition_markers = [
+        [r'<span class="def">', r'</span>']
+        ]
+        self.pronunciation_url_marker = [r'data-src-mp3="', r'"']
+        self.pronunciation_word_marker = [r'<span class="hw">', r'</span>']
+
+
+DICT_EXTRACTOR = cdict.DictionaryExtractor(DictionaryConfig())
 
 
 def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
-    initialize_source()
-    return cdict.get_dictionary_source()
+    return DICT_EXTRACTOR.get_dictionary_source()
 
 
 def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
-    initialize_source()
-    return cdict.get_dictionary_entry(connectionPool, word)
+    return DICT_EXTRACTOR.get_dictionary_entry(connectionPool, word)
 
 
 def parse_word_definition(word, entryText):
-    _FUNC_NAME_ = "parse_word_definition"
-    initialize_source()
-    return cdict.parse_word_definition(word, entryText)
+    return DICT_EXTRACTOR.parse_word_definition(word, entryText)
 
 
 def parse_word_clip(word, entryText):
-    _FUNC_NAME_ = "parse_word_clip"
-    initialize_source()
-    return cdict.parse_word_clip(word, entryText)
+    return DICT_EXTRACTOR.parse_word_clip(word, entryText)
 
@@ -27,53 +27,47 @@ import common.rpimod.wordproc.dict.generic as cdict
 ################################################################
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
 
-def initialize_source():
-    cdict.DICT_SOURCE_NAME = unicode("Collins American English Dictionary", 'utf-8')
-    cdict.DICT_ENTRY_URL = unicode("http://www.collinsdictionary.com/dictionary/american/{WORD}", 'utf-8')
-    cdict.DICT_AUDIO_URL = unicode("http://www.collinsdictionary.com{PATH}", 'utf-8')
+class DictionaryConfig(cdict.DictionaryConfig):
+    def __init__(self):
 
-    cdict.DICT_CLEAN_TEXT_PATTERNS = []
-    cdict.DICT_CLEAN_INNER_TEXT_PATTERNS = []
-    cdict.DICT_CLEAN_OUTER_TEXT_PATTERNS = []
+        # Configuration Attributes
+        self.name = "Collins American English Dictionary"
+        self.entry_url_format = "http://www.collinsdictionary.com/dictionary/american/{WORD}"
+        self.audio_url_format = "http://www.collinsdictionary.com{PATH}"
 
-    # The dictionary definition line is identified by the HTML tag '<span class="def">....</span>'
-    # The pronunciation audio line is identified by the HTML tag 'data-src-mp3="/sounds/e/en_/en_us/en_us_cloud.mp3"'
-    # The pronunciation audio header word is identified by the HTML tag '<h1 class="orth h1_entry">cloud<'
-    cdict.DICT_MARKER_DEFINITION = [
-    [r'<span class="def">\s*', r'\s*</span>']
-    ]
-    cdict.DICT_MARKER_PRONUNCIATION_URL = [r'data-src-mp3="', r'"']
-    cdict.DICT_MARKER_PRONUNCIATION_WORD = [r'<h1 class="orth h1_entry">', r'<']
+        self.clean_text_patterns = []
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = []
 
+        # The dictionary definition line is identified by the HTML tag '<span class="def">....</span>'
+        # The pronunciation audio line is identified by the HTML tag 'data-src-mp3="/sounds/e/en_/en_us/en_us_cloud.mp3"'
+        # The pronunciation audio header word is identified by the HTML tag '<h1 class="orth h1_entry">cloud<'
+        self.definition_markers = [
+        [r'<span class="def">\s*', r'\s*</span>']
+        ]
+        self.pronunciation_url_marker = [r'data-src-mp3="', r'"']
+        self.pronunciation_word_marker = [r'<h1 class="orth h1_entry">', r'<']
 
-def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
 
-    initialize_source()
-    DEBUG_VAR="cdict.DICT_SOURCE_NAME"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(cdict.DICT_SOURCE_NAME)))
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+DICT_EXTRACTOR = cdict.DictionaryExtractor(DictionaryConfig())
+
 
-    return cdict.get_dictionary_source()
+def get_dictionary_source():
+    return DICT_EXTRACTOR.get_dictionary_source()
 
 
 def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
-    initialize_source()
-    return cdict.get_dictionary_entry(connectionPool, word)
+    return DICT_EXTRACTOR.get_dictionary_entry(connectionPool, word)
 
 
 def parse_word_definition(word, entryText):
-    _FUNC_NAME_ = "parse_word_definition"
-    initialize_source()
-    return cdict.parse_word_definition(word, entryText)
+    return DICT_EXTRACTOR.parse_word_definition(word, entryText)
 
 
 def parse_word_clip(word, entryText):
-    _FUNC_NAME_ = "parse_word_clip"
-    initialize_source()
-    return cdict.parse_word_clip(word, entryText)
+    return DICT_EXTRACTOR.parse_word_clip(word, entryText)
 
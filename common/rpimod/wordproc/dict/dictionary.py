@@ -9,7 +9,13 @@
 #--------------------------------------------------------------------------------------------------
 
 import sys
+import os
 import re
+import time
+import json
+import atexit
+import threading
+import concurrent.futures
 
 #sys.path.insert(0, "/home/pi/projects/raspi")
 sys.path.insert(0, "../../../..")
@@ -62,7 +68,26 @@ DICT_SOURCES = {
 'youtube': youtube
 }
 
-DICT_LIST_BULLET = u'• '
+# Sources always tried first, in the order listed; the remaining sources are ordered by observed cost
+# per hit, starting out in the order of PRIORITIZED_DICT_SOURCES
+PINNED_DICT_SOURCES = []
+
+# Statistics are shared by all applications looking up words, hence kept in the user's cache directory
+DICT_SOURCE_STATS_FILE = os.path.join(os.path.expanduser("~"), ".cache", "rpimod", "dict_source_stats.json")
+
+# Statistics are saved at most once per interval while looking up words, and on exit
+DICT_SOURCE_STATS_SAVE_INTERVAL_SEC = 60
+
+# Number of sources queried at a time; lookups of lower ranked sources still queued once both a definition
+# and a clip are found are cancelled without being requested
+DICT_FETCH_MAX_WORKERS = 3
+
+# Smoothing applied to observed statistics, as a number of assumed prior lookups with the given outcomes
+DICT_SOURCE_STATS_PRIOR_LOOKUPS = 2
+DICT_SOURCE_STATS_PRIOR_HIT_RATE = 0.5
+DICT_SOURCE_STATS_PRIOR_LATENCY_SEC = 1.0
+
+DICT_LIST_BULLET = '• '
 
 HEADER_TEXT_COLOR = 'cyan'
 SECTION_TEXT_COLOR = 'cyan'
@@ -70,55 +95,206 @@ WARNING_TEXT_COLOR = 'yellow'
 ERROR_TEXT_COLOR = 'red'
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+################################################################
+# Dictionary Source Statistics
+################################################################
+
+class DictionarySourceStats(object):
+    """
+    Records request latency and definition/clip hits per dictionary source, and ranks sources by
+    expected cost per hit i.e. smoothed mean latency divided by smoothed hit rate.
+    Statistics are updated from lookup threads and persisted as JSON across sessions.
+    """
+    def __init__(self, statsFile):
+        self.statsFile = statsFile
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.saveTime = time.monotonic()
+
+        try:
+            with open(self.statsFile, 'r') as statsFileHandle:
+                self.stats = json.load(statsFileHandle)
+        except (IOError, OSError, ValueError) as e:
+            coutput.print_debug("Unable to load source statistics from {0} :: {1}".format(self.statsFile, e))
+
+
+    def get_source_stats(self, sourceKey):
+        return self.stats.setdefault(sourceKey, {'requests': 0, 'latency': 0.0, 'lookups': 0, 'definitions': 0, 'clips': 0})
+
+
+    def record_request(self, sourceKey, latency):
+        with self.lock:
+            sourceStats = self.get_source_stats(sourceKey)
+            sourceStats['requests'] += 1
+            sourceStats['latency'] += latency
+
+
+    def record_lookup(self, sourceKey, definitionFound, clipFound):
+        with self.lock:
+            sourceStats = self.get_source_stats(sourceKey)
+            sourceStats['lookups'] += 1
+            sourceStats['definitions'] += int(definitionFound)
+            sourceStats['clips'] += int(clipFound)
+
+
+    def get_cost_per_hit(self, sourceKey, hitType):
+        with self.lock:
+            sourceStats = self.get_source_stats(sourceKey)
+            meanLatency = (sourceStats['latency'] + DICT_SOURCE_STATS_PRIOR_LATENCY_SEC * DICT_SOURCE_STATS_PRIOR_LOOKUPS) / (sourceStats['requests'] + DICT_SOURCE_STATS_PRIOR_LOOKUPS)
+            hitRate = (sourceStats[hitType] + DICT_SOURCE_STATS_PRIOR_HIT_RATE * DICT_SOURCE_STATS_PRIOR_LOOKUPS) / (sourceStats['lookups'] + DICT_SOURCE_STATS_PRIOR_LOOKUPS)
+            return meanLatency / hitRate
+
+
+    def rank_sources(self, dictSources, hitType):
+
+        # Sorting is stable, hence sources with equal cost retain their relative priority
+        pinnedSources = [dictSource for dictSource in dictSources if dictSource in PINNED_DICT_SOURCES]
+        pinnedSources.sort(key=PINNED_DICT_SOURCES.index)
+        rankedSources = [dictSource for dictSource in dictSources if dictSource not in PINNED_DICT_SOURCES]
+        rankedSources.sort(key=lambda dictSource: self.get_cost_per_hit(get_source_key(dictSource), hitType))
+
+        coutput.print_debug("Ranked sources for {0} :: {1}".format(hitType, [get_source_key(dictSource) for dictSource in pinnedSources + rankedSources]))
+        return pinnedSources + rankedSources
+
+
+    def save_if_due(self):
+        if time.monotonic() - self.saveTime >= DICT_SOURCE_STATS_SAVE_INTERVAL_SEC:
+            self.save()
+
+
+    def save(self):
+        with self.lock:
+            statsText = json.dumps(self.stats, indent=2, sort_keys=True)
+            self.saveTime = time.monotonic()
+
+        try:
+            os.makedirs(os.path.dirname(self.statsFile), exist_ok=True)
+            tempStatsFile = self.statsFile + ".tmp"
+            with open(tempStatsFile, 'w') as statsFileHandle:
+                statsFileHandle.write(statsText)
+            os.replace(tempStatsFile, self.statsFile)
+        except (IOError, OSError) as e:
+            coutput.print_debug("Unable to save source statistics to {0} :: {1}".format(self.statsFile, e))
+
+
+def get_source_key(dictSource):
+    return dictSource.__name__.rsplit('.', 1)[-1]
+
+
+# Statistics are loaded on first lookup
+dictSourceStats = None
+
+
+def get_source_stats():
+    global dictSourceStats
+
+    if dictSourceStats is None:
+        dictSourceStats = DictionarySourceStats(DICT_SOURCE_STATS_FILE)
+        atexit.register(dictSourceStats.save)
+
+    return dictSourceStats
+
 
 ################################################################
-# Dictionary Configuration Variables
+# Dictionary Lookup Functions
 ################################################################
 
+def fetch_source_entry(connectionPool, dictSource, word, cancelEvent):
+    # Returns None if cancelled, once higher ranked sources have answered
+    # Errors of a source, e.g. when unreachable or changed, are recorded as misses, so that it is ranked lower
+
+    sourceKey = get_source_key(dictSource)
+    sourceStats = get_source_stats()
+
+    if cancelEvent.is_set():
+        return None
+
+    requestStartTime = time.monotonic()
+    try:
+        dictEntryText = dictSource.get_dictionary_entry(connectionPool, word)
+    except Exception as e:
+        coutput.print_debug("Unable to lookup {0} in {1} :: {2}".format(word, sourceKey, e))
+        sourceStats.record_request(sourceKey, time.monotonic() - requestStartTime)
+        sourceStats.record_lookup(sourceKey, False, False)
+        return [dictSource.get_dictionary_source(), [], "", ""]
+
+    sourceStats.record_request(sourceKey, time.monotonic() - requestStartTime)
+
+    try:
+        if cancelEvent.is_set():
+            return None
+        currentDefinitions = dictSource.parse_word_definition(word, dictEntryText)
+
+        if cancelEvent.is_set():
+            return None
+        [currentClipWord, currentClipURL] = dictSource.parse_word_clip(word, dictEntryText)
+
+    except Exception as e:
+        coutput.print_debug("Unable to parse entry of {0} from {1} :: {2}".format(word, sourceKey, e))
+        sourceStats.record_lookup(sourceKey, False, False)
+        return [dictSource.get_dictionary_source(), [], "", ""]
+
+    sourceStats.record_lookup(sourceKey, len(currentDefinitions) > 0, currentClipWord != "")
+    return [dictSource.get_dictionary_source(), currentDefinitions, currentClipWord, currentClipURL]
+
+
 def fetch_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "fetch_dictionary_entry"
 
     wordDefinitionSource = ""
     wordDefinitions = []
-    wordDefinitionFound = False
 
     pronunciationSource = ""
     pronunciationWord = ""
     pronunciationURL = ""
-    wordPronunciationFound = False
 
-    for dictSource in PRIORITIZED_DICT_SOURCES:
-        dictEntryText = dictSource.get_dictionary_entry(connectionPool, word)
+    sourceStats = get_source_stats()
+    definitionSources = sourceStats.rank_sources(PRIORITIZED_DICT_SOURCES, 'definitions')
+    clipSources = sourceStats.rank_sources(PRIORITIZED_DICT_SOURCES, 'clips')
 
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'dictSource')
+    # Query sources concurrently, starting with those ranked highest for either definitions or clips,
+    # but consume results in ranked order
+    fetchSources = sorted(definitionSources, key=lambda dictSource: min(definitionSources.index(dictSource), clipSources.index(dictSource)))
+    cancelEvent = threading.Event()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=DICT_FETCH_MAX_WORKERS)
 
-        if wordDefinitionFound == False:
-            currentDefinitions = dictSource.parse_word_definition(word, dictEntryText)
+    try:
+        entryFutures = {}
+        for dictSource in fetchSources:
+            entryFutures[dictSource] = executor.submit(fetch_source_entry, connectionPool, dictSource, word, cancelEvent)
+
+        for dictSource in definitionSources:
+            [currentSource, currentDefinitions, currentClipWord, currentClipURL] = entryFutures[dictSource].result()
             if len(currentDefinitions) > 0:
-                wordDefinitionSource = dictSource.get_dictionary_source()
+                wordDefinitionSource = currentSource
                 wordDefinitions = currentDefinitions
-                wordDefinitionFound = True
 
-                coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'wordDefinitionSource')
+                coutput.print_watcher('wordDefinitionSource')
+                break
 
-        if wordPronunciationFound == False:
-            [currentClipWord, currentClipURL] = dictSource.parse_word_clip(word, dictEntryText)
+        for dictSource in clipSources:
+            [currentSource, currentDefinitions, currentClipWord, currentClipURL] = entryFutures[dictSource].result()
             if currentClipWord != "":
-                pronunciationSource = dictSource.get_dictionary_source()
+                pronunciationSource = currentSource
                 [pronunciationWord, pronunciationURL] = [currentClipWord, currentClipURL]
-                wordPronunciationFound = True
 
-                coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'pronunciationSource')
+                coutput.print_watcher('pronunciationSource')
+                break
 
-        if wordDefinitionFound == True and wordPronunciationFound == True:
-            break
+    finally:
+        # Cancel outstanding lookups of lower ranked sources without waiting on their downloads
+        # Lookups already started skip their remaining request and parse steps
+        cancelEvent.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        sourceStats.save_if_due()
 
     return [word, wordDefinitions, wordDefinitionSource, pronunciationWord, pronunciationURL, pronunciationSource]
 
 
 def display_dictionary_entry(connectionPool, pronAudioOutput, pronLoopCount, pronLoopDelaySec, word, currentDefinitions, source, currentClipWord, currentClipURL, pronSource):
-    print ""
+    print("")
 
     if len(currentDefinitions) == 0:
         displayMessage = "No definitions available for {WORD}".format(WORD=word)
@@ -127,7 +303,7 @@ def display_dictionary_entry(connectionPool, pronAudioOutput, pronLoopCount, pro
         displayMessage = "Definition of {WORD} from {SOURCE}:".format(WORD=word, SOURCE=source)
         coutput.print_color(HEADER_TEXT_COLOR, displayMessage)
         for definition in currentDefinitions:
-            print u"{BULLET}{ITEM}".format(BULLET=DICT_LIST_BULLET, ITEM=definition)
+            print("{BULLET}{ITEM}".format(BULLET=DICT_LIST_BULLET, ITEM=definition))
 
     if currentClipWord == "":
         displayMessage = "No pronunciation available for {WORD}".format(WORD=word)
@@ -135,13 +311,11 @@ def display_dictionary_entry(connectionPool, pronAudioOutput, pronLoopCount, pro
     else:
         displayMessage = "Pronunciation of {WORD} from {SOURCE}:".format(WORD=currentClipWord, SOURCE=pronSource)
         coutput.print_color(SECTION_TEXT_COLOR, displayMessage)
-        print u"{BULLET}{ITEM}".format(BULLET=DICT_LIST_BULLET, ITEM=currentClipURL)
+        print("{BULLET}{ITEM}".format(BULLET=DICT_LIST_BULLET, ITEM=currentClipURL))
         cfile.play_url(connectionPool, currentClipURL, pronAudioOutput, pronLoopCount, pronLoopDelaySec)
 
 
 def lookup_word(connectionPool, pronAudioOutput, pronLoopCount, pronLoopDelaySec, word, *lookupSource):
-    _FUNC_NAME_ = "lookup_word"
-
     isError = False
 
     dictSources = []
@@ -164,13 +338,13 @@ def lookup_word(connectionPool, pronAudioOutput, pronLoopCount, pronLoopDelaySec
         else:                
             dictSources.append(DICT_SOURCES[lookupSource[0].lower()])
 
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'dictSources')
+        coutput.print_watcher('dictSources')
 
         for dictSource in dictSources:
             source = dictSource.get_dictionary_source()
             pronSource = dictSource.get_dictionary_source()
 
-            coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'source')
+            coutput.print_watcher('source')
 
             dictEntryText = dictSource.get_dictionary_entry(connectionPool, word)
             currentDefinitions = dictSource.parse_word_definition(word, dictEntryText)
@@ -179,11 +353,11 @@ def lookup_word(connectionPool, pronAudioOutput, pronLoopCount, pronLoopDelaySec
             display_dictionary_entry(connectionPool, pronAudioOutput, pronLoopCount, pronLoopDelaySec, word, currentDefinitions, source, currentClipWord, currentClipURL, pronSource)
 
     else:
-        print ""
+        print("")
         displayMessage = "ERROR: Unable to lookup {WORD}. Dictionary source {SOURCE} not supported".format(WORD=word, SOURCE=lookupSource[0])
         coutput.print_color(ERROR_TEXT_COLOR, displayMessage)
 
-    print ""
+    print("")
 
 ########################################################################
 # Sample application to test the python module
@@ -212,15 +386,15 @@ for word in []:
 for word in []:
 #for word in ['cloud', 'klompen', 'fiery', 'incorruptible', 'sakura']:
     entry = fetch_dictionary_entry(connectionPool, word)
-    print entry[0]
-    #print entry[1]
+    print(entry[0])
+    #print(entry[1])
     for definition in entry[1]:
-        print definition
-    print entry[2]
-    print entry[3]
-    print entry[4]
-    print entry[5]
-    print ""
+        print(definition)
+    print(entry[2])
+    print(entry[3])
+    print(entry[4])
+    print(entry[5])
+    print("")
 
 connectionPool.clear()
 '''
@@ -231,5 +405,5 @@ connectionPool.clear()
 
 '''
 cd ~/projects/raspi/common/rpimod/wordproc/dict
-sudo python dictionary.py
+sudo python3 dictionary.py
 '''
\ No newline at end of file
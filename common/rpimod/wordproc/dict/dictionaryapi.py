@@ -19,13 +19,11 @@
 ################################################################
 
 import sys
+import os
 import re
-import urllib3
 import copy
-import pkg_resources
 
 #from abc import ABCMeta, abstractmethod, abstractproperty
-from bs4 import BeautifulSoup
 
 sys.path.insert(0, "..")
 import common.rpimod.stdio.output as coutput
@@ -42,6 +40,9 @@ APP_DEBUG_MODE_ENABLED = False
 DICT_UNICODE_EMPTY_STR = ""
 DICT_UNICODE_FALLBACK_STR = "<None>"
 
+# Matches special prefixes (e.g. *) and trailing periods/spaces ignored when comparing definitions
+DICT_DEFINITION_KEY_PATTERN = re.compile(r'(^[^\(a-zA-Z0-9]|[\. ]+$)', flags=re.IGNORECASE)
+
 
 def format_txt(caption, element):
     if type(element) is not list:
@@ -77,6 +78,10 @@ def format_obj(caption, element):
     return elementText
 
 
+def definition_key(definition):
+    return DICT_DEFINITION_KEY_PATTERN.sub(DICT_UNICODE_EMPTY_STR, definition)
+
+
 ################################################################
 # Exception Classes
 ################################################################
@@ -438,21 +443,14 @@ class SimplifiedWordEntry(object):
 
             # Process definitions
             # Remove duplicate definitions
-            for override in overrideDefinitions:
-                
-                # Handle overrides that are marked special by the application using a prefix e.g. *
-                override_text = re.sub(r'(^[^\(a-zA-Z0-9]|[\. ]+$)', DICT_UNICODE_EMPTY_STR, override, flags=re.IGNORECASE)
-                coutput.print_watcher('override')
-                coutput.print_watcher('override_text')
-
-                for definition in self.definitions:
-                    definition_text = re.sub(r'(^[^\(a-zA-Z0-9]|[\. ]+$)', DICT_UNICODE_EMPTY_STR, definition, flags=re.IGNORECASE)
-                    coutput.print_watcher('definition')
-                    coutput.print_watcher('definition_text')
-                    if definition_text == override_text:
-                        self.definitions.remove(definition)
-                        coutput.print_debug("Removed duplicate definition")
-            
+            # Handle overrides that are marked special by the application using a prefix e.g. *
+            overrideKeys = set(definition_key(override) for override in overrideDefinitions)
+            coutput.print_watcher('overrideKeys')
+
+            definitionCount = len(self.definitions)
+            self.definitions = [definition for definition in self.definitions if definition_key(definition) not in overrideKeys]
+            coutput.print_debug("Removed {0} duplicate definitions".format(definitionCount - len(self.definitions)))
+
             # Override definitions
             self.definitions = overrideDefinitions + self.definitions
 
@@ -532,6 +530,18 @@ class DictionaryConfig(object):
         self.pronunciation_guide = []
         self.element_match_patterns = {}
         self.entry_match_patterns = {}
+        self.entry_content_pattern = None
+
+
+    def has_entry_content(self, entry_raw_text):
+
+        # Check for entry content without parsing e.g. to skip override placeholders
+        if entry_raw_text is None or entry_raw_text.strip() == DICT_UNICODE_EMPTY_STR:
+            return False
+        elif self.entry_content_pattern is None:
+            return True
+        else:
+            return self.entry_content_pattern.search(entry_raw_text) is not None
 
 
     def is_required_element(self, element):
@@ -550,7 +560,7 @@ class DictionaryConfig(object):
                         elementValList = []
                         if isinstance(element[elementAttr], str):
                             elementValList.append(element[elementAttr])
-                        elif type(element[elementAttr]) is list:
+                        elif isinstance(element[elementAttr], list):
                             elementValList = elementValList + element[elementAttr]
 
                         for elementVal in elementValList:
@@ -577,7 +587,7 @@ class DictionaryConfig(object):
                         elementValList = []
                         if isinstance(element[elementAttr], str):
                             elementValList.append(element[elementAttr])
-                        elif type(element[elementAttr]) is list:
+                        elif isinstance(element[elementAttr], list):
                             elementValList = elementValList + element[elementAttr]
 
                         for elementVal in elementValList:
@@ -597,7 +607,8 @@ class DictionaryConfig(object):
 
         pronunciation_guide = []
         if self.pronunciation_guide_file != DICT_UNICODE_EMPTY_STR:
-            guideFile = pkg_resources.resource_filename( __name__, self.pronunciation_guide_file)
+            # Resolved relative to this module as by pkg_resources.resource_filename, which is slow to import
+            guideFile = os.path.join(os.path.dirname(os.path.abspath(__file__)), self.pronunciation_guide_file)
             pronunciation_guide = cfile.read(guideFile).splitlines()
 
         return pronunciation_guide
@@ -630,13 +641,38 @@ class DictionaryEntry(object):
         self.config = dict_config
 
         # Lexical Attributes
+        # Word entries and simplified word entry are parsed on first access
         self.key_word = key_word
         self.entry_raw_text = entry_raw_text
-        self.word_entries = []
-        self.simplified_word_entry = None
+        self._word_entries = None
+        self._simplified_word_entry = None
+
+
+    @property
+    def word_entries(self):
+        if self._word_entries is None:
+            self._word_entries = []
+            if self.has_content():
+                self.set_word_entries()
+
+        return self._word_entries
+
+
+    @property
+    def simplified_word_entry(self):
+        if self._simplified_word_entry is None:
+            self.set_simplified_word_entry()
+
+        return self._simplified_word_entry
+
+
+    @simplified_word_entry.setter
+    def simplified_word_entry(self, simplified_word_entry):
+        self._simplified_word_entry = simplified_word_entry
+
 
-        self.set_word_entries()
-        self.set_simplified_word_entry()
+    def has_content(self):
+        return self.config.has_entry_content(self.entry_raw_text)
 
 
     def build_audio_url(self, url_fragment):
@@ -27,53 +27,52 @@ import common.rpimod.wordproc.dict.generic as cdict
 ################################################################
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
 
-def initialize_source():
-    cdict.DICT_SOURCE_NAME = unicode("The Free Dictionary by Farlex", 'utf-8')
-    cdict.DICT_ENTRY_URL = unicode("http://www.thefreedictionary.com/{WORD}", 'utf-8')
-    cdict.DICT_AUDIO_URL = unicode("http://img2.tfd.com/pron/mp3/{PATH}.mp3", 'utf-8')
+class DictionaryConfig(cdict.DictionaryConfig):
+    def __init__(self):
 
-    cdict.DICT_CLEAN_TEXT_PATTERNS = [
-    r'<div class="sds-list">.*?<span lang=.*?</div>',
-    r'<span class="illustration">.*?</span>',
-    r'<script.*?>.*?</script>',
-    r'<style.*?>.*?</style>'
-    ]
-    cdict.DICT_CLEAN_INNER_TEXT_PATTERNS = []
-    cdict.DICT_CLEAN_OUTER_TEXT_PATTERNS = []
+        # Configuration Attributes
+        self.name = "The Free Dictionary by Farlex"
+        self.entry_url_format = "http://www.thefreedictionary.com/{WORD}"
+        self.audio_url_format = "http://img2.tfd.com/pron/mp3/{PATH}.mp3"
 
-    # The dictionary definition line is identified by the HTML tag '<div class="sds-list"><b>a. </b>....</div>'
-    # The pronunciation audio line is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
-    # The pronunciation audio header word is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
-    cdict.DICT_MARKER_DEFINITION = [
-    [r'<div class="sds-list"><b>.*?</b>\s*', r'\s*</div>']
-    ]
-    cdict.DICT_MARKER_PRONUNCIATION_URL = [r'data-snd="', r'"']
-    cdict.DICT_MARKER_PRONUNCIATION_WORD = [r'<h1>', r'</h1>']
+        self.clean_text_patterns = [
+        r'<div class="sds-list">.*?<span lang=.*?</div>',
+        r'<span class="illustration">.*?</span>',
+        r'<script.*?>.*?</script>',
+        r'<style.*?>.*?</style>'
+        ]
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = []
+
+        # The dictionary definition line is identified by the HTML tag '<div class="sds-list"><b>a. </b>....</div>'
+        # The pronunciation audio line is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
+        # The pronunciation audio header word is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
+        self.definition_markers = [
+        [r'<div class="sds-list"><b>.*?</b>\s*', r'\s*</div>']
+        ]
+        self.pronunciation_url_marker = [r'data-snd="', r'"']
+        self.pronunciation_word_marker = [r'<h1>', r'</h1>']
+
+
+DICT_EXTRACTOR = cdict.DictionaryExtractor(DictionaryConfig())
 
 
 def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
-    initialize_source()
-    return cdict.get_dictionary_source()
+    return DICT_EXTRACTOR.get_dictionary_source()
 
 
 def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
-    initialize_source()
-    return cdict.get_dictionary_entry(connectionPool, word)
+    return DICT_EXTRACTOR.get_dictionary_entry(connectionPool, word)
 
 
 def parse_word_definition(word, entryText):
-    _FUNC_NAME_ = "parse_word_definition"
-    initialize_source()
-    return cdict.parse_word_definition(word, entryText)
+    return DICT_EXTRACTOR.parse_word_definition(word, entryText)
 
 
 def parse_word_clip(word, entryText):
-    _FUNC_NAME_ = "parse_word_clip"
-    initialize_source()
-    return cdict.parse_word_clip(word, entryText)
+    return DICT_EXTRACTOR.parse_word_clip(word, entryText)
 
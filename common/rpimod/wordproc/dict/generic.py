@@ -10,6 +10,7 @@
 
 import sys
 import re
+import functools
 import urllib3.exceptions
 
 #sys.path.insert(0, "/home/pi/projects/raspi")
@@ -18,127 +19,124 @@ import common.rpimod.stdio.output as coutput
 import common.rpimod.wordproc.textparser as cparser
 
 ################################################################
-# Dictionary Configuration Variables
+# Internal variables
 ################################################################
 
-DICT_SOURCE_NAME = unicode("", 'utf-8')
-DICT_ENTRY_URL = unicode("{WORD}", 'utf-8')
-DICT_AUDIO_URL = unicode("{PATH}", 'utf-8')
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+DICT_UNICODE_EMPTY_STR = ""
+DICT_UNICODE_NEWLINE_STR = "\n"
 
-DICT_CLEAN_TEXT_PATTERNS = []
-DICT_CLEAN_INNER_TEXT_PATTERNS = []
-DICT_CLEAN_OUTER_TEXT_PATTERNS = []
+# Number of cleansed entries retained per source for reuse across definition and clip extraction
+DICT_CLEANSED_ENTRY_CACHE_SIZE = 32
 
-DICT_MARKER_DEFINITION = []
-DICT_MARKER_PRONUNCIATION_URL = []
-DICT_MARKER_PRONUNCIATION_WORD = []
 
 ################################################################
-# Internal variables
+# Dictionary Configuration
 ################################################################
 
-# Set to True to turn debug messages on
-ERR_DEBUG = False
+class DictionaryConfig(object):
+    def __init__(self):
 
-DICT_UNICODE_EMPTY_STR = unicode("", 'utf-8')
-DICT_UNICODE_NEWLINE_STR = unicode("\n", 'utf-8')
+        # Configuration Attributes
+        self.name = DICT_UNICODE_EMPTY_STR
+        self.entry_url_format = "{WORD}"
+        self.audio_url_format = "{PATH}"
 
+        self.clean_text_patterns = []
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = []
 
-def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
+        self.definition_markers = []
+        self.pronunciation_url_marker = []
+        self.pronunciation_word_marker = []
 
-    return DICT_SOURCE_NAME
 
+################################################################
+# Dictionary Extractor
+################################################################
 
-def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
-
-    # Download dictionary entry
-    dictEntryURL = DICT_ENTRY_URL.format(WORD=word).replace(" ", "%20")
-    dictEntryURL = dictEntryURL.encode('utf-8')             # Handle URL strings in ascii
+class DictionaryExtractor(object):
+    """
+    Fetches and parses dictionary entries as described by a DictionaryConfig.
+    Extractors hold no per-lookup state, hence a single instance may be used from several threads.
+    """
+    def __init__(self, config):
+        self.config = config
+        self.cleanser = cparser.get_text_cleanser(config.clean_text_patterns, config.clean_inner_text_patterns, config.clean_outer_text_patterns)
 
-    DEBUG_VAR="dictEntryURL"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(dictEntryURL)))
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+        # Cleansed text is memoised per entry, so that definition and clip extraction
+        # on the same entry share a single cleansing pass
+        self.cleanse_entry_text = functools.lru_cache(maxsize=DICT_CLEANSED_ENTRY_CACHE_SIZE)(self.cleanser.cleanse)
 
-    try:
-        dictEntryResponse = connectionPool.urlopen('GET', dictEntryURL)
 
-        DEBUG_VAR="dictEntryResponse.data"
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(dictEntryResponse.data)))
-        #coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+    def get_dictionary_source(self):
+        return self.config.name
 
-        responseText = dictEntryResponse.data
 
-    except urllib3.exceptions.MaxRetryError:
-        responseText = ""
+    def get_dictionary_entry_url(self, word):
+        return self.config.entry_url_format.format(WORD=word).replace(" ", "%20")
 
-    DEBUG_VAR="responseText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(responseText)))
 
-    # Convert entry text to unicode
-    if isinstance(responseText, str):
-        responseText = unicode(responseText, 'utf-8')
+    def get_dictionary_entry(self, connectionPool, word):
 
-    DEBUG_VAR="responseText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(responseText)))
+        # Download dictionary entry
+        dictEntryURL = self.get_dictionary_entry_url(word)
+        coutput.print_watcher('dictEntryURL')
 
-    return responseText
+        try:
+            dictEntryResponse = connectionPool.urlopen('GET', dictEntryURL)
+            responseText = dictEntryResponse.data
 
+        except urllib3.exceptions.MaxRetryError:
+            responseText = DICT_UNICODE_EMPTY_STR
 
-def parse_word_definition(word, entryText):
-    _FUNC_NAME_ = "parse_word_definition"
+        # Convert entry text to unicode
+        if isinstance(responseText, bytes):
+            responseText = responseText.decode('utf-8', errors='replace')
 
-    searchWord = word
-    wordDefinitions = []
+        coutput.print_debug("responseText :: {0}".format(type(responseText)))
+        return responseText
 
-    DEBUG_VAR="entryText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(entryText)))
 
-    sourceText = cparser.cleanse_text(entryText, DICT_CLEAN_TEXT_PATTERNS, DICT_CLEAN_INNER_TEXT_PATTERNS, DICT_CLEAN_OUTER_TEXT_PATTERNS)
+    def parse_word_definition(self, word, entryText):
 
-    DEBUG_VAR="sourceText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(sourceText)))
-    
-    for marker in DICT_MARKER_DEFINITION:
-        wordDefinitions = wordDefinitions + cparser.find_enclosed_text(marker[0], marker[1], sourceText)
+        searchWord = word
+        wordDefinitions = []
 
-    DEBUG_VAR="wordDefinitions"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(wordDefinitions)))
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+        sourceText = self.cleanse_entry_text(entryText)
 
-    return wordDefinitions
+        for marker in self.config.definition_markers:
+            wordDefinitions = wordDefinitions + cparser.find_enclosed_text(marker[0], marker[1], sourceText)
 
+        coutput.print_watcher('wordDefinitions')
+        return wordDefinitions
 
-def parse_word_clip(word, entryText):
-    _FUNC_NAME_ = "parse_word_clip"
 
-    searchWord = word
-    
-    pronunciationURLs = []
-    pronunciationURL =  DICT_UNICODE_EMPTY_STR
+    def parse_word_clip(self, word, entryText):
 
-    pronunciationWords = []
-    pronunciationWord = DICT_UNICODE_EMPTY_STR
+        searchWord = word
 
-    DEBUG_VAR="entryText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(entryText)))
+        pronunciationURLs = []
+        pronunciationURL =  DICT_UNICODE_EMPTY_STR
 
-    sourceText = cparser.cleanse_text(entryText, DICT_CLEAN_TEXT_PATTERNS, DICT_CLEAN_INNER_TEXT_PATTERNS, DICT_CLEAN_OUTER_TEXT_PATTERNS)
+        pronunciationWords = []
+        pronunciationWord = DICT_UNICODE_EMPTY_STR
 
-    DEBUG_VAR="sourceText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(sourceText)))
+        sourceText = self.cleanse_entry_text(entryText)
 
-    pronunciationURLs = pronunciationURLs + cparser.find_enclosed_text(DICT_MARKER_PRONUNCIATION_URL[0], DICT_MARKER_PRONUNCIATION_URL[1], sourceText)
+        pronunciationURLs = pronunciationURLs + cparser.find_enclosed_text(self.config.pronunciation_url_marker[0], self.config.pronunciation_url_marker[1], sourceText)
 
-    if len(pronunciationURLs) > 0:
-        pronunciationURL = DICT_AUDIO_URL.format(PATH=pronunciationURLs[0])
-        pronunciationWords = pronunciationWords + cparser.find_enclosed_text(DICT_MARKER_PRONUNCIATION_WORD[0], DICT_MARKER_PRONUNCIATION_WORD[1], sourceText)
+        if len(pronunciationURLs) > 0:
+            pronunciationURL = self.config.audio_url_format.format(PATH=pronunciationURLs[0])
+            pronunciationWords = pronunciationWords + cparser.find_enclosed_text(self.config.pronunciation_word_marker[0], self.config.pronunciation_word_marker[1], sourceText)
 
-        if len(pronunciationWords) > 0:
-            pronunciationWord = pronunciationWords[0]
+            if len(pronunciationWords) > 0:
+                pronunciationWord = pronunciationWords[0]
 
-    return [pronunciationWord, pronunciationURL]
+        return [pronunciationWord, pronunciationURL]
 
 
 ########################################################################
@@ -150,16 +148,19 @@ def parse_word_clip(word, entryText):
 #DICT_USER_AGENT = {'user-agent': 'Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/48.0.2564.116 Safari/537.36'}
 #connectionPool = urllib3.PoolManager(10, headers=DICT_USER_AGENT)
 #
-#for word in [u'cloud', u'klompen', u'fiery', u'incorruptible', u'sakura', u'buckwagon']:
+#import common.rpimod.wordproc.dict.cambridge as cambridge
+#extractor = DictionaryExtractor(cambridge.DictionaryConfig())
+#
+#for word in ['cloud', 'klompen', 'fiery', 'incorruptible', 'sakura', 'buckwagon']:
 #
-#    print word
-#    htmlResponse = get_dictionary_entry(connectionPool, word)
+#    print(word)
+#    htmlResponse = extractor.get_dictionary_entry(connectionPool, word)
 #
-#    definitions = parse_word_definition(word, htmlResponse)
-#    print definitions
+#    definitions = extractor.parse_word_definition(word, htmlResponse)
+#    print(definitions)
 #
-#    audio = parse_word_clip(word, htmlResponse)
-#    print audio
+#    audio = extractor.parse_word_clip(word, htmlResponse)
+#    print(audio)
 #
 #connectionPool.clear()
 
@@ -176,8 +177,8 @@ def parse_word_clip(word, entryText):
 #print(requestResponse.data)
 
 #vText="blah <script> bad text bad text </script> blah blah blah blah <script> bad text bad text </script> blah blah blah blah blah blah blah <script> bad text bad text </script>"
-#vCleansedText = re.sub("<{0}>.*?</{0}>".format("script"), DICT_UNICODE_EMPTY_STR, vText
-#print vText
-#print vCleansedText
-#print re.search(r'<script>(.*?)</script>', vText).group()
-#print re.search(r'<script>(.*?)</script>', vText).group(1)
+#vCleansedText = re.sub("<{0}>.*?</{0}>".format("script"), DICT_UNICODE_EMPTY_STR, vText)
+#print(vText)
+#print(vCleansedText)
+#print(re.search(r'<script>(.*?)</script>', vText).group())
+#print(re.search(r'<script>(.*?)</script>', vText).group(1))
@@ -16,119 +16,103 @@
 ################################################################
 
 import sys
-#import re
-import merriamwebsterapi as api
+import functools
 
 sys.path.insert(0, "../../../..")
 import common.rpimod.stdio.output as coutput
-
-# Set to True to turn debug messages on
-ERR_DEBUG = False
+import common.rpimod.wordproc.dict.generic as cdict
+import common.rpimod.wordproc.dict.merriamwebsterapi as api
 
 ################################################################
-# Dictionary Configuration Variables
+# Internal variables
 ################################################################
 
-DICT_SOURCE_NAME = unicode("Merriam-Webster's Collegiate Dictionary", 'utf-8')
-DICT_ENTRY_URL = unicode("http://www.dictionaryapi.com/api/v1/references/collegiate/xml/{WORD}?key={KEY}", 'utf-8')
-DICT_AUDIO_URL = unicode("http://media.merriam-webster.com/soundc11/{FOLDER}/{CLIP}", 'utf-8')
-DICT_KEY = unicode("cbbd4001-c94d-493a-ac94-7268a7e41f6f", 'utf-8')
-
-DICT_ASCII_EMPTY_STR = ""
-DICT_UNICODE_EMPTY_STR = unicode("", 'utf-8')
-
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
-def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
+DICT_KEY = "cbbd4001-c94d-493a-ac94-7268a7e41f6f"
 
-    return DICT_SOURCE_NAME
+DICT_UNICODE_EMPTY_STR = ""
 
+# Number of parsed entries retained for reuse across definition and clip extraction
+DICT_PARSED_ENTRY_CACHE_SIZE = 32
 
-def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
 
-    # Download dictionary entry
-    dictEntryURL = DICT_ENTRY_URL.format(WORD=word, KEY=DICT_KEY).replace(" ", "%20")
-    dictEntryURL = dictEntryURL.encode('utf-8')             # Handle URL strings in ascii
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'dictEntryURL')
+class DictionaryConfig(cdict.DictionaryConfig):
+    def __init__(self):
 
-    dictEntryResponse = connectionPool.request('GET', dictEntryURL)
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'dictEntryResponse.data')
+        # Configuration Attributes
+        self.name = "Merriam-Webster's Collegiate Dictionary"
+        self.entry_url_format = "http://www.dictionaryapi.com/api/v1/references/collegiate/xml/{WORD}?key=" + DICT_KEY
+        self.audio_url_format = "http://media.merriam-webster.com/soundc11/{FOLDER}/{CLIP}"
 
-    # Convert XML to unicode
-    if isinstance(dictEntryResponse.data, str):
-        outputXML = unicode(dictEntryResponse.data, 'utf-8')
-    else:
-        outputXML = dictEntryResponse.data
+        # Entries are parsed as XML by the Collegiate Dictionary API instead of text markers
+        self.clean_text_patterns = []
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = []
 
-    return outputXML
+        self.definition_markers = []
+        self.pronunciation_url_marker = []
+        self.pronunciation_word_marker = []
 
 
-def parse_word_definition(word, entryXML):
-    _FUNC_NAME_ = "parse_word_definition"
-    searchWord = word
+class DictionaryExtractor(cdict.DictionaryExtractor):
+    """
+    Parses Merriam-Webster's Collegiate Dictionary XML entries using a single API object.
+    Parsed entries are memoised per entry text, so that definition and clip extraction
+    on the same entry share a single parse.
+    """
+    def __init__(self, config):
+        cdict.DictionaryExtractor.__init__(self, config)
+        self.dictionary = api.CollegiateDictionary(DICT_KEY)
+        self.lookup_entries = functools.lru_cache(maxsize=DICT_PARSED_ENTRY_CACHE_SIZE)(self.parse_entries)
 
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'entryXML')
 
-    sourceXML = entryXML
-    if isinstance(sourceXML, unicode):
-        sourceXML = sourceXML.encode('utf-8')
+    def parse_entries(self, word, entryXML):
+        # Returns a tuple of parsed entries, which is empty if the word is not found
 
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'sourceXML')
+        try:
+            return tuple(self.dictionary.lookup(word, entryXML))
+        except api.WordNotFoundException:
+            return ()
 
-    wordDefinition = []
-    dictionary = api.CollegiateDictionary(DICT_KEY)
-    
-    try:
-        entries = dictionary.lookup(searchWord, sourceXML)
-        for entry in entries:
-            for sense in entry.senses:
 
-                coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'sense.definition')
+    def parse_word_definition(self, word, entryXML):
 
-                strDefinition = unicode("({0}) {1}", 'utf-8').format(entry.function, sense.definition)
-                if isinstance(strDefinition, str):
-                    wordDefinition.append(unicode(strDefinition, 'utf-8'))
-                else:
-                    wordDefinition.append(strDefinition)
+        coutput.print_watcher('entryXML')
 
-    except api.WordNotFoundException:
         wordDefinition = []
+        for entry in self.lookup_entries(word, entryXML):
+            for sense in entry.senses:
+                coutput.print_watcher('sense.definition')
+                wordDefinition.append("({0}) {1}".format(entry.function, sense.definition))
 
-    return wordDefinition
-
+        return wordDefinition
 
-# todo: Improve lookup/pronunciation with root word match e.g. idiosyncratic <uor>
-# todo: Add pronunciation support for word inflections
 
-def parse_word_clip(word, entryXML):
-    _FUNC_NAME_ = "parse_word_clip"
-    searchWord = word
+    # todo: Improve lookup/pronunciation with root word match e.g. idiosyncratic <uor>
+    # todo: Add pronunciation support for word inflections
 
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'entryXML')
+    def parse_word_clip(self, word, entryXML):
+        searchWord = word
 
-    sourceXML = entryXML
-    if isinstance(sourceXML, unicode):
-        sourceXML = sourceXML.encode('utf-8')
+        coutput.print_watcher('entryXML')
 
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'sourceXML')
+        entries = self.lookup_entries(searchWord, entryXML)
 
-    dictionary = api.CollegiateDictionary(DICT_KEY)
-
-    wordFound = False
-    audioClipFound = False
-    audioClip = DICT_UNICODE_EMPTY_STR
-    audioClipWord = DICT_UNICODE_EMPTY_STR
-    audioClipPron = DICT_UNICODE_EMPTY_STR
+        wordFound = False
+        audioClipFound = False
+        audioClip = DICT_UNICODE_EMPTY_STR
+        audioClipWord = DICT_UNICODE_EMPTY_STR
+        audioClipPron = DICT_UNICODE_EMPTY_STR
 
-    try:
         # Pass #1: Find matching headword spelling
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "Start of Pass #1")
+        coutput.print_debug("Start of Pass #1")
 
-        entries = dictionary.lookup(searchWord, sourceXML)
         for entry in entries:
 
-            coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'entry.spelling')
+            coutput.print_watcher('entry.spelling')
 
             if searchWord == entry.spelling:
                 for audio in entry.audio:
@@ -137,46 +121,44 @@ def parse_word_clip(word, entryXML):
                     wordFound = True
                     audioClip = audio
                     audioClipFound = True
-                    if wordFound:
-                        break
+                    break
             if wordFound:
                 break
 
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "End of Pass #1")
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'audioClipFound')
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'wordFound')
+        coutput.print_debug("End of Pass #1")
+        coutput.print_watcher('audioClipFound')
+        coutput.print_watcher('wordFound')
 
         # Pass #2: Find matching inflection
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "Start of Pass #2")
+        coutput.print_debug("Start of Pass #2")
         if audioClipFound == False:
             wordFound = False
             audioClip = DICT_UNICODE_EMPTY_STR
             audioClipWord = DICT_UNICODE_EMPTY_STR
             audioClipPron = DICT_UNICODE_EMPTY_STR
 
-            entries = dictionary.lookup(searchWord, sourceXML)
             for entry in entries:
 
-                coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'entry.spelling')
+                coutput.print_watcher('entry.spelling')
 
                 for inflection in entry.inflections:
 
-                    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'inflection.spellings')
+                    coutput.print_watcher('inflection.spellings')
 
                     for spelling in inflection.spellings:
 
-                        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'searchWord')
-                        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'spelling')
+                        coutput.print_watcher('searchWord')
+                        coutput.print_watcher('spelling')
 
                         if searchWord == spelling:
                             audioClipWord = spelling
                             wordFound = True
 
-                            coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'inflection.sound_urls')
+                            coutput.print_watcher('inflection.sound_urls')
 
                             for sound_url in inflection.sound_urls:
 
-                                coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'sound_url')
+                                coutput.print_watcher('sound_url')
 
                                 audioClip = sound_url
                                 audioClipFound = True
@@ -188,57 +170,59 @@ def parse_word_clip(word, entryXML):
                 if wordFound:
                     break
 
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "End of Pass #2")
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'audioClipFound')
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'wordFound')
+        coutput.print_debug("End of Pass #2")
+        coutput.print_watcher('audioClipFound')
+        coutput.print_watcher('wordFound')
 
         # Pass #3: Find pronunciation for first entry, if no match found
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "Start of Pass #3")
+        coutput.print_debug("Start of Pass #3")
         if audioClipFound == False:
             wordFound = False
             audioClip = DICT_UNICODE_EMPTY_STR
             audioClipWord = DICT_UNICODE_EMPTY_STR
             audioClipPron = DICT_UNICODE_EMPTY_STR
 
-            entries = dictionary.lookup(searchWord, sourceXML)
             for entry in entries:
                 for audio in entry.audio:
                     audioClipWord = entry.spelling
                     wordFound = True
                     audioClip = audio
                     audioClipFound = True
-                    if wordFound:
-                        break
+                    break
                 if wordFound:
                     break
-        
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "End of Pass #3")
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'audioClipFound')
-        coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'wordFound')
 
-    except api.WordNotFoundException:
-        audioClip = DICT_UNICODE_EMPTY_STR
-        audioClipWord = DICT_UNICODE_EMPTY_STR
-        audioClipPron = DICT_UNICODE_EMPTY_STR
+        coutput.print_debug("End of Pass #3")
+        coutput.print_watcher('audioClipFound')
+        coutput.print_watcher('wordFound')
 
-    if not audioClipFound:
-        audioClip = DICT_UNICODE_EMPTY_STR
-        audioClipWord = DICT_UNICODE_EMPTY_STR
-        audioClipPron = DICT_UNICODE_EMPTY_STR
+        if not audioClipFound:
+            audioClip = DICT_UNICODE_EMPTY_STR
+            audioClipWord = DICT_UNICODE_EMPTY_STR
+            audioClipPron = DICT_UNICODE_EMPTY_STR
 
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'searchWord')
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'audioClipWord')
-    coutput.print_watcher(ERR_DEBUG, _FUNC_NAME_, 'audioClip')
+        coutput.print_watcher('searchWord')
+        coutput.print_watcher('audioClipWord')
+        coutput.print_watcher('audioClip')
 
-    # Return audioClipWord and audioClip, if found
-    if isinstance(audioClipWord, str):
-        audioClipWord = unicode(audioClipWord, 'utf-8')
+        # Return audioClipWord and audioClip, if found
+        return [audioClipWord, audioClip, audioClipPron]
 
-    if isinstance(audioClip, str):
-        audioClip = unicode(audioClip, 'utf-8')
 
-    if isinstance(audioClipPron, str):
-        audioClipPron = unicode(audioClipPron, 'utf-8')
+DICT_EXTRACTOR = DictionaryExtractor(DictionaryConfig())
 
-    return [audioClipWord, audioClip, audioClipPron]
-    
\ No newline at end of file
+
+def get_dictionary_source():
+    return DICT_EXTRACTOR.get_dictionary_source()
+
+
+def get_dictionary_entry(connectionPool, word):
+    return DICT_EXTRACTOR.get_dictionary_entry(connectionPool, word)
+
+
+def parse_word_definition(word, entryXML):
+    return DICT_EXTRACTOR.parse_word_definition(word, entryXML)
+
+
+def parse_word_clip(word, entryXML):
+    return DICT_EXTRACTOR.parse_word_clip(word, entryXML)
@@ -20,28 +20,29 @@
 
 import sys
 import re
-import xml.etree.cElementTree as ElementTree
+import xml.etree.ElementTree as ElementTree
 
 from abc import ABCMeta, abstractmethod, abstractproperty
-from urllib import quote, quote_plus
-from urllib2 import urlopen
+from urllib.parse import quote, quote_plus
+from urllib.request import urlopen
 
 sys.path.insert(0, "..")
 import common.rpimod.stdio.output as coutput
 
 # Set to True to turn debug messages on
-SB_ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
 ################################################################
 # Dictionary Configuration Variables
 ################################################################
 
-DICT_SOURCE_NAME = unicode("Merriam-Webster's Collegiate Dictionary", 'utf-8')
-DICT_ENTRY_URL = unicode("http://www.dictionaryapi.com/api/v1/references/collegiate/xml/{WORD}?key={KEY}", 'utf-8')
-DICT_AUDIO_URL = unicode("http://media.merriam-webster.com/soundc11/{FOLDER}/{CLIP}", 'utf-8')
-DICT_KEY = unicode("cbbd4001-c94d-493a-ac94-7268a7e41f6f", 'utf-8')
+DICT_SOURCE_NAME = "Merriam-Webster's Collegiate Dictionary"
+DICT_ENTRY_URL = "http://www.dictionaryapi.com/api/v1/references/collegiate/xml/{WORD}?key={KEY}"
+DICT_AUDIO_URL = "http://media.merriam-webster.com/soundc11/{FOLDER}/{CLIP}"
+DICT_KEY = "cbbd4001-c94d-493a-ac94-7268a7e41f6f"
 
-DICT_UNICODE_EMPTY_STR = unicode("", 'utf-8')
+DICT_UNICODE_EMPTY_STR = ""
 
 ################################################################
 # Exception Classes
@@ -53,9 +54,9 @@ class WordNotFoundException(KeyError):
         if suggestions is None:
             suggestions = []
         self.suggestions = suggestions
-        message = unicode("'{0}' not found.", 'utf-8').format(word)
+        message = "'{0}' not found.".format(word)
         if suggestions:
-            message = unicode("{0} Try: {1}", 'utf-8').format(message, ", ".join(suggestions))
+            message = "{0} Try: {1}".format(message, ", ".join(suggestions))
         KeyError.__init__(self, message, *args, **kwargs)
 
 class InvalidResponseException(WordNotFoundException):
@@ -73,15 +74,13 @@ class InvalidAPIKeyException(Exception):
 # API Wrapper Class
 ################################################################
 
-class MWApiWrapper:
+class MWApiWrapper(metaclass=ABCMeta):
     """ Defines an interface for wrappers to Merriam Webster web APIs. """
 
-    __metaclass__ = ABCMeta
-
     def __init__(self, key=None, urlopen=urlopen):
         """ key is the API key string to use for requests. urlopen is a function
         that accepts a url string and returns a file-like object of the results
-        of fetching the url. defaults to urllib2.urlopen, and should throw """
+        of fetching the url. defaults to urllib.request.urlopen, and should throw """
         self.key = key
         self.urlopen = urlopen
 
@@ -186,9 +185,8 @@ class WordSense(object):
 
 class MWDictionaryEntry(object):
     def build_sound_url(self, fragment):
-        _FUNC_NAME_ = "build_sound_url"
 
-        coutput.print_watcher(SB_ERR_DEBUG, _FUNC_NAME_, 'fragment')
+        coutput.print_watcher('fragment')
 
         base_url = "http://media.merriam-webster.com/soundc11"
         number_prefix_match = re.search(r'^([0-9]+)', fragment)
@@ -282,7 +280,6 @@ class LearnersDictionary(MWApiWrapper):
 
     def _get_pronunciations(self, root):
         """ Returns list of IPA for regular and 'alternative' pronunciation. """
-        _FUNC_NAME_ = "LearnersDictionary._get_pronunciations"
 
         prons = root.find("./pr")
         pron_list = []
@@ -293,7 +290,7 @@ class LearnersDictionary(MWApiWrapper):
         if prons is not None:
             ps = self._flatten_tree(prons, exclude=['it'])
             pron_list.extend(ps)
-        coutput.print_watcher(SB_ERR_DEBUG, _FUNC_NAME_, '<ReplaceText>') 
+        coutput.print_watcher('pron_list')
         return [p.strip(', ') for p in pron_list]
 
     def _get_senses(self, root):
@@ -331,7 +328,6 @@ class LearnersDictionary(MWApiWrapper):
 class CollegiateDictionaryEntry(MWDictionaryEntry):
     
     def __init__(self, word, attrs):
-        _FUNC_NAME_ = "CollegiateDictionaryEntry.__init__"
 
         self.word = word
         self.headword = attrs.get('headword')
@@ -339,7 +335,7 @@ class CollegiateDictionaryEntry(MWDictionaryEntry):
         self.function = attrs.get('functional_label')
         
         self.pronunciation = attrs.get("pronunciation")
-        coutput.print_watcher(SB_ERR_DEBUG, _FUNC_NAME_, "self.pronunciation")
+        coutput.print_watcher("self.pronunciation")
 
         #self.pronunciations = attrs.get("pronunciations")     
         self.inflections = attrs.get("inflections")
@@ -374,24 +370,24 @@ class CollegiateDictionary(MWApiWrapper):
     base_url = "http://www.dictionaryapi.com/api/v1/references/collegiate"
 
     def parse_xml(self, root, word):
-        _FUNC_NAME_ = "CollegiateDictionary.parse_xml"
         for entry in root.findall('entry'):
             args = {}
             args['headword'] = entry.find('hw').text
-            args['spelling'] = re.sub("\*", "", entry.find('hw').text)
+            args['spelling'] = re.sub(r"\*", "", entry.find('hw').text)
             args['functional_label'] = getattr(entry.find('fl'), 'text', DICT_UNICODE_EMPTY_STR)
             
             args['pronunciation'] = getattr(entry.find('pr'), 'text', DICT_UNICODE_EMPTY_STR)
-            coutput.print_watcher(SB_ERR_DEBUG, _FUNC_NAME_, "args['pronunciation']") 
+            coutput.print_watcher("args['pronunciation']") 
             #args['pronunciations'] = self._get_pronunciations(entry)
             
-            args['inflections'] = self._get_inflections(entry)
-            args['senses'] = self._get_senses(entry)
+            # Inflections and senses are collected into lists, so that a parsed entry may be read more than once
+            args['inflections'] = list(self._get_inflections(entry))
+            args['senses'] = list(self._get_senses(entry))
             
             args['sound_fragments'] = [e.text for e in
                                               entry.findall("sound/wav")
                                               if e.text]
-            coutput.print_watcher(SB_ERR_DEBUG, _FUNC_NAME_, "args['sound_fragments']")
+            coutput.print_watcher("args['sound_fragments']")
 
             args['illustration_fragments'] = [e.text for e in
                                               entry.findall("art/bmp")
@@ -401,7 +397,6 @@ class CollegiateDictionary(MWApiWrapper):
 
     def _get_pronunciations(self, root):
         """ Returns list of IPA for regular and 'alternative' pronunciation. """
-        _FUNC_NAME_ = "CollegiateDictionary._get_pronunciations"
 
         prons = root.find("./pr")
         pron_list = []
@@ -409,7 +404,7 @@ class CollegiateDictionary(MWApiWrapper):
             ps = self._flatten_tree(prons, exclude=['it'])
             pron_list.extend(ps)
         
-        coutput.print_watcher(SB_ERR_DEBUG, _FUNC_NAME_, 'pron_list')
+        coutput.print_watcher('pron_list')
         return pron_list
 
     def _get_inflections(self, root):
@@ -417,14 +412,13 @@ class CollegiateDictionary(MWApiWrapper):
         inflection nodes that have <il>also</il> will have their inflected form
         added to the previous inflection entry.
         """
-        _FUNC_NAME_ = "CollegiateDictionary._get_inflections"
 
         dict_helper = MWDictionaryEntry()
 
         for node in root.findall("in"):
             label, forms, spellings, sound_fragments, sound_urls, pronunciations = None, [], [], [], [], []
             for child in node:
-                coutput.print_debug(SB_ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format("child.tag", child.tag))
+                coutput.print_debug("{0} :: {1}".format("child.tag", child.tag))
                 if child.tag == 'il':
                     if child.text in ['also', 'or']:
                         pass  # next form will be added to prev inflection-list
@@ -434,10 +428,10 @@ class CollegiateDictionary(MWApiWrapper):
                         label, forms, spellings, sound_fragments, sound_urls, pronunciations = child.text, [], [], [], [], []
                 if child.tag == 'if':
                     forms.append(child.text)
-                    spellings.append(re.sub("\*", "", child.text))
+                    spellings.append(re.sub(r"\*", "", child.text))
                 if child.tag == 'sound':
 
-                    coutput.print_debug(SB_ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format("child.find(\"wav\").text", child.find("wav").text))
+                    coutput.print_debug("{0} :: {1}".format("child.find(\"wav\").text", child.find("wav").text))
 
                     sound_fragments.append(child.find("wav").text)
                     sound_urls.append(dict_helper.build_sound_url(child.find("wav").text))
@@ -451,10 +445,10 @@ class CollegiateDictionary(MWApiWrapper):
             for child in node:
                 if child.tag == 'ure':
                     forms.append(child.text)
-                    spellings.append(re.sub("\*", "", child.text))
+                    spellings.append(re.sub(r"\*", "", child.text))
                 if child.tag == 'sound':
                     
-                    coutput.print_debug(SB_ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format("child.find(\"wav\").text", child.find("wav").text))
+                    coutput.print_debug("{0} :: {1}".format("child.find(\"wav\").text", child.find("wav").text))
 
                     sound_fragments.append(child.find("wav").text)
                     sound_urls.append(dict_helper.build_sound_url(child.find("wav").text))
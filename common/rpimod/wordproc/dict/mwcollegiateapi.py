@@ -10,8 +10,7 @@
 
 import sys
 import re
-
-from bs4 import BeautifulSoup
+import time
 
 sys.path.insert(0, "..")
 import common.rpimod.stdio.output as coutput
@@ -22,6 +21,49 @@ import common.rpimod.wordproc.dict.dictionaryapi as cdict
 #APP_DEBUG_MODE_ENABLED = True
 APP_DEBUG_MODE_ENABLED = False
 
+################################################################
+# Compiled Patterns
+################################################################
+
+# Patterns used while parsing every entry are compiled once
+DICT_PATTERNS = {
+    'audio_number_prefix': re.compile(r'^([0-9]+)'),
+    'audio_special_prefix': re.compile(r'^(gg|bix)'),
+    'entry_elements': re.compile(r'(hw|fl|pr|et|sound|def|cx|art)'),
+    'cross_entry_label': re.compile(r' of$', flags=re.UNICODE),
+    'definition_compare': re.compile(r'[ ]+—[ ]+(compare).*', flags=re.UNICODE),
+    'definition_text': re.compile(r'(?P<called>called also)|(?P<lead>^[ ]*:[ ]*)|(?P<colon>[ ]*:[\n ]*)|(?P<space>[ ]*\n[\n ]*|[ ]{2,})', flags=re.UNICODE)
+}
+
+DICT_DEFINITION_TEXT_REPLACEMENTS = {
+    'called': '- called also',
+    'lead': '',
+    'colon': '; ',
+    'space': ' '
+}
+
+
+def replace_definition_text(match):
+    return DICT_DEFINITION_TEXT_REPLACEMENTS[match.lastgroup]
+
+
+def normalize_definition_text(text):
+    """
+    Normalizes definition text in a single pass, equivalent to applying in turn:
+        'called also' -> '- called also'
+        '[ ]+—[ ]+(compare).*' -> ''
+        '^[ ]*:[ ]*' -> ''
+        '[ ]*:[ ]*' -> '; '
+        '[\n ]+' -> ' '
+    The colon separator also absorbs following line breaks, which the last step would have collapsed into it,
+    and single spaces, which the last step leaves unchanged, are not matched.
+    """
+    # Cross references are rare, hence only searched for when a dash is present
+    if '—' in text:
+        text = DICT_PATTERNS['definition_compare'].sub('', text)
+
+    return DICT_PATTERNS['definition_text'].sub(replace_definition_text, text)
+
 ################################################################
 # Merriam Webster Collegiate Dictionary
 ################################################################
@@ -42,6 +84,8 @@ class DictionaryConfig(cdict.DictionaryConfig):
         self.parser = "lxml"
         self.pronunciation_guide = self.build_pronunciation_guide()
         self.element_match_patterns = {}
+        self.entry_match_patterns = {}
+        self.entry_content_pattern = re.compile(r'<entry[ >]')
 
 
     def build_entry_url(self, key_word):
@@ -60,8 +104,8 @@ class DictionaryEntry(cdict.DictionaryEntry):
         if url_fragment == cdict.DICT_UNICODE_EMPTY_STR:
             return url_fragment
         else:
-            number_prefix_match = re.search(r'^([0-9]+)', url_fragment)
-            special_prefix_match = re.search(r'^(gg|bix)', url_fragment)
+            number_prefix_match = DICT_PATTERNS['audio_number_prefix'].search(url_fragment)
+            special_prefix_match = DICT_PATTERNS['audio_special_prefix'].search(url_fragment)
             if number_prefix_match:
                 prefix = "number"
             elif special_prefix_match:
@@ -190,13 +234,7 @@ class DictionaryEntry(cdict.DictionaryEntry):
             subElements = element.find_all(['dt'])
             for subElement in subElements:
                 subElementText = subElement.get_text().strip()
-
-                subElementText = re.sub(r'called also', '- called also', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(r'[ ]+—[ ]+(compare).*', '', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(r'^[ ]*:[ ]*', '', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(r'[ ]*:[ ]*', '; ', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(r'[\n ]+', ' ', subElementText, flags=re.UNICODE)
-                dtElementText = subElementText
+                dtElementText = normalize_definition_text(subElementText)
 
                 if dtElementText != cdict.DICT_UNICODE_EMPTY_STR:
                     ws = cdict.WordSense(dtElementText)
@@ -220,7 +258,7 @@ class DictionaryEntry(cdict.DictionaryEntry):
             
             if subelement.name == 'cl':
                 subElementText = subelement.get_text().strip()
-                subElementText = re.sub(r' of$', '', subElementText, flags=re.UNICODE)
+                subElementText = DICT_PATTERNS['cross_entry_label'].sub('', subElementText)
                 wordInfl.functional_label = subElementText
             elif subelement.name == 'ct':
                 wordInfl.senses.extend(self.build_senses(subelement))
@@ -231,8 +269,10 @@ class DictionaryEntry(cdict.DictionaryEntry):
 
     def set_word_entries(self):
 
+        # Imported on first parse, as BeautifulSoup is slow to import and not needed before the first lookup
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(self.entry_raw_text, self.config.parser)
-        nameFilter = re.compile(r'(hw|fl|pr|et|sound|def|cx|art)')
+        nameFilter = DICT_PATTERNS['entry_elements']
 
         for entry in soup.find_all('entry'):
             """
@@ -342,3 +382,35 @@ class DictionaryEntry(cdict.DictionaryEntry):
 
             coutput.print_watcher('wordEntry')
             self.word_entries.append(wordEntry)
+
+
+def benchmark_definition_text(entry_raw_text, iterations=1000):
+    """
+    Times normalization of all <dt> texts of an entry, by the single-pass transformer and by the
+    equivalent chain of substitutions, and reports whether both produce the same definitions.
+    """
+    def normalize_definition_text_chained(text):
+        text = re.sub(r'called also', '- called also', text, flags=re.UNICODE)
+        text = re.sub(r'[ ]+—[ ]+(compare).*', '', text, flags=re.UNICODE)
+        text = re.sub(r'^[ ]*:[ ]*', '', text, flags=re.UNICODE)
+        text = re.sub(r'[ ]*:[ ]*', '; ', text, flags=re.UNICODE)
+        text = re.sub(r'[\n ]+', ' ', text, flags=re.UNICODE)
+        return text
+
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(entry_raw_text, DictionaryConfig().parser)
+    dtTexts = [element.get_text().strip() for element in soup.find_all('dt')]
+    results = {}
+
+    for [normalizerName, normalizer] in [['single-pass', normalize_definition_text], ['chained', normalize_definition_text_chained]]:
+        startTime = time.perf_counter()
+        for iteration in range(iterations):
+            definitions = [normalizer(dtText) for dtText in dtTexts]
+        results[normalizerName] = [(time.perf_counter() - startTime) / iterations, definitions]
+
+    print("Definitions per entry: {0}".format(len(dtTexts)))
+    for normalizerName in results:
+        print("{0:<12}: {1:.2f}us per entry".format(normalizerName, results[normalizerName][0] * 1000000))
+    print("Identical definitions: {0}".format(results['single-pass'][1] == results['chained'][1]))
+
+    return results
@@ -10,17 +10,22 @@
 
 import sys
 import re
+import time
 
 from bs4 import BeautifulSoup
+from lxml import etree
 
 sys.path.insert(0, "..")
 import common.rpimod.stdio.output as coutput
-import dictionaryapi as cdict
-import mwcollegiateapi as cparentdict
+import common.rpimod.wordproc.dict.dictionaryapi as cdict
+import common.rpimod.wordproc.dict.mwcollegiateapi as cparentdict
 
 # Set to True to turn debug messages on
-#MOD_ERR_DEBUG = True
-MOD_ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+# Header elements, in the order in which they are applied to the entry header
+DICT_HEADER_ELEMENTS = ['hword', 'fl', 'lb', 'word-syllables', 'play-pron', 'prs']
 
 ################################################################
 # Merriam Webster Online Dictionary
@@ -30,16 +35,16 @@ class DictionaryConfig(cparentdict.DictionaryConfig):
     def __init__(self):
 
         # Configuration Attributes
-        self.name = u"Merriam-Webster's Online Dictionary"
-        self.pronunciation_guide_file = u"data/mwcollegiatepronguide.txt"
-        self.entry_url_format = u"http://www.merriam-webster.com/dictionary/{WORD}"
-        self.audio_url_format = u"http://media.merriam-webster.com/soundc11/{FOLDER}/{CLIP}"
-        self.illustration_url_format = u"https://www.merriam-webster.com/art/dict/{CLIP}.htm"
-        self.entry_extension = u".html"
-        self.audio_extension = u".wav"
-        self.illustration_extension = u".bmp"
+        self.name = "Merriam-Webster's Online Dictionary"
+        self.pronunciation_guide_file = "data/mwcollegiatepronguide.txt"
+        self.entry_url_format = "http://www.merriam-webster.com/dictionary/{WORD}"
+        self.audio_url_format = "http://media.merriam-webster.com/soundc11/{FOLDER}/{CLIP}"
+        self.illustration_url_format = "https://www.merriam-webster.com/art/dict/{CLIP}.htm"
+        self.entry_extension = ".html"
+        self.audio_extension = ".wav"
+        self.illustration_extension = ".bmp"
         self.api_key = cdict.DICT_UNICODE_EMPTY_STR
-        self.parser = u"html.parser"
+        self.parser = "html.parser"
         self.pronunciation_guide = self.build_pronunciation_guide()
 
         """
@@ -75,45 +80,50 @@ class DictionaryConfig(cparentdict.DictionaryConfig):
                 Inflection Functional Label: <span class="il">
                 -- maps to wordEntry.inflections.functional_label
         """
+        self.header_class_pattern = re.compile(r'(entry-header|entry-attr)')
+        self.entry_id_pattern = re.compile(r'dictionary-entry-.*|medical-entry-.*|legal-entry-.*')
+        self.etymology_id_pattern = re.compile(r'etymology-anchor')
+        self.origin_id_pattern = re.compile(r'first-known-anchor')
+
         self.element_match_patterns = {
-            
-            u'div' : {
-                u'class' : re.compile(ur'(entry-header|entry-attr)'),
-                u'id' : re.compile(ur'dictionary-entry-.*|medical-entry-.*|legal-entry-.*|etymology-anchor|first-known-anchor')
+
+            'div' : {
+                'class' : self.header_class_pattern,
+                'id' : re.compile(r'dictionary-entry-.*|medical-entry-.*|legal-entry-.*|etymology-anchor|first-known-anchor')
             }
         }
 
         self.entry_match_patterns = {
-            
-            u'div' : {
-                u'id' : re.compile(ur'dictionary-entry-.*|medical-entry-.*|legal-entry-.*')
+
+            'div' : {
+                'id' : self.entry_id_pattern
             }
         }
 
+        self.entry_content_pattern = re.compile(r'id="(dictionary|medical|legal)-entry-')
+
 
 class DictionaryEntry(cparentdict.DictionaryEntry):
 
-    def build_pronunciation(self, element, word_form):
-        # Accepts <a class="play-pron"> element as input
-        _FUNC_NAME_ = "DictionaryEntry.build_pronunciation"
-        
-        url_fragment = element['data-file'].strip()
+    def build_pronunciation(self, data_file, word_form):
+        # Accepts data-file attribute of <a class="play-pron"> element as input
+
+        url_fragment = data_file.strip()
         url_fragment = self.build_audio_url(url_fragment)
 
         pronunciation = cdict.WordPronunciation(url_fragment)
         pronunciation.form = word_form
-        pronunciation.spelling = word_form.replace(u'·​', u'')
+        pronunciation.spelling = word_form.replace('·​', '')
 
         return pronunciation
 
 
-    def build_respelling(self, element, word_form):
-        # Accepts <span class="prs"> element as input
-        _FUNC_NAME_ = "DictionaryEntry.build_respelling"
+    def build_respelling(self, text, word_form):
+        # Accepts text of <span class="prs"> element as input
+
+        elementText = text.strip().replace('\n','').replace(' ','')
 
-        elementText = element.get_text().strip().replace('\n','').replace(' ','')
-        
-        prsPattern = re.compile(ur'\\.*\\')
+        prsPattern = re.compile(r'\\.*\\')
         prsElements = prsPattern.findall(elementText)
 
         if prsElements is not None and len(prsElements) > 0:
@@ -122,194 +132,369 @@ class DictionaryEntry(cparentdict.DictionaryEntry):
 
             respelling = cdict.WordRespelling(prsElementText, self.config.name)
             respelling.form = word_form
-            respelling.spelling = word_form.replace(u'·​', u'')
+            respelling.spelling = word_form.replace('·​', '')
         else:
             respelling = None
 
         return respelling
 
 
-    def build_senses(self, element, dateText):
-        _FUNC_NAME_ = "DictionaryEntry.build_senses"
+    def build_etymology(self, elements):
+        # Accepts (is function label, text) pairs of <p class="function-label"> and <p class="et"> or <p class="ety-sl"> elements as input
 
-        # Accepts <div class="vg"> element as input
-        """
-        Senses (container): <div class="vg">
+        etymology = cdict.DICT_UNICODE_EMPTY_STR
 
-            Sense (container): <div class="sense">
-            -- maps to wordEntry.senses
+        for [isFunctionLabel, elementText] in elements:
+            elementText = elementText.strip()
 
-                Definition (container): <span class="dt ">
-                    -- maps to wordEntry.senses.definition
+            if isFunctionLabel:
+                elementText = re.sub(r'[ ]*\([0-9]+\)[ ]*', '', elementText, flags=re.UNICODE)
+                elementText = '(' + elementText.strip() + ') '
 
-                    Examples: <span class="ex-sent sents">
-                    -- maps to wordEntry.senses.examples
-        """
-        
-        senses = []
-        
-        for sense in element.find_all('div', class_="sense"):
-            slElementText = cdict.DICT_UNICODE_EMPTY_STR
-            dtElementText = cdict.DICT_UNICODE_EMPTY_STR
-            exElementText = cdict.DICT_UNICODE_EMPTY_STR
+                if etymology == cdict.DICT_UNICODE_EMPTY_STR:
+                    etymology = elementText
+                else:
+                    etymology = etymology + '; ' + elementText
 
-            for subElement in sense.find_all('span', class_="sl"):
-                subElementText = subElement.get_text().strip()
+            else:
+                etymology = etymology + elementText
 
-                slElementText = subElementText
+        return etymology
 
-            # Process <span class="dt"> elements
-            # This includes <span class="dtText"> and <span class="un"> elements
-            for subElement in sense.find_all('span', class_="dt"):
-                # Hold example sentences for later
-                examples = subElement.find_all('span', class_="ex-sent") 
-                [x.extract() for x in subElement.find_all('span', class_="ex-sent")]
-
-                subElementText = subElement.get_text().strip()
-                subElementText = re.sub(ur'called also', u'- called also', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(ur'[ ]+—[ ]+(compare).*', u'', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(ur'^[ ]*:[ ]*', u'', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(ur'[ ]*:[ ]*', u'; ', subElementText, flags=re.UNICODE)
-                subElementText = re.sub(ur'[\n ]+', u' ', subElementText, flags=re.UNICODE)
-                if slElementText != cdict.DICT_UNICODE_EMPTY_STR:
-                    subElementText = slElementText + u': ' + subElementText
-
-                dtElementText = subElementText
-                ws = cdict.WordSense(dtElementText)
-                ws.date = dateText
-
-            for subElement in examples:
-                # Remove author and source references
-                [x.extract() for x in subElement.find_all('span', class_="auth")]
-                [x.extract() for x in subElement.find_all('span', class_="source")]
 
-                subElementText = subElement.get_text().strip()
-                subElementText = re.sub(ur'[\n ]+', u' ', subElementText, flags=re.UNICODE)
+    def build_header(self, header, elements):
+        # Accepts texts of header elements, keyed by element class, as input
+        # Updates header attributes carried forward to subsequent entries
 
-                exElementText = subElementText
-                if exElementText != cdict.DICT_UNICODE_EMPTY_STR:
-                    ws.examples.append(exElementText)
+        for elementText in elements['hword']:
+            header['entry_word'] = elementText.strip()
 
-            senses.append(ws)
+        for elementText in elements['fl']:
+            header['functional_label'] = re.sub(r'[ ]*\(.*$', '', elementText.strip(), flags=re.UNICODE)
 
-        return senses
+        for elementText in elements['lb']:
+            header['functional_label'] = (header['functional_label'] + ', ' + elementText.strip()).strip()
+
+        for elementText in elements['word-syllables']:
+            header['word_syllables'] = elementText.strip()
+
+        for dataFile in elements['play-pron']:
+            header['pronunciation'] = self.build_pronunciation(dataFile, coutput.coalesce(header['word_syllables'], header['entry_word']))
+
+        for elementText in elements['prs']:
+            header['respelling'] = self.build_respelling(elementText, coutput.coalesce(header['word_syllables'], header['entry_word']))
+
+        return header
+
+
+    def build_sense(self, sl_text, dt_text, example_texts, date_text):
+        # Accepts texts of <span class="sl">, <span class="dt"> excluding examples and <span class="ex-sent"> elements as input
+
+        definitionText = cparentdict.normalize_definition_text(dt_text.strip())
+        if sl_text.strip() != cdict.DICT_UNICODE_EMPTY_STR:
+            definitionText = sl_text.strip() + ': ' + definitionText
+
+        ws = cdict.WordSense(definitionText)
+        ws.date = date_text
+
+        for exampleText in example_texts:
+            exampleText = re.sub(r'[\n ]+', ' ', exampleText.strip(), flags=re.UNICODE)
+            if exampleText != cdict.DICT_UNICODE_EMPTY_STR:
+                ws.examples.append(exampleText)
+
+        return ws
+
+
+    def build_word_entry(self, header, etymology):
+
+        wordEntry = cdict.WordEntry(self.config.name, self.key_word)
+        wordEntry.entry_word = header['entry_word']
+        wordEntry.functional_label = header['functional_label']
+        wordEntry.etymology = etymology
+        wordEntry.word_syllables = header['word_syllables']
+        wordEntry.pronunciation = header['pronunciation']
+        wordEntry.respelling = header['respelling']
+
+        return wordEntry
+
+
+    def set_word_entries(self):
+
+        # Extract entries in a single streaming pass, without building a document tree
+        parserTarget = DictionaryEntryParserTarget(self)
+        parser = etree.HTMLParser(target=parserTarget)
+        parser.feed(self.entry_raw_text)
+        self.word_entries.extend(parser.close())
+
+        coutput.print_watcher('self.word_entries')
+
+
+class DictionaryEntryParserTarget(object):
+    """
+    Target for the lxml HTML parser, which receives start, end and text events as the entry is parsed.
+    Only the entry containers and the header, etymology and sense elements within them are tracked;
+    element texts are collected while the element is open and processed when it is closed.
+    """
+    def __init__(self, dict_entry):
+        self.dict_entry = dict_entry
+        self.config = dict_entry.config
+        self.depth = 0
+
+        # Open elements whose text is being collected
+        self.captures = []
+
+        # Header containers of the outermost open header container, and those currently open
+        self.header = {'entry_word': cdict.DICT_UNICODE_EMPTY_STR, 'functional_label': cdict.DICT_UNICODE_EMPTY_STR, 'word_syllables': cdict.DICT_UNICODE_EMPTY_STR, 'pronunciation': None, 'respelling': None}
+        self.headerElements = []
+        self.openHeaderElements = []
+
+        # Etymology and origin are applied to all entries, from the last container of each
+        self.etymologyElements = None
+        self.etymologyDepth = None
+        self.originElements = None
+        self.originDepth = None
+
+        # Entries with their header at the start of the container, and their senses
+        self.entries = []
+        self.entryDepth = None
+        self.vgDepths = []
+        self.openSenses = []
+        self.openDefinitions = []
+
+
+    def start_capture(self, kind, exclude_classes, target):
+        self.captures.append({'kind': kind, 'depth': self.depth, 'parts': [], 'exclude': exclude_classes, 'excludeDepth': None, 'target': target})
+
+
+    def start(self, tag, attrib):
+        self.depth += 1
+        classes = attrib.get('class', cdict.DICT_UNICODE_EMPTY_STR).split()
+
+        # Exclude text of nested elements e.g. examples within definitions
+        for capture in self.captures:
+            if capture['excludeDepth'] is None and tag == 'span' and not capture['exclude'].isdisjoint(classes):
+                capture['excludeDepth'] = self.depth
+
+        if tag == 'div':
+            elementId = attrib.get('id', cdict.DICT_UNICODE_EMPTY_STR)
+
+            if any(self.config.header_class_pattern.match(x) for x in classes):
+                elements = dict((x, []) for x in DICT_HEADER_ELEMENTS)
+                self.headerElements.append(elements)
+                self.openHeaderElements.append([self.depth, elements])
+
+            elif self.config.entry_id_pattern.match(elementId) and self.entryDepth is None:
+                self.entries.append([dict(self.header), []])
+                self.entryDepth = self.depth
+
+            elif self.config.etymology_id_pattern.match(elementId) and self.etymologyDepth is None:
+                self.etymologyElements = []
+                self.etymologyDepth = self.depth
+
+            elif self.config.origin_id_pattern.match(elementId) and self.originDepth is None:
+                self.originElements = []
+                self.originDepth = self.depth
+
+            elif 'vg' in classes and self.entryDepth is not None:
+                self.vgDepths.append(self.depth)
+
+            elif 'sense' in classes and len(self.vgDepths) > 0:
+                # Senses are recorded in document order, and built once the entry is complete
+                sense = {'depth': self.depth, 'sl': cdict.DICT_UNICODE_EMPTY_STR, 'dt': None}
+                self.entries[-1][1].append(sense)
+                self.openSenses.append(sense)
+
+        elif tag == 'p':
+            if self.etymologyDepth is not None:
+                if 'function-label' in classes:
+                    self.start_capture('label', set(), self.etymologyElements)
+                elif 'et' in classes:
+                    self.start_capture('text', set(), self.etymologyElements)
+
+            if self.originDepth is not None:
+                if 'function-label' in classes:
+                    self.start_capture('label', set(), self.originElements)
+                elif 'ety-sl' in classes:
+                    self.start_capture('text', set(), self.originElements)
+
+        if len(self.openHeaderElements) > 0:
+            if 'hword' in classes:
+                self.start_capture('hword', set(), None)
+
+            if tag == 'span':
+                for elementClass in ['fl', 'lb', 'word-syllables', 'prs']:
+                    if elementClass in classes:
+                        self.start_capture(elementClass, set(), None)
+
+            elif tag == 'a' and 'play-pron' in classes:
+                for [depth, elements] in self.openHeaderElements:
+                    elements['play-pron'].append(attrib.get('data-file', cdict.DICT_UNICODE_EMPTY_STR))
+
+        if tag == 'span' and len(self.openSenses) > 0:
+            if 'sl' in classes:
+                self.start_capture('sl', set(), None)
+
+            if 'dt' in classes:
+                definition = {'depth': self.depth, 'examples': []}
+                self.openDefinitions.append(definition)
+                self.start_capture('dt', set(['ex-sent']), definition)
+
+            if 'ex-sent' in classes and len(self.openDefinitions) > 0:
+                self.start_capture('ex-sent', set(['auth', 'source']), self.openDefinitions[-1]['examples'])
+
+
+    def end_capture(self, capture):
+        elementText = cdict.DICT_UNICODE_EMPTY_STR.join(capture['parts'])
+        kind = capture['kind']
+
+        if kind == 'label' or kind == 'text':
+            capture['target'].append([kind == 'label', elementText])
+
+        elif kind == 'ex-sent':
+            capture['target'].append(elementText)
 
+        elif kind == 'sl':
+            for sense in self.openSenses:
+                sense['sl'] = elementText
 
+        elif kind == 'dt':
+            for sense in self.openSenses:
+                sense['dt'] = [elementText, capture['target']['examples']]
+
+        else:
+            for [depth, elements] in self.openHeaderElements:
+                elements[kind].append(elementText)
+
+
+    def end(self, tag):
+
+        # Captures of nested elements close before those of enclosing elements
+        while len(self.captures) > 0 and self.captures[-1]['depth'] == self.depth:
+            self.end_capture(self.captures.pop())
+
+        for capture in self.captures:
+            if capture['excludeDepth'] == self.depth:
+                capture['excludeDepth'] = None
+
+        if len(self.openDefinitions) > 0 and self.openDefinitions[-1]['depth'] == self.depth:
+            self.openDefinitions.pop()
+
+        if len(self.openSenses) > 0 and self.openSenses[-1]['depth'] == self.depth:
+            self.openSenses.pop()
+
+        if len(self.vgDepths) > 0 and self.vgDepths[-1] == self.depth:
+            self.vgDepths.pop()
+
+        if self.entryDepth == self.depth:
+            self.entryDepth = None
+
+        if self.etymologyDepth == self.depth:
+            self.etymologyDepth = None
+
+        if self.originDepth == self.depth:
+            self.originDepth = None
+
+        if len(self.openHeaderElements) > 0 and self.openHeaderElements[-1][0] == self.depth:
+            self.openHeaderElements.pop()
+
+            # Header containers are applied in document order once the outermost one is complete
+            if len(self.openHeaderElements) == 0:
+                for elements in self.headerElements:
+                    self.dict_entry.build_header(self.header, elements)
+                self.headerElements = []
+
+        self.depth -= 1
+
+
+    def data(self, data):
+        for capture in self.captures:
+            if capture['excludeDepth'] is None:
+                capture['parts'].append(data)
+
+
+    def comment(self, text):
+        pass
+
+
+    def close(self):
+        etymology = cdict.DICT_UNICODE_EMPTY_STR
+        if self.etymologyElements is not None:
+            etymology = self.dict_entry.build_etymology(self.etymologyElements)
+
+        origin = cdict.DICT_UNICODE_EMPTY_STR
+        if self.originElements is not None:
+            origin = self.dict_entry.build_etymology(self.originElements)
+
+        wordEntries = []
+        for [header, senses] in self.entries:
+            wordEntry = self.dict_entry.build_word_entry(header, etymology)
+
+            for sense in senses:
+                if sense['dt'] is not None:
+                    wordEntry.senses.append(self.dict_entry.build_sense(sense['sl'], sense['dt'][0], sense['dt'][1], origin))
+
+            wordEntries.append(wordEntry)
+
+        return wordEntries
+
+
+class SoupDictionaryEntry(DictionaryEntry):
+    """
+    Extracts entries by walking a BeautifulSoup document tree. Retained as a reference for the
+    streaming extractor, see benchmark_entry_parsers().
+    """
     def set_word_entries(self):
-        _FUNC_NAME_ = "DictionaryEntry.set_word_entries"
 
         soup = BeautifulSoup(self.entry_raw_text, self.config.parser)
-        currEntryWord = cdict.DICT_UNICODE_EMPTY_STR
-        currFuncLabel = cdict.DICT_UNICODE_EMPTY_STR
+        header = {'entry_word': cdict.DICT_UNICODE_EMPTY_STR, 'functional_label': cdict.DICT_UNICODE_EMPTY_STR, 'word_syllables': cdict.DICT_UNICODE_EMPTY_STR, 'pronunciation': None, 'respelling': None}
         currEtymology = cdict.DICT_UNICODE_EMPTY_STR
         currOrigin = cdict.DICT_UNICODE_EMPTY_STR
-        currWordSyllables = cdict.DICT_UNICODE_EMPTY_STR
-        currPronunciation = None
-        currRespelling = None
 
         for entry in soup.find_all(self.config.is_required_element):
-            #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'entry')
 
-            if entry.name == u'div' and entry.has_attr(u'id') and re.compile(ur'etymology-anchor').match(entry.attrs[u'id']):
+            if entry.name == 'div' and entry.has_attr('id') and self.config.etymology_id_pattern.match(entry.attrs['id']):
 
                 # Process etymology: <p class="function-label"> and <p class="et">
-                currEtymology = cdict.DICT_UNICODE_EMPTY_STR
-                for element in entry.find_all(u'p', class_=re.compile(ur'function-label|et')):
-                    if u'function-label' in element['class']:
-                        elementText = element.get_text().strip()
-                        elementText = re.sub(ur'[ ]*\([0-9]+\)[ ]*', u'', elementText, flags=re.UNICODE)
-                        elementText = u'(' + elementText.strip() + u') '
-
-                        if currEtymology == cdict.DICT_UNICODE_EMPTY_STR:
-                            currEtymology = elementText
-                        else:
-                            currEtymology = currEtymology + u'; ' + elementText
-
-                    elif u'et' in element['class']:
-                        elementText = element.get_text().strip()
+                elements = []
+                for element in entry.find_all('p', class_=re.compile(r'function-label|et')):
+                    if 'function-label' in element['class']:
+                        elements.append([True, element.get_text()])
+                    elif 'et' in element['class']:
+                        elements.append([False, element.get_text()])
 
-                        if currEtymology == cdict.DICT_UNICODE_EMPTY_STR:
-                            currEtymology = elementText
-                        else:
-                            currEtymology = currEtymology + elementText
+                currEtymology = self.build_etymology(elements)
 
-            elif entry.name == u'div' and entry.has_attr(u'id') and re.compile(ur'first-known-anchor').match(entry.attrs[u'id']):
+            elif entry.name == 'div' and entry.has_attr('id') and self.config.origin_id_pattern.match(entry.attrs['id']):
 
                 # Process origin: <p class="function-label"> and <p class="ety-sl">
-                currEtymology = cdict.DICT_UNICODE_EMPTY_STR
-                for element in entry.find_all(u'p', class_=re.compile(ur'function-label|ety-sl')):
-                    if u'function-label' in element['class']:
-                        elementText = element.get_text().strip()
-                        elementText = re.sub(ur'[ ]*\([0-9]+\)[ ]*', u'', elementText, flags=re.UNICODE)
-                        elementText = u'(' + elementText.strip() + u') '
+                elements = []
+                for element in entry.find_all('p', class_=re.compile(r'function-label|ety-sl')):
+                    if 'function-label' in element['class']:
+                        elements.append([True, element.get_text()])
+                    elif 'ety-sl' in element['class']:
+                        elements.append([False, element.get_text()])
 
-                        if currOrigin == cdict.DICT_UNICODE_EMPTY_STR:
-                            currOrigin = elementText
-                        else:
-                            currOrigin = currOrigin + u'; ' + elementText
+                currOrigin = self.build_etymology(elements)
 
-                    elif u'ety-sl' in element['class']:
-                        elementText = element.get_text().strip()
-
-                        if currOrigin == cdict.DICT_UNICODE_EMPTY_STR:
-                            currOrigin = elementText
-                        else:
-                            currOrigin = currOrigin + elementText
+        for entry in soup.find_all(self.config.is_required_element):
 
+            if entry.name == 'div' and entry.has_attr('class') and any(self.config.header_class_pattern.match(x) for x in entry.attrs['class']):
 
-        for entry in soup.find_all(self.config.is_required_element):
+                # Process head word, functional labels, word syllables, pronunciation and respellings
+                elements = dict((x, []) for x in DICT_HEADER_ELEMENTS)
+                elements['hword'] = [element.get_text() for element in entry.find_all(class_="hword")]
+                elements['fl'] = [element.get_text() for element in entry.find_all('span', class_="fl")]
+                elements['lb'] = [element.get_text() for element in entry.find_all('span', class_="lb")]
+                elements['word-syllables'] = [element.get_text() for element in entry.find_all('span', class_="word-syllables")]
+                elements['play-pron'] = [element.get('data-file', cdict.DICT_UNICODE_EMPTY_STR) for element in entry.find_all('a', class_="play-pron")]
+                elements['prs'] = [element.get_text() for element in entry.find_all('span', class_="prs")]
+                self.build_header(header, elements)
 
-            if entry.name == u'div' and entry.has_attr(u'class') and any(re.compile(ur'entry-.*').match(x) for x in entry.attrs[u'class']):
-                coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'entry')
-
-                # Process head word: <h1 class="hword"> or <p class="hword">
-                for element in entry.find_all(class_="hword"):
-                    elementText = element.get_text().strip()
-                    currEntryWord = elementText
-                    #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'currEntryWord')
-
-                # Process functional label: <span class="fl">
-                for element in entry.find_all('span', class_="fl"):
-                    elementText = element.get_text().strip()
-                    elementText = re.sub(ur'[ ]*\(.*$', u'', elementText, flags=re.UNICODE)
-                    currFuncLabel = elementText
-                    #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'currFuncLabel')
-
-                # Process functional label: <span class="lb">
-                for element in entry.find_all('span', class_="lb"):
-                    coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'element')
-                    elementText = element.get_text().strip()
-                    elementText = currFuncLabel + u', ' + elementText
-                    currFuncLabel = elementText.strip()
-                    #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'currFuncLabel')
-
-                # Process word syllables: <span class="word-syllables">
-                for element in entry.find_all('span', class_="word-syllables"):
-                    elementText = element.get_text().strip()
-                    currWordSyllables = elementText
-                    #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'currWordSyllables')
-
-                # Process pronunciation: <a class="play-pron">
-                for element in entry.find_all('a', class_="play-pron"):
-                    currPronunciation = self.build_pronunciation(element, coutput.coalesce(currWordSyllables, currEntryWord))
-                    #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'currPronunciation')
-
-                # Process respellings: <span class="prs">
-                for element in entry.find_all('span', class_="prs"):
-                    currRespelling = self.build_respelling(element, coutput.coalesce(currWordSyllables, currEntryWord))
-                    #coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'currRespelling')
-            
             # Process dictionary entry (container): <div id="dictionary-entry-1"> or <div id="medical-entry-1"> or <div id="legal-entry-1">
             elif self.config.is_entry_element(entry):
-                coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'entry')
+                coutput.print_watcher('entry')
 
-                wordEntry = cdict.WordEntry(self.config.name, self.key_word)
-                wordEntry.entry_word = currEntryWord
-                wordEntry.functional_label = currFuncLabel
-                wordEntry.etymology = currEtymology
-                wordEntry.word_syllables = currWordSyllables
-                wordEntry.pronunciation = currPronunciation
-                wordEntry.respelling = currRespelling
+                wordEntry = self.build_word_entry(header, currEtymology)
 
                 # Process word senses: <div class="vg">
                 for element in entry.find_all('div', class_="vg"):
@@ -317,12 +502,88 @@ class DictionaryEntry(cparentdict.DictionaryEntry):
 
                 self.word_entries.append(wordEntry)
 
-        coutput.print_watcher(MOD_ERR_DEBUG, _FUNC_NAME_, 'self.word_entries')
-        return
+        coutput.print_watcher('self.word_entries')
+
+
+    def build_senses(self, element, dateText):
+
+        # Accepts <div class="vg"> element as input
+        """
+        Senses (container): <div class="vg">
+
+            Sense (container): <div class="sense">
+            -- maps to wordEntry.senses
+
+                Definition (container): <span class="dt ">
+                    -- maps to wordEntry.senses.definition
+
+                    Examples: <span class="ex-sent sents">
+                    -- maps to wordEntry.senses.examples
+        """
+
+        senses = []
+
+        for sense in element.find_all('div', class_="sense"):
+            slElementText = cdict.DICT_UNICODE_EMPTY_STR
+            dtElementText = None
+            exElementTexts = []
+
+            for subElement in sense.find_all('span', class_="sl"):
+                slElementText = subElement.get_text()
+
+            # Process <span class="dt"> elements
+            # This includes <span class="dtText"> and <span class="un"> elements
+            for subElement in sense.find_all('span', class_="dt"):
+                # Hold example sentences for later
+                examples = subElement.find_all('span', class_="ex-sent")
+                [x.extract() for x in examples]
+
+                # Remove author and source references
+                exElementTexts = []
+                for example in examples:
+                    [x.extract() for x in example.find_all('span', class_=["auth", "source"])]
+                    exElementTexts.append(example.get_text())
+
+                dtElementText = subElement.get_text()
+
+            if dtElementText is not None:
+                senses.append(self.build_sense(slElementText, dtElementText, exElementTexts, dateText))
+
+        return senses
 
-        #TBD
-        #for entry in soup.find_all('div', {'class':"headword-row"}):
-            #print entry.get_text()
 
-        #for entry in soup.find_all('div', {'id':"other-words-anchor"}):
-            #print entry.get_text()
+def benchmark_entry_parsers(key_word, entry_raw_text, iterations=10):
+    """
+    Times the streaming and BeautifulSoup extractors on the same entry text, and reports whether
+    they produce the same word entries.
+    """
+    dictConfig = DictionaryConfig()
+    results = {}
+
+    for [parserName, entryClass] in [['lxml-stream', DictionaryEntry], ['soup', SoupDictionaryEntry]]:
+        startTime = time.perf_counter()
+        for iteration in range(iterations):
+            dictEntry = entryClass(dictConfig, key_word, entry_raw_text)
+            wordEntries = dictEntry.word_entries
+        results[parserName] = [(time.perf_counter() - startTime) / iterations, str(wordEntries)]
+
+    for parserName in results:
+        print("{0:<12}: {1:.6f}s per entry".format(parserName, results[parserName][0]))
+    print("Identical entries: {0}".format(results['lxml-stream'][1] == results['soup'][1]))
+
+    return results
+
+
+########################################################################
+# Sample application to test the python module
+########################################################################
+
+#import urllib3
+#
+#connectionPool = urllib3.PoolManager(10)
+#entryRawText = connectionPool.request('GET', DictionaryConfig().entry_url_format.format(WORD='cloud')).data.decode('utf-8')
+#
+#benchmark_entry_parsers('cloud', entryRawText)
+#
+#for wordEntry in DictionaryEntry(DictionaryConfig(), 'cloud', entryRawText).word_entries:
+#    print(wordEntry)
@@ -27,53 +27,52 @@ import common.rpimod.wordproc.dict.generic as cdict
 ################################################################
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
 
-def initialize_source():
-    cdict.DICT_SOURCE_NAME = unicode("Oxford Dictionaries", 'utf-8')
-    cdict.DICT_ENTRY_URL = unicode("http://www.oxforddictionaries.com/us/definition/american_english/{WORD}?searchDictCode=all", 'utf-8')
-    cdict.DICT_AUDIO_URL = unicode("{PATH}", 'utf-8')
+class DictionaryConfig(cdict.DictionaryConfig):
+    def __init__(self):
 
-    cdict.DICT_CLEAN_TEXT_PATTERNS = [
-    u'\xb7',
-    r'<span class="punctuation">'
-    ]
-    cdict.DICT_CLEAN_INNER_TEXT_PATTERNS = []
-    cdict.DICT_CLEAN_OUTER_TEXT_PATTERNS = [
-    [r'<em>', r'</em>']
-    ]
+        # Configuration Attributes
+        self.name = "Oxford Dictionaries"
+        self.entry_url_format = "http://www.oxforddictionaries.com/us/definition/american_english/{WORD}?searchDictCode=all"
+        self.audio_url_format = "{PATH}"
 
-    # The dictionary definition line is identified by the HTML tag '<span class="definition">...</span>'
-    # The pronunciation audio line is identified by the HTML tag '<div class="sound audio_play_button icon-audio" data-src-mp3="http://www.oxforddictionaries.com/us/media/american_english/us_pron/c/clo/cloud/cloud__us_1.mp3"'
-    # The pronunciation audio header word is identified by the HTML tag '<span data-dobid="hdw">'
-    cdict.DICT_MARKER_DEFINITION = [
-    [r'<span class="definition">\s*', r'[:]*</span>']
-    ]
-    cdict.DICT_MARKER_PRONUNCIATION_URL = [r'data-src-mp3="', r'"']
-    cdict.DICT_MARKER_PRONUNCIATION_WORD = [r'<h2 class="pageTitle">', r'\n</h2>']
+        self.clean_text_patterns = [
+        u'\xb7',
+        r'<span class="punctuation">'
+        ]
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = [
+        [r'<em>', r'</em>']
+        ]
+
+        # The dictionary definition line is identified by the HTML tag '<span class="definition">...</span>'
+        # The pronunciation audio line is identified by the HTML tag '<div class="sound audio_play_button icon-audio" data-src-mp3="http://www.oxforddictionaries.com/us/media/american_english/us_pron/c/clo/cloud/cloud__us_1.mp3"'
+        # The pronunciation audio header word is identified by the HTML tag '<span data-dobid="hdw">'
+        self.definition_markers = [
+        [r'<span class="definition">\s*', r'[:]*</span>']
+        ]
+        self.pronunciation_url_marker = [r'data-src-mp3="', r'"']
+        self.pronunciation_word_marker = [r'<h2 class="pageTitle">', r'\n</h2>']
+
+
+DICT_EXTRACTOR = cdict.DictionaryExtractor(DictionaryConfig())
 
 
 def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
-    initialize_source()
-    return cdict.get_dictionary_source()
+    return DICT_EXTRACTOR.get_dictionary_source()
 
 
 def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
-    initialize_source()
-    return cdict.get_dictionary_entry(connectionPool, word)
+    return DICT_EXTRACTOR.get_dictionary_entry(connectionPool, word)
 
 
 def parse_word_definition(word, entryText):
-    _FUNC_NAME_ = "parse_word_definition"
-    initialize_source()
-    return cdict.parse_word_definition(word, entryText)
+    return DICT_EXTRACTOR.parse_word_definition(word, entryText)
 
 
 def parse_word_clip(word, entryText):
-    _FUNC_NAME_ = "parse_word_clip"
-    initialize_source()
-    return cdict.parse_word_clip(word, entryText)
+    return DICT_EXTRACTOR.parse_word_clip(word, entryText)
 
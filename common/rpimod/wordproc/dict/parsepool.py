@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- encoding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : parsepool.py
+# Description : Process pool of dictionary entry parse workers for bulk entry processing
+# Author      : Dito Manavalan
+# Date        : 2019/03/02
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import importlib
+import multiprocessing
+
+sys.path.insert(0, "..")
+import common.rpimod.stdio.output as coutput
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+# Number of entries sent to a worker at a time, to amortise inter-process communication
+DICT_PARSE_CHUNK_SIZE = 16
+
+# Entries below this count are parsed in the calling process, as pool startup would outweigh the gain
+DICT_PARSE_MIN_POOL_ENTRIES = 32
+
+################################################################
+# Parse Worker
+################################################################
+
+# Dictionary API module and configuration of the worker process, set up once by the pool initializer
+workerDictAPI = None
+workerDictConfig = None
+
+
+def init_parse_worker(dict_api_name):
+    global workerDictAPI
+    global workerDictConfig
+
+    workerDictAPI = importlib.import_module(dict_api_name)
+    workerDictConfig = workerDictAPI.DictionaryConfig()
+
+
+def parse_entry(word_entry_text):
+    # Accepts (word, raw text) pair as input
+    # Returns (word, simplified word entry) pair, with None if the entry has no content
+
+    [word, entryRawText] = word_entry_text
+    dictEntry = workerDictAPI.DictionaryEntry(workerDictConfig, word, entryRawText)
+    if not dictEntry.has_content():
+        return (word, None)
+
+    return (word, dictEntry.simplified_word_entry)
+
+
+################################################################
+# Parse Worker Pool
+################################################################
+
+class ParseWorkerPool(object):
+    """
+    Parses dictionary entries of the given dictionary API module (e.g. mwcollegiateapi) in child processes.
+    Entries are passed as (word, raw text) pairs in chunks, and results are returned as picklable
+    (word, SimplifiedWordEntry) pairs in input order, with None for entries without content.
+    """
+    def __init__(self, dict_api_name, processes=None, chunk_size=DICT_PARSE_CHUNK_SIZE):
+        self.dict_api_name = dict_api_name
+        self.processes = processes if processes is not None else os.cpu_count()
+        self.chunk_size = chunk_size
+        self.pool = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+    def start(self):
+        if self.pool is None:
+            coutput.print_debug("Starting {0} parse workers for {1}".format(self.processes, self.dict_api_name))
+            self.pool = multiprocessing.Pool(self.processes, initializer=init_parse_worker, initargs=(self.dict_api_name,))
+
+
+    def parse_entries(self, word_entry_texts):
+        # Accepts an iterable of (word, raw text) pairs
+        # Yields (word, simplified word entry) pairs in input order, as they are parsed
+
+        word_entry_texts = list(word_entry_texts)
+
+        if len(word_entry_texts) < DICT_PARSE_MIN_POOL_ENTRIES or self.processes < 2:
+            if workerDictAPI is None or workerDictAPI.__name__ != self.dict_api_name:
+                init_parse_worker(self.dict_api_name)
+
+            for wordEntryText in word_entry_texts:
+                yield parse_entry(wordEntryText)
+
+        else:
+            self.start()
+            for wordEntry in self.pool.imap(parse_entry, word_entry_texts, chunksize=self.chunk_size):
+                yield wordEntry
+
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+
+
+def parse_entries(dict_api_name, word_entry_texts, processes=None):
+    # Parses a batch of (word, raw text) pairs and returns a dictionary of simplified word entries by word
+
+    with ParseWorkerPool(dict_api_name, processes) as parsePool:
+        return dict(parsePool.parse_entries(word_entry_texts))
+
+
+########################################################################
+# Sample application to test the python module
+########################################################################
+
+#import glob
+#import common.rpimod.stdio.fileio as cfile
+#
+#wordEntryTexts = []
+#for fileName in glob.glob("data/dict/*.xml"):
+#    wordEntryTexts.append((os.path.basename(fileName)[:-4], cfile.read(fileName)))
+#
+#with ParseWorkerPool('common.rpimod.wordproc.dict.mwcollegiateapi') as parsePool:
+#    for [word, simplifiedWordEntry] in parsePool.parse_entries(wordEntryTexts):
+#        print(word, simplifiedWordEntry)
@@ -27,52 +27,49 @@ import common.rpimod.wordproc.dict.generic as cdict
 ################################################################
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
 
-def initialize_source():
-    cdict.DICT_SOURCE_NAME = unicode("YouTube", 'utf-8')
-    cdict.DICT_ENTRY_URL = unicode("http://www.google.com/search?hl=en&q=YouTube+Pronunciation+Guide+How+to+Pronounce+{WORD}", 'utf-8')
-    cdict.DICT_AUDIO_URL = unicode("{PATH}", 'utf-8')
+class DictionaryConfig(cdict.DictionaryConfig):
+    def __init__(self):
 
-    cdict.DICT_CLEAN_TEXT_PATTERNS = [
-    r'<script.*?>.*?</script>',
-    r'<style.*?>.*?</style>'
-    ]
-    cdict.DICT_CLEAN_INNER_TEXT_PATTERNS = []
-    cdict.DICT_CLEAN_OUTER_TEXT_PATTERNS = []
+        # Configuration Attributes
+        self.name = "YouTube"
+        self.entry_url_format = "http://www.google.com/search?hl=en&q=YouTube+Pronunciation+Guide+How+to+Pronounce+{WORD}"
+        self.audio_url_format = "{PATH}"
 
-    # The dictionary definition line is identified by the HTML tag '<div class="sds-list"><b>a. </b>....</div>'
-    # The pronunciation audio line is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
-    # The pronunciation audio header word is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
-    cdict.DICT_MARKER_DEFINITION = [
-    [r'<unknown>', r'</unknown>']
-    ]
-    cdict.DICT_MARKER_PRONUNCIATION_URL = [r'<div class="rc" data-hveid=.*?<h3 class="r"><a href="', r'" onmousedown.*?>How to Pronounce.*? - YouTube</a></h3>.*?<div class="f slp">.*?Uploaded by Pronunciation Guide</div>']
-    cdict.DICT_MARKER_PRONUNCIATION_WORD = [r'<div class="rc" data-hveid=.*?<h3 class="r"><a href=".*?" onmousedown.*?>How to Pronounce\s*', r'\s*- YouTube</a></h3>.*?<div class="f slp">.*?Uploaded by Pronunciation Guide</div>']
+        self.clean_text_patterns = [
+        r'<script.*?>.*?</script>',
+        r'<style.*?>.*?</style>'
+        ]
+        self.clean_inner_text_patterns = []
+        self.clean_outer_text_patterns = []
+
+        # The dictionary definition line is identified by the HTML tag '<div class="sds-list"><b>a. </b>....</div>'
+        # The pronunciation audio line is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
+        # The pronunciation audio header word is identified by the HTML tag '<div class="wy" id="wy1"></div><h1>cloud</h1><span class=snd2 data-snd="en/US/dg/dgdgd3sjstdthr">'
+        # Definitions are not sourced from YouTube
+        self.definition_markers = []
+        self.pronunciation_url_marker = [r'<div class="rc" data-hveid=.*?<h3 class="r"><a href="', r'" onmousedown.*?>How to Pronounce.*? - YouTube</a></h3>.*?<div class="f slp">.*?Uploaded by Pronunciation Guide</div>']
+        self.pronunciation_word_marker = [r'<div class="rc" data-hveid=.*?<h3 class="r"><a href=".*?" onmousedown.*?>How to Pronounce\s*', r'\s*- YouTube</a></h3>.*?<div class="f slp">.*?Uploaded by Pronunciation Guide</div>']
+
+
+DICT_EXTRACTOR = cdict.DictionaryExtractor(DictionaryConfig())
 
 
 def get_dictionary_source():
-    _FUNC_NAME_ = "get_dictionary_source"
-    initialize_source()
-    return cdict.get_dictionary_source()
+    return DICT_EXTRACTOR.get_dictionary_source()
 
 
 def get_dictionary_entry(connectionPool, word):
-    _FUNC_NAME_ = "get_dictionary_entry"
-    initialize_source()
-    return cdict.get_dictionary_entry(connectionPool, word)
+    return DICT_EXTRACTOR.get_dictionary_entry(connectionPool, word)
 
 
 def parse_word_definition(word, entryText):
-    _FUNC_NAME_ = "parse_word_definition"
-    initialize_source()
-    #return cdict.parse_word_definition(word, entryText)
-    return []
+    return DICT_EXTRACTOR.parse_word_definition(word, entryText)
 
 
 def parse_word_clip(word, entryText):
-    _FUNC_NAME_ = "parse_word_clip"
-    initialize_source()
-    return cdict.parse_word_clip(word, entryText)
+    return DICT_EXTRACTOR.parse_word_clip(word, entryText)
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : rulebook.py
+# Description : Index of spelling rules by word, and of words by rule and category
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+
+
+class RuleBook(object):
+    """
+    Index of spelling rules, holding the category and rules of each word, and the reverse indexes of words
+    by rule and by category. Words are matched ignoring case.
+    Rules and words are kept in order of first occurrence, in dicts used as insertion-ordered sets, so that
+    adding a rule costs O(1) however many rules a word has. Category and rule strings are interned, as the
+    same few strings are shared by thousands of words.
+    """
+    def __init__(self):
+        self.wordCategories = {}
+        self.wordRules = {}
+        self.ruleWords = {}
+        self.categoryWords = {}
+
+
+    def __contains__(self, word):
+        return word.lower() in self.wordRules
+
+
+    def __len__(self):
+        return len(self.wordRules)
+
+
+    def add_rule(self, word, category, rule):
+        # Records a rule of a word, under the category of the first rule recorded for the word
+
+        word = word.lower()
+        category = sys.intern(category)
+        rule = sys.intern(rule)
+
+        if word not in self.wordRules:
+            self.wordCategories[word] = category
+            self.wordRules[word] = {}
+            self.categoryWords.setdefault(category, {})[word] = None
+
+        self.wordRules[word][rule] = None
+        self.ruleWords.setdefault(rule, {})[word] = None
+
+
+    def get_category(self, word):
+        # Returns the category of a word, None if the word has no rules
+        return self.wordCategories.get(word.lower())
+
+
+    def get_rules(self, word):
+        # Returns the rules of a word in the order recorded, an empty list if the word has no rules
+        return list(self.wordRules.get(word.lower(), ()))
+
+
+    def get_rule_words(self, rule):
+        # Returns the words following a rule, e.g. to drill a technique
+        return list(self.ruleWords.get(rule, ()))
+
+
+    def get_category_words(self, category):
+        # Returns the words filed under a category, e.g. to drill a rule book or word sets
+        return list(self.categoryWords.get(category, ()))
+
+
+    def get_rule_list(self):
+        return list(self.ruleWords)
+
+
+    def get_category_list(self):
+        return list(self.categoryWords)
+
+
+def build_rulebook(ruleFileNames, fileCatalog, parseRuleFile):
+    # Returns the rulebook merged from the given files, whose (word, category, rule) entries are returned by
+    # parseRuleFile(ruleFileName); entries are kept per file in the catalog, so only files changed since last
+    # parsed are read again
+
+    ruleBook = RuleBook()
+    for ruleFileName in ruleFileNames:
+        ruleEntries = fileCatalog.load("rules:" + os.path.normpath(ruleFileName), [ruleFileName],
+                                       lambda fileNames: list(parseRuleFile(fileNames[0])))
+        for [word, category, rule] in ruleEntries:
+            ruleBook.add_rule(word, category, rule)
+
+    return ruleBook
+
+
+########################################################################
+# Sample application to test the python module
+########################################################################
+
+'''
+cd ~/projects/py3-raspi/common/rpimod/wordproc
+python3 rulebook.py
+'''
+
+'''
+ruleBook = RuleBook()
+ruleBook.add_rule("Chaos", "Greek", "ch as in chorus")
+ruleBook.add_rule("chorus", "Greek", "ch as in chorus")
+ruleBook.add_rule("chaos", "Greek", "-os ending")
+
+print(ruleBook.get_category("CHAOS"), ruleBook.get_rules("chaos"))
+print(ruleBook.get_rule_words("ch as in chorus"))
+print(ruleBook.get_category_words("Greek"))
+'''
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : test_rulebook.py
+# Description : Tests of rulebooks merged from rule files cached in a file catalog
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import os
+import tempfile
+import unittest
+
+sys.path.insert(0, "../../..")
+import common.rpimod.stdio.filecatalog as ccatalog
+import common.rpimod.wordproc.rulebook as crulebook
+
+
+def parse_rule_file(ruleFileName):
+    # Yields the (word, category, rule) entries of a test rule file, one "word;category;rule" entry per line
+    with open(ruleFileName, 'r', encoding='utf-8') as ruleFile:
+        for ruleLine in ruleFile:
+            yield tuple(ruleLine.strip().split(";"))
+
+
+class TestBuildRuleBook(unittest.TestCase):
+
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.catalogFile = os.path.join(self.tempDir.name, "catalog.pickle")
+        self.ruleFileNames = [os.path.join(self.tempDir.name, "sb_{0}_rulebook.txt".format(fileIndex)) for fileIndex in range(3)]
+        for fileIndex, ruleFileName in enumerate(self.ruleFileNames):
+            self.write_rule_file(ruleFileName, "word{0};Category{0};rule{0}\n".format(fileIndex))
+
+        self.parsedFileNames = []
+
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+
+    def write_rule_file(self, ruleFileName, ruleText):
+        with open(ruleFileName, 'w', encoding='utf-8') as ruleFile:
+            ruleFile.write(ruleText)
+
+
+    def build_rulebook(self):
+        # Builds the rulebook as a new session would, from the saved catalog, recording the files parsed
+
+        def parse_recorded(ruleFileName):
+            self.parsedFileNames.append(ruleFileName)
+            return parse_rule_file(ruleFileName)
+
+        fileCatalog = ccatalog.FileCatalog(self.catalogFile)
+        ruleBook = fileCatalog.load('ruleBookIndex', self.ruleFileNames,
+                                    lambda fileNames: crulebook.build_rulebook(fileNames, fileCatalog, parse_recorded))
+        fileCatalog.save()
+        return ruleBook
+
+
+    def test_unchanged_files(self):
+        self.build_rulebook()
+        self.parsedFileNames = []
+
+        ruleBook = self.build_rulebook()
+        self.assertEqual(self.parsedFileNames, [])
+        self.assertEqual(ruleBook.get_rules("word1"), ["rule1"])
+
+
+    def test_changed_file(self):
+        self.build_rulebook()
+        self.parsedFileNames = []
+
+        self.write_rule_file(self.ruleFileNames[1], "word1;Category1;rule1\nword9;Category1;rule9\n")
+        ruleBook = self.build_rulebook()
+
+        self.assertEqual(self.parsedFileNames, [self.ruleFileNames[1]])
+        self.assertEqual(ruleBook.get_rules("word9"), ["rule9"])
+        self.assertEqual(ruleBook.get_rules("word0"), ["rule0"])
+        self.assertEqual(ruleBook.get_category_words("Category1"), ["word1", "word9"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : test_textparser.py
+# Description : Regression tests of text cleansing against pattern-by-pattern application
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+import sys
+import re
+import random
+import importlib
+import unittest
+
+sys.path.insert(0, "../../..")
+import common.rpimod.wordproc.textparser as cparser
+
+# Dictionary sources, whose configured pattern sets are tested
+DICT_SOURCES = ['cambridge', 'collins', 'freedictionary', 'google', 'merriamwebster', 'oxford', 'randomhouse', 'youtube']
+
+# Fragments of dictionary entries matching, partly matching or joining into the configured patterns
+TEXT_TOKENS = ['\u200b', ':', ' ', '\n', '\xb7', '&quot;', 'x', 'y', '<', '>',
+               '<a href="x">', '<a>', '</a>', '<b>', '</b>', '<i>', '</i>', '<u>', '</u>', '<em>', '</em>',
+               '<span>', '<span class="dbox-ex">', '<span class="punctuation">', '<span class="illustration">', '<span lang=en>', '</span>',
+               '<div class="def-block def-inline-example">', '<div class="sds-list">', '</div>',
+               '<script>', '</script>', '<style>', '</style>']
+
+TEXT_SAMPLE_COUNT = 5000
+TEXT_MAX_TOKENS = 14
+
+
+def cleanse_text_in_turn(rawText, rawTextPatterns, rawInnerTextPatterns, rawOuterTextPatterns):
+    # Reference implementation, applying each pattern to the whole text in turn
+
+    cleansedText = rawText
+    for pattern in rawTextPatterns:
+        cleansedText = re.sub(pattern, cparser.UNICODE_EMPTY_STR, cleansedText, flags=re.DOTALL)
+    for enclosure in rawInnerTextPatterns:
+        cleansedText = re.sub(r'(' + enclosure[0] + r').*?(' + enclosure[1] + r')', r'\g<1>\g<2>', cleansedText, flags=re.DOTALL)
+    for enclosure in rawOuterTextPatterns:
+        cleansedText = re.sub(enclosure[0] + r'(.*?)' + enclosure[1], r'\g<1>', cleansedText, flags=re.DOTALL)
+    return cleansedText
+
+
+class TestCleanseText(unittest.TestCase):
+
+    def test_joined_text_patterns(self):
+        self.assertEqual(cparser.cleanse_text('a:\u200b b', ['\u200b', ': '], [], []), 'ab')
+
+
+    def test_source_patterns(self):
+        textRandom = random.Random(0)
+
+        for dictSource in DICT_SOURCES:
+            dictConfig = importlib.import_module('common.rpimod.wordproc.dict.' + dictSource).DictionaryConfig()
+            patterns = (dictConfig.clean_text_patterns, dictConfig.clean_inner_text_patterns, dictConfig.clean_outer_text_patterns)
+
+            for sampleIndex in range(TEXT_SAMPLE_COUNT):
+                rawText = "".join(textRandom.choice(TEXT_TOKENS) for tokenIndex in range(textRandom.randint(0, TEXT_MAX_TOKENS)))
+                with self.subTest(source=dictSource, text=rawText):
+                    self.assertEqual(cparser.cleanse_text(rawText, *patterns), cleanse_text_in_turn(rawText, *patterns))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,7 @@
 
 import sys
 import re
+import functools
 
 sys.path.insert(0, "../../..")
 import common.rpimod.stdio.output as coutput
@@ -19,14 +20,14 @@ import common.rpimod.stdio.output as coutput
 ################################################################
 
 # Set to True to turn debug messages on
-ERR_DEBUG = False
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
 
-UNICODE_EMPTY_STR = unicode("", 'utf-8')
-UNICODE_NEWLINE_STR = unicode("\n", 'utf-8')
+UNICODE_EMPTY_STR = ""
+UNICODE_NEWLINE_STR = "\n"
 
 
 def find_enclosed_text(rawStartPattern, rawEndPattern, text):
-    _FUNC_NAME_ = "find_enclosed_text"
 
     regexNonGreedyJoiner = r'(.*?)'
     rawSearchPattern = rawStartPattern + regexNonGreedyJoiner + rawEndPattern
@@ -39,53 +40,59 @@ def find_enclosed_text(rawStartPattern, rawEndPattern, text):
     return enclosedTextMatches
 
 
-def cleanse_text(rawText, rawTextPatterns, rawInnerTextPatterns, rawOuterTextPatterns ):
-    _FUNC_NAME_ = "cleanse_text"
+class TextCleanser(object):
+    """
+    Cleanses text with patterns compiled once, applied in the order below:
+        textPatterns: patterns to be removed
+        innerTextPatterns: [start, end] patterns whose enclosed text is to be removed
+        outerTextPatterns: [start, end] patterns to be removed preserving enclosed text
+    Each pattern is applied to the whole text in turn, as removing one match may join text into a match
+    for a later pattern, e.g. removing a zero-width space between ':' and ' ' leaves ': ' to be removed.
+    """
+    def __init__(self, textPatterns, innerTextPatterns, outerTextPatterns):
 
-    DEBUG_VAR="rawText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(rawText)))
+        self.substitutions = []
 
-    cleansedText = rawText
+        for pattern in textPatterns:
+            self.substitutions.append((re.compile(pattern, flags=re.DOTALL), UNICODE_EMPTY_STR))
 
-    DEBUG_VAR="cleansedText"
-    coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(cleansedText)))
+        for enclosure in innerTextPatterns:
+            self.substitutions.append((re.compile(r'(' + enclosure[0] + r').*?(' + enclosure[1] + r')', flags=re.DOTALL), r'\g<1>\g<2>'))
 
-    cleanseTextPatterns = rawTextPatterns
-    cleanseInnerTextPatterns = rawInnerTextPatterns
-    cleanseOuterTextPatterns = rawOuterTextPatterns
+        for enclosure in outerTextPatterns:
+            self.substitutions.append((re.compile(enclosure[0] + r'(.*?)' + enclosure[1], flags=re.DOTALL), r'\g<1>'))
 
-    # Cleanse text patterns
-    for pattern in cleanseTextPatterns:
-        DEBUG_VAR="pattern"
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(pattern)))
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
 
-        cleansedText = re.sub(pattern, UNICODE_EMPTY_STR, cleansedText, flags=re.DOTALL)
+    def cleanse(self, rawText):
 
-        DEBUG_VAR="cleansedText"
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(cleansedText)))
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+        cleansedText = rawText
+        for [pattern, replacement] in self.substitutions:
+            cleansedText = pattern.sub(replacement, cleansedText)
 
-    # Cleanse inner text surrounded by text patterns
-    for enclosure in cleanseInnerTextPatterns:
-        DEBUG_VAR="enclosure"
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(enclosure)))
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+        return cleansedText
 
-        pattern = r'(' + enclosure[0] + r').*?(' + enclosure[1] + r')'
-        cleansedText = re.sub(pattern, r'\g<1>\g<2>', cleansedText, flags=re.DOTALL)
 
-    # Cleanse outer text patterns preserving enclosed contents
-    for enclosure in cleanseOuterTextPatterns:
-        DEBUG_VAR="enclosure"
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, "{0} :: {1}".format(DEBUG_VAR, type(enclosure)))
-        coutput.print_debug(ERR_DEBUG, _FUNC_NAME_, eval(DEBUG_VAR))
+@functools.lru_cache(maxsize=None)
+def compile_text_cleanser(textPatterns, innerTextPatterns, outerTextPatterns):
+    return TextCleanser(textPatterns, innerTextPatterns, outerTextPatterns)
 
-        pattern = enclosure[0] + r'(.*?)' + enclosure[1]
-        cleansedText = re.sub(pattern, r'\g<1>', cleansedText, flags=re.DOTALL)
 
-    outputText = cleansedText
-    return outputText
+def get_text_cleanser(rawTextPatterns, rawInnerTextPatterns, rawOuterTextPatterns):
+
+    # Patterns are converted to tuples so that each combination is compiled only once
+    return compile_text_cleanser(tuple(rawTextPatterns),
+                                 tuple(tuple(enclosure) for enclosure in rawInnerTextPatterns),
+                                 tuple(tuple(enclosure) for enclosure in rawOuterTextPatterns))
+
+
+def cleanse_text(rawText, rawTextPatterns, rawInnerTextPatterns, rawOuterTextPatterns):
+
+    coutput.print_watcher('type(rawText)')
+
+    cleansedText = get_text_cleanser(rawTextPatterns, rawInnerTextPatterns, rawOuterTextPatterns).cleanse(rawText)
+
+    coutput.print_watcher('cleansedText')
+    return cleansedText
 
 
 ########################################################################
@@ -93,8 +100,8 @@ def cleanse_text(rawText, rawTextPatterns, rawInnerTextPatterns, rawOuterTextPat
 ########################################################################
 
 #rawText = "<tag1>apple</tag1><tag2>orange</tag2><tag3>banana</tag3>"
-#print rawText
+#print(rawText)
 #
 #cleanText = cleanse_text(rawText, [r'tag1'], [[r'<tag2>', r'</tag2>']], [[r'<tag3>', r'</tag3>']])
-#print cleanText
+#print(cleanText)
 
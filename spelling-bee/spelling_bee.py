@@ -2,8 +2,8 @@
 # -*- coding: utf-8 -*-
 
 ################################################################
-# Syntax :   sudo python spelling_bee.py runMode contestList mode selection -s -o
-# where      runMode is study, practice, revise, scan or test.
+# Syntax :   sudo python spelling_bee.py runMode contestList mode selection -s -o -p
+# where      runMode is study, practice, revise, scan, listen or test.
 #            contestList is the word list identifier for the contest in YYYY[-language][-challenge] format
 #            mode is chapter, count, word, random.
 #                In chapter mode, selection is the chapter number of the word list to be practiced.
@@ -13,6 +13,7 @@
 #                In random mode, selection is the range of words in the word list to be practiced.
 #            -s (--silent) is for silent mode
 #            -o (--offline) is for offline mode
+#            -p (--pack) is to build the audio pack of the word list before running
 # Example:    sudo python spelling_bee.py study 2016 chapter 7
 #             sudo python spelling_bee.py practice 2016-asian-languages count 1
 #             sudo python spelling_bee.py test 2016 count 10-15
@@ -20,6 +21,7 @@
 #             sudo python spelling_bee.py scan 2016 count 10-15
 #             sudo python spelling_bee.py test 2016 random 30
 #             sudo python spelling_bee.py revise 2016 random 10
+#             sudo python spelling_bee.py listen 2016 chapter 7
 ################################################################
 
 ################################################################
@@ -31,25 +33,29 @@
 # Yellow: Warning messages
 ################################################################
 
-# todo: Reduce import execution time
-
 import sys
 import os
 import time
 import argparse
 import math
 import re
-import urllib3
 import random
 import glob
+import functools
+import threading
 import traceback
 
 sys.path.insert(0, "..")
 import common.rpimod.stdio.input as cinput
 import common.rpimod.stdio.output as coutput
 import common.rpimod.stdio.fileio as cfile
+import common.rpimod.stdio.filecatalog as ccatalog
+import common.rpimod.stdio.audioplaylist as cplaylist
+import common.rpimod.wordproc.rulebook as crulebook
 import common.rpimod.wordproc.dict.dictionaryapi as cdictassist
 import common.rpimod.wordproc.dict.mwcollegiateapi as cdictapi
+import common.rpimod.wordproc.dict.parsepool as cparsepool
+import spelling_bee_config as sbconfig
 
 # Set to True to turn debug messages on
 #APP_DEBUG_MODE_ENABLED = True
@@ -71,29 +77,33 @@ SB_AUDIO_OUTPUT = 'Speaker'
 SB_REPEAT_COUNT = 1
 SB_REPEAT_DELAY = 1.5
 
+SB_LISTEN_GAP = 2.0                                             # Silence in seconds between words in listen mode
+SB_LISTEN_INDEX = True                                          # Set to True to announce word numbers in listen mode, if index clips exist
+
 SB_TEST_MODE = "easy"                                           # Available test modes are: easy, medium and difficult
 SB_TEST_SAVE_RESULT = True
 SB_TEST_SAVE_PRACTICE = True
 
 SB_USER_AGENT = {'user-agent': 'Mozilla/5.0 (Windows NT 6.1; WOW64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/48.0.2564.116 Safari/537.36'}
+SB_CONNECT_TIMEOUT = 5.0                                        # Timeouts in seconds of dictionary requests, so that a stalled
+SB_READ_TIMEOUT = 10.0                                          # download or stream does not hang lookups or playback
 
 ################################################################
 # Application Directories
 ################################################################
 
-SB_DATA_DIR = "data/"
+SB_DATA_DIR = sbconfig.SB_DATA_DIR
 SB_STUDY_DIR = SB_DATA_DIR + 'study/'
 SB_LOG_DIR = SB_DATA_DIR + 'log/'
-SB_DICT_OFFLINE_DIR = SB_DATA_DIR + 'dict/'
+SB_DICT_OFFLINE_DIR = sbconfig.SB_DICT_OFFLINE_DIR
+SB_PLAYLIST_DIR = SB_DATA_DIR + 'playlist/'
+SB_PACK_DIR = SB_DATA_DIR + 'pack/'
+SB_INDEX_CLIP_DIR = SB_DATA_DIR + 'index/'
 #SB_DICT_OVERRIDE_DIR = SB_DICT_OFFLINE_DIR + 'override/'
 
-SB_DICT_OVERRIDE_DIR_LIST = [
-    SB_DICT_OFFLINE_DIR + 'override/test/',
-    SB_DICT_OFFLINE_DIR + 'override/spellpundit/',
-    '/home/ditoj/projects/py3-raspi/spelling-bee/data/download/spellpundit/dict/'
-]
+SB_DICT_OVERRIDE_DIR_LIST = sbconfig.SB_DICT_OVERRIDE_DIR_LIST
 
-SB_APP_DIR_LIST = [SB_DATA_DIR, SB_STUDY_DIR, SB_LOG_DIR, SB_DICT_OFFLINE_DIR ] + SB_DICT_OVERRIDE_DIR_LIST
+SB_APP_DIR_LIST = [SB_DATA_DIR, SB_STUDY_DIR, SB_LOG_DIR, SB_DICT_OFFLINE_DIR, SB_PLAYLIST_DIR, SB_PACK_DIR ] + SB_DICT_OVERRIDE_DIR_LIST
 
 ################################################################
 # Application Files
@@ -122,6 +132,14 @@ SB_DICT_OVERRIDE_MSG = "sb_{WORD}.msg"
 SB_FEEDBACK_RIGHT = SB_DATA_DIR + "sb_feedback_correct.wav"
 SB_FEEDBACK_WRONG = SB_DATA_DIR + "sb_feedback_incorrect.wav"
 
+SB_PLAYLIST_FILE = "sb_{LISTID}_{SELECTION}.wav"
+SB_PLAYLIST_CUE = "sb_{LISTID}_{SELECTION}.cue"
+SB_PACK_FILE = "sb_{LISTID}.pack"                               # Decoded clips of a word list, built with -p
+SB_INDEX_CLIP = "sb_index_{INDEX}.wav"                          # Spoken word numbers, announced before each word in listen mode
+
+SB_AUDIO_MANIFEST = sbconfig.SB_AUDIO_MANIFEST
+SB_CATALOG_FILE = SB_DATA_DIR + "sb_catalog.pickle"              # Parsed word lists and rulebook, rebuilt as their files change
+
 ################################################################
 # Internal variables
 ################################################################
@@ -143,6 +161,7 @@ SB_SEC_SEP_LEN = 80
 
 SB_PRACTICE_KEYBOARD_MENU = "[N]ext [P]revious [R]epeat [G]oto Re[v]iew [S]how [L]ookup [K]ey [H]elp E[x]it"
 SB_TEST_KEYBOARD_MENU = "[R]epeat [K]ey [H]elp E[x]it"
+SB_LISTEN_KEYBOARD_MENU = "[N]ext [P]revious [R]epeat [G]oto [S]how [H]elp E[x]it"
 SB_REVISE_KEYBOARD_MENU = "[Y]es [N]o [R]epeat Re[v]iew [K]ey [H]elp E[x]it"
 
 SB_STUDY_WORD_DEFN_TITLE = "Definition of word #{INDEX} ({WORD}) [{SEQ}/{COUNT}]:"
@@ -152,10 +171,125 @@ SB_LOOKUP_WORD_DEFN_TITLE = "\nDictionary Entry ({WORD}):"
 SB_ERR_CLIP_MISSING = False
 SB_ERR_CLIP_MISMATCH = False
 
+SB_CLIP_SOURCE_OFFLINE = "offline"
+SB_CLIP_SOURCE_OVERRIDE = "override"
+
 SB_NEWLINE = "\n"
 SB_EMPTY_STRING = ""
 SB_WORD_DELIMITER = ";"
 
+# Patterns applied per word or per definition line are compiled once
+SB_INFO_VALUE_PATTERN = re.compile(r':[ ]*(.*)$', flags=re.M)
+
+
+@functools.lru_cache(maxsize=256)
+def get_word_mask_pattern(word):
+    # Words are matched literally, ignoring case
+    return re.compile(re.escape(word), flags=re.IGNORECASE)
+
+
+def read_rulebook_rules(wordFileName):
+    # Yields the (word, category, technique) rules in a rule book file (*rulebook.txt)
+
+    for ruleLine in cfile.read_lines(wordFileName):
+        ruleSegments = ruleLine.split(SB_WORD_DELIMITER)
+        ruleCategory = ruleSegments[0].strip()
+        ruleTechnique = ruleSegments[1].strip()
+
+        for ruleWord in ruleSegments[2].split(","):
+            yield (ruleWord.strip().lower(), ruleCategory, ruleTechnique)
+
+
+def read_wordset_rules(wordFileName):
+    # Yields the (word, category, technique) rules in a word set file (*wordset.txt)
+
+    for ruleLine in cfile.read_lines(wordFileName):
+        ruleSegments = ruleLine.split("|")
+
+        ruleCategory = "Word Set"
+        ruleType = ruleSegments[0].strip()
+        ruleSegments.pop(0)
+        ruleTechnique = "{}: {}".format(ruleType, ", ".join(ruleSegments))
+
+        for ruleSegment in ruleSegments:
+            for ruleWord in ruleSegment.split(";"):
+                yield (ruleWord.strip().lower(), ruleCategory, ruleTechnique)
+
+
+def read_rule_file(wordFileName):
+    # Yields the (word, category, technique) rules in a rule book or word set file
+
+    coutput.print_watcher('wordFileName')
+    if re.search(r'wordset.txt$', wordFileName):
+        return read_wordset_rules(wordFileName)
+    else:
+        return read_rulebook_rules(wordFileName)
+
+
+def read_rulebook_words(wordFileName):
+    # Yields the words of a rule book file (*rulebook.txt) in order of first occurrence
+
+    for ruleLine in cfile.read_lines(wordFileName):
+        ruleSegments = ruleLine.split(";")
+        for ruleWord in ruleSegments[2].split(","):
+            yield ruleWord.strip()
+
+
+def read_wordset_words(wordFileName):
+    # Yields the words of a word set file (*wordset.txt) in order of first occurrence
+
+    for setLine in cfile.read_lines(wordFileName):
+        setSegments = setLine.split("|")
+        setSegments.pop(0)
+
+        for setSegment in setSegments:
+            yield setSegment.strip()
+
+
+def read_unique_words(words):
+    # Yields each word once, in order of first occurrence
+
+    seenWords = set()
+    for word in words:
+        if word not in seenWords:
+            seenWords.add(word)
+            yield word
+
+
+def read_word_file(wordFileName):
+    # Yields the (word, vocabulary entry) records of a word list file, where the entry is None if not provided
+
+    # Retrieve words from rule book files (*rulebook.txt)
+    if re.search(r'rulebook.txt$', wordFileName) and not re.search(r'(practice|revision)', wordFileName):
+        for ruleWord in read_unique_words(read_rulebook_words(wordFileName)):
+            yield (ruleWord, None)
+
+    # Retrieve words from word set files (*wordset.txt)
+    elif re.search(r'wordset.txt$', wordFileName) and not re.search(r'(practice|revision)', wordFileName):
+        for setWord in read_unique_words(read_wordset_words(wordFileName)):
+            yield (setWord, None)
+
+    # Retrieve words and vocabulary entries from word list files (*.txt)
+    else:
+        for entry in cfile.read_lines(wordFileName):
+            entryElements = entry.split("|")
+            if len(entryElements) > 1:
+                yield (entryElements[0], entryElements[1])
+            else:
+                yield (entryElements[0], None)
+
+
+def parse_word_file(wordFileName):
+    # Returns the words and vocabulary entries of a word list file
+
+    wordList = []
+    vocabList = []
+    for [word, vocab] in read_word_file(wordFileName):
+        wordList.append(word)
+        vocabList.append(vocab)
+
+    return [wordList, vocabList]
+
 
 class SpellingBee(object):
     """
@@ -180,7 +314,7 @@ class SpellingBee(object):
         chapter_count():
         active_word_count():
     """
-    def __init__(self, runMode, listID, mode, selection, silentMode, offlineMode):
+    def __init__(self, runMode, listID, mode, selection, silentMode, offlineMode, packMode=False):
 
         self.runMode = runMode.lower()
         self.activeMode = mode.lower()
@@ -189,7 +323,7 @@ class SpellingBee(object):
         self.contestList = listID
         self.wordList = []
         self.vocabList = []
-        self.ruleBook = {}
+        self.ruleBook = crulebook.RuleBook()
 
         self.enableSaveResults = SB_TEST_SAVE_RESULT
         self.enableSavePracticeWords = SB_TEST_SAVE_PRACTICE
@@ -203,55 +337,31 @@ class SpellingBee(object):
         self.dictConfig = cdictapi.DictionaryConfig()
         self.dictAssist = cdictassist.DictionaryAssistant(self.dictConfig)
 
-        # Setup connection pool
-        self.connectionPool = urllib3.PoolManager(10, headers=SB_USER_AGENT)
+        # Offline dictionary entries parsed in bulk, consumed on lookup
+        self.parsedDictEntries = {}
+
+        # Connection pool is setup on first use, so that the network stack is not loaded while offline
+        self.connectionPool = None
+        self.connectionPoolLock = threading.Lock()
 
         # Setup application directories
         cfile.make_directory(SB_APP_DIR_LIST)
 
-        # Setup rulebook for advanced techniques
-        wordFileDir = SB_RULEBOOK_MULTI_FILES
-
-        for wordFileName in sorted(glob.glob(wordFileDir)):
-            coutput.print_watcher('wordFileName')
-
-            for ruleLine in cfile.read(wordFileName).splitlines():
-                ruleSegments = ruleLine.split(SB_WORD_DELIMITER)
-                ruleCategory = ruleSegments[0].strip()
-                ruleTechnique = ruleSegments[1].strip()
-                ruleWords = [w.strip().lower() for w in ruleSegments[2].split(",")]
+        # Setup audio manifest, recording offline clips added or changed since the last session by file state only
+        # Lookups consult it in memory, and validate on demand any clip not yet validated in the background
+        self.audioManifest = cfile.load_audio_manifest(SB_AUDIO_MANIFEST)
+        pendingClipFileNames = self.audioManifest.refresh_clips(SB_DICT_OFFLINE_DIR, SB_DICT_OFFLINE_CLIP.format(WORD='*'))
+        coutput.print_watcher('pendingClipFileNames')
 
-                for ruleWord in ruleWords:
-                    if ruleWord not in self.ruleBook:
-                        self.ruleBook[ruleWord] = {'Category': ruleCategory, 'Rule': [ruleTechnique]}
-                    else:
-                        if ruleTechnique not in self.ruleBook[ruleWord]['Rule']:
-                            self.ruleBook[ruleWord]['Rule'] = self.ruleBook[ruleWord]['Rule'] + [ruleTechnique]
+        # Setup catalog of parsed word lists and rulebook, so that only files changed since the last session are parsed
+        self.catalog = ccatalog.FileCatalog(SB_CATALOG_FILE)
 
+        # Setup rulebook for advanced techniques and word sets
+        # The merged rulebook is rebuilt if any rule file changes, from the rules of each file cached in the catalog
+        ruleFileNames = sorted(glob.glob(SB_RULEBOOK_MULTI_FILES)) + sorted(glob.glob(SB_WORDSET_MULTI_FILES))
+        self.ruleBook = self.catalog.load('ruleBookIndex', ruleFileNames,
+                                          lambda fileNames: crulebook.build_rulebook(fileNames, self.catalog, read_rule_file))
         coutput.print_watcher('self.ruleBook')
-        
-        # Setup rulebook for word sets
-        wordFileDir = SB_WORDSET_MULTI_FILES
-
-        for wordFileName in sorted(glob.glob(wordFileDir)):
-            coutput.print_watcher('wordFileName')
-
-            for ruleLine in cfile.read(wordFileName).splitlines():
-                ruleSegments = ruleLine.split("|")
-                
-                ruleCategory = "Word Set"
-                ruleType = ruleSegments[0].strip()
-                ruleSegments.pop(0)
-                ruleTechnique = "{}: {}".format(ruleType, ", ".join(ruleSegments))
-
-                for ruleSegment in ruleSegments:
-                    ruleWords = [w.strip().lower() for w in ruleSegment.split(";")]
-                    for ruleWord in ruleWords:
-                        if ruleWord not in self.ruleBook:
-                            self.ruleBook[ruleWord] = {'Category': ruleCategory, 'Rule': [ruleTechnique]}
-                        else:
-                            if ruleTechnique not in self.ruleBook[ruleWord]['Rule']:
-                                self.ruleBook[ruleWord]['Rule'] = self.ruleBook[ruleWord]['Rule'] + [ruleTechnique]
 
         if re.match(r'^practice', listID):
             wordFileDir = SB_PRACTICE_MULTI_FILES.format(WORD_FILE_PATTERN=listID)
@@ -261,51 +371,15 @@ class SpellingBee(object):
         for wordFileName in sorted(glob.glob(wordFileDir)):
             coutput.print_watcher('wordFileName')
 
-            # Retrieve words from rule book files (*rulebook.txt)
-            if re.search(r'rulebook.txt$', wordFileName) and not re.search(r'(practice|revision)', wordFileName):
-                ruleWordSet = set()
-                for ruleLine in cfile.read(wordFileName).splitlines():
-                    ruleSegments = ruleLine.split(";")
-                    ruleWords = [w.strip() for w in ruleSegments[2].split(",")]
-
-                    for ruleWord in ruleWords:
-                        ruleWordSet.add(ruleWord)
-                    
-                for ruleWord in ruleWordSet:
-                    self.wordList.append(ruleWord)
-                    self.vocabList.append(None)
-
-            # Retrieve words from word set files (*wordset.txt)
-            elif re.search(r'wordset.txt$', wordFileName) and not re.search(r'(practice|revision)', wordFileName):
-                wordSet = []
-                for setLine in cfile.read(wordFileName).splitlines():
-                    setSegments = setLine.split("|")
-                    
-                    setCategory = setSegments[0]
-                    setSegments.pop(0)
-                    
-                    for setSegment in setSegments:
-                        setWord = setSegment.strip()
-                        if setWord not in wordSet:
-                            wordSet.append(setWord)
-                            self.wordList.append(setWord)
-                            self.vocabList.append(None)
-
-            # Retrieve words and vocabulary entries from word list files (*.txt)
-            else:
-                # Use of splitlines() avoids the newline character from being stored in the word list
-                entryList = cfile.read(wordFileName).splitlines()
-                for entry in entryList:
-                    entryElements = entry.split("|")
-                    self.wordList.append(entryElements[0])
-                    if len(entryElements) > 1:
-                        self.vocabList.append(entryElements[1])
-                    else:
-                        self.vocabList.append(None)
+            [fileWordList, fileVocabList] = self.catalog.load_file(wordFileName, parse_word_file)
+            self.wordList.extend(fileWordList)
+            self.vocabList.extend(fileVocabList)
 
             coutput.print_watcher('self.wordList')
             coutput.print_watcher('self.vocabList')
 
+        self.catalog.save()
+
         rangeSelection = selection.split("-")
         self.activeChapter = "0"
 
@@ -360,6 +434,22 @@ class SpellingBee(object):
         self.activeTestValuations = []
         self.activePracticeWords = []
 
+        # Setup audio pack of the word list, so that its clips are resolved and played without file access
+        # The pack is rebuilt only if requested, as packing decodes every clip; a pack built before offline clips
+        # changed is ignored, and clips are loaded from their files
+        packFileName = SB_PACK_DIR + cfile.cleanse_filename(SB_PACK_FILE.format(LISTID=self.contestList))
+        if packMode:
+            self.build_audio_pack(packFileName)
+
+        self.audioPack = cfile.load_audio_pack(packFileName)
+        if self.audioPack is not None and not self.is_audio_pack_current():
+            coutput.print_warn("Audio pack for {0} is out of date, and is not used. Run with -p to rebuild it.".format(self.contestList))
+            cfile.unload_audio_pack()
+            self.audioPack = None
+
+        # Validate offline clips in the background, so that a cold manifest does not delay the first prompt
+        threading.Thread(target=self.refresh_offline_clips, args=(pendingClipFileNames,), daemon=True).start()
+
 
     def shut_down(self):
 
@@ -370,6 +460,68 @@ class SpellingBee(object):
             self.connectionPool.clear()
 
 
+    def refresh_offline_clips(self, pendingClipFileNames):
+        # Validates offline clips added or changed since the last session, and downloads again the invalid clips
+        # of words in the word list, from the pronunciation URLs of their offline entries
+        # Runs in the background, so reports only debug messages
+
+        self.audioManifest.validate_clips(pendingClipFileNames)
+        if self.offlineMode:
+            return
+
+        # Imported here, as the network stack is loaded only when online
+        import urllib3.exceptions
+
+        invalidClipFileNames = set(self.audioManifest.get_invalid_clips(SB_DICT_OFFLINE_DIR, SB_DICT_OFFLINE_CLIP.format(WORD='*')))
+        coutput.print_watcher('invalidClipFileNames')
+
+        for word in self.wordList:
+            activeWord = word.strip().split(SB_WORD_DELIMITER)[0].strip()
+            offlineProncnFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_CLIP.format(WORD=activeWord))
+            offlineEntryFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_ENTR.format(WORD=activeWord))
+
+            if os.path.normpath(offlineProncnFileName) not in invalidClipFileNames:
+                continue
+            if not os.path.isfile(offlineEntryFileName):
+                continue
+
+            offlineDictEntry = cdictapi.DictionaryEntry(self.dictConfig, activeWord, cfile.read(offlineEntryFileName))
+            if not offlineDictEntry.has_content():
+                continue
+
+            dictEntry = offlineDictEntry.simplified_word_entry
+            if not dictEntry.has_pronunciation_audio_url():
+                continue
+
+            # Clips are downloaded to a temporary file, so that a clip being played is replaced only once complete
+            # A failed clip is skipped, while connection errors and timeouts end the refresh, as other clips would fail too
+            tempProncnFileName = offlineProncnFileName + ".tmp"
+            try:
+                cfile.download(self.get_connection_pool(), dictEntry.pronunciation.audio_url, tempProncnFileName)
+                os.replace(tempProncnFileName, offlineProncnFileName)
+            except (urllib3.exceptions.MaxRetryError, urllib3.exceptions.TimeoutError) as e:
+                coutput.print_debug("Unable to connect to download {0} :: {1}".format(offlineProncnFileName, e))
+                cfile.delete(tempProncnFileName)
+                return
+            except Exception as e:
+                coutput.print_debug("Unable to download {0} :: {1}".format(offlineProncnFileName, e))
+                cfile.delete(tempProncnFileName)
+                continue
+
+            coutput.print_debug("Downloaded {0} :: valid {1}".format(offlineProncnFileName, self.audioManifest.register_clip(offlineProncnFileName)))
+
+
+    def get_connection_pool(self):
+
+        # Locked, as offline clips are downloaded again in the background
+        with self.connectionPoolLock:
+            if self.connectionPool is None:
+                import urllib3
+                self.connectionPool = urllib3.PoolManager(10, headers=SB_USER_AGENT, timeout=urllib3.Timeout(connect=SB_CONNECT_TIMEOUT, read=SB_READ_TIMEOUT))
+
+        return self.connectionPool
+
+
     def __del__(self):
 
         # No action required
@@ -433,6 +585,105 @@ class SpellingBee(object):
 
         return resultIndex
 
+    def get_word_clip(self, word):
+        # Returns the offline pronunciation clip of a word and its source, preferring overrides as in lookup
+        # Returns None as the clip if not available
+
+        wordAlternatives = word.strip()
+        activeWord = wordAlternatives.split(SB_WORD_DELIMITER)[0].strip()
+
+        overrideProncnFileName = cfile.find_file(cfile.cleanse_filename(SB_DICT_OVERRIDE_CLIP.format(WORD=wordAlternatives)), SB_DICT_OVERRIDE_DIR_LIST)
+        if overrideProncnFileName is not None:
+            return [overrideProncnFileName, SB_CLIP_SOURCE_OVERRIDE]
+
+        offlineProncnFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_CLIP.format(WORD=activeWord))
+        if self.audioManifest.is_valid_clip(offlineProncnFileName):
+            return [offlineProncnFileName, SB_CLIP_SOURCE_OFFLINE]
+
+        return [None, None]
+
+    def build_audio_pack(self, packFileName):
+        # Packs the offline pronunciations of all the words in the word list
+
+        print("Building audio pack for {0} ...".format(self.contestList))
+
+        wordClips = []
+        for word in self.wordList:
+            [clipFileName, clipSource] = self.get_word_clip(word)
+            if clipFileName is not None:
+                wordClips.append((word.strip(), clipFileName, clipSource))
+
+        clipCount = cfile.build_audio_pack(packFileName, wordClips)
+        print("Packed {0} of {1} pronunciations".format(clipCount, self.word_count()))
+
+    def is_audio_pack_current(self):
+        # Returns True if every packed offline clip is unchanged and was packed at its current levels, as recorded
+        # in the audio manifest
+        # Override clips are not tracked, and are repacked with -p
+
+        for word in self.wordList:
+            packedClip = self.audioPack.get_entry(word.strip())
+            if packedClip is not None and packedClip['source'] == SB_CLIP_SOURCE_OFFLINE:
+                clipEntry = self.audioManifest.get_entry(packedClip['path'])
+                if clipEntry is None or (clipEntry['size'], clipEntry['mtime_ns']) != (packedClip['size'], packedClip['mtime_ns']):
+                    return False
+                # Levels are read from the entry rather than get_clip_levels, so that no clip is accessed
+                packedLevels = packedClip.get('levels') or {}
+                if any(packedLevels.get(levelKey) != clipEntry.get(levelKey) for levelKey in ['speech_start', 'speech_end', 'gain']):
+                    return False
+
+        return True
+
+    def render_listening_playlist(self):
+        # Renders the offline pronunciations of the active words into a single playlist, announcing word numbers if enabled
+        # Returns the playlist file name and the list of (word, start in seconds) of its tracks
+
+        trackClips = []
+        for wordIndex in self.activeWordIndexList:
+            if wordIndex >= self.word_count():
+                break
+
+            word = self.wordList[wordIndex]
+            [clipFileName, clipSource] = self.get_word_clip(word)
+            if clipFileName is None:
+                coutput.print_warn("Unable to locate pronunciation of '{0}' offline".format(word))
+                continue
+
+            clipFileNames = [clipFileName]
+            indexClipFileName = SB_INDEX_CLIP_DIR + SB_INDEX_CLIP.format(INDEX=wordIndex + 1)
+            if SB_LISTEN_INDEX and os.path.isfile(indexClipFileName):
+                clipFileNames.insert(0, indexClipFileName)
+
+            trackClips.append((word.split(SB_WORD_DELIMITER)[0].strip(), clipFileNames))
+
+        if self.activeMode == "random":
+            playlistSelection = self.activeMode
+        else:
+            playlistSelection = "{0}-{1}".format(self.activeRangeStart + 1, self.activeRangeEnd + 1)
+
+        playlistFileName = SB_PLAYLIST_DIR + cfile.cleanse_filename(SB_PLAYLIST_FILE.format(LISTID=self.contestList, SELECTION=playlistSelection))
+        cueFileName = SB_PLAYLIST_DIR + cfile.cleanse_filename(SB_PLAYLIST_CUE.format(LISTID=self.contestList, SELECTION=playlistSelection))
+
+        return [playlistFileName, cfile.render_playlist(playlistFileName, cueFileName, trackClips, SB_LISTEN_GAP)]
+
+    def parse_offline_entries(self, wordIndexList):
+
+        # Parse offline dictionary entries of the given words across worker processes
+        wordEntryTexts = []
+        for wordIndex in wordIndexList:
+            word = self.wordList[wordIndex].strip().split(SB_WORD_DELIMITER)[0].strip()
+            offlineEntryFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_ENTR.format(WORD=word))
+
+            # Entries without content, e.g. placeholders of words not found, are not sent to the workers
+            if os.path.isfile(offlineEntryFileName):
+                entryText = cfile.read(offlineEntryFileName)
+                if self.dictConfig.has_entry_content(entryText):
+                    wordEntryTexts.append((word, entryText))
+
+        coutput.print_watcher('len(wordEntryTexts)')
+        self.parsedDictEntries.update(cparsepool.parse_entries(cdictapi.__name__, wordEntryTexts))
+
+
     def lookup_dictionary_by_word(self, word):
 
         coutput.print_watcher('word')
@@ -455,13 +706,17 @@ class SpellingBee(object):
         coutput.print_debug("Pass #1: Check primary source offline for word entry")
         offlineEntryFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_ENTR.format(WORD=self.activeWord))
 
-        if os.path.isfile(offlineEntryFileName) and os.path.getsize(offlineEntryFileName) > 100:
-            coutput.print_watcher('os.path.getsize(offlineEntryFileName)')
-            
+        if os.path.isfile(offlineEntryFileName):
             self.activeEntry = cfile.read(offlineEntryFileName)
   
-            # Set active dictionary entry
-            self.activeDictEntry = cdictapi.DictionaryEntry(self.dictConfig, self.activeWord, self.activeEntry).simplified_word_entry
+            # Set active dictionary entry, using the entry parsed in bulk, if any
+            # Entries without content are not parsed, so that the word is looked up online
+            if self.activeWord in self.parsedDictEntries:
+                self.activeDictEntry = self.parsedDictEntries.pop(self.activeWord)
+            else:
+                offlineDictEntry = cdictapi.DictionaryEntry(self.dictConfig, self.activeWord, self.activeEntry)
+                if offlineDictEntry.has_content():
+                    self.activeDictEntry = offlineDictEntry.simplified_word_entry
 
             coutput.print_watcher('self.activeDictEntry')
 
@@ -474,7 +729,7 @@ class SpellingBee(object):
                     coutput.print_watcher('offlineEntryFileName')
                     coutput.print_watcher('self.activeWord')
 
-                    self.activeEntry = self.dictAssist.download_entry(self.connectionPool, self.activeWord)
+                    self.activeEntry = self.dictAssist.download_entry(self.get_connection_pool(), self.activeWord)
 
                     coutput.print_debug("Saving offline dictionary entry to file")
                     coutput.print_watcher('self.activeEntry')
@@ -483,8 +738,9 @@ class SpellingBee(object):
                     cfile.write(offlineEntryFileName, self.activeEntry)
 
                     # Set active dictionary entry
-                    if os.path.isfile(offlineEntryFileName) and os.path.getsize(offlineEntryFileName) > 100:
-                        self.activeDictEntry = cdictapi.DictionaryEntry(self.dictConfig, self.activeWord, self.activeEntry).simplified_word_entry
+                    onlineDictEntry = cdictapi.DictionaryEntry(self.dictConfig, self.activeWord, self.activeEntry)
+                    if onlineDictEntry.has_content():
+                        self.activeDictEntry = onlineDictEntry.simplified_word_entry
             
                     coutput.print_watcher('self.activeDictEntry')
 
@@ -535,8 +791,8 @@ class SpellingBee(object):
         coutput.print_debug("Pass #4: Check primary source offline for word pronunciation")
         offlineProncnFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_CLIP.format(WORD=self.activeWord))
 
-        if os.path.isfile(offlineProncnFileName) and os.path.getsize(offlineProncnFileName) > 1000:
-            coutput.print_watcher('os.path.getsize(offlineProncnFileName)')
+        if self.audioManifest.is_valid_clip(offlineProncnFileName):
+            coutput.print_watcher('self.audioManifest.get_entry(offlineProncnFileName)')
             coutput.print_watcher('self.activeWord')
 
             offlineProncnURL = "[Offline Dictionary Pronunciation]"
@@ -554,9 +810,9 @@ class SpellingBee(object):
             if self.activeDictEntry is not None and self.activeDictEntry.has_pronunciation() and self.activeDictEntry.has_pronunciation_audio() is False:
                 try:
                     # Download and save pronunciation audio offline
-                    cfile.download(self.connectionPool, self.activeDictEntry.pronunciation.audio_url, offlineProncnFileName)
+                    cfile.download(self.get_connection_pool(), self.activeDictEntry.pronunciation.audio_url, offlineProncnFileName)
 
-                    if os.path.isfile(offlineProncnFileName) and os.path.getsize(offlineProncnFileName) > 1000:
+                    if self.audioManifest.register_clip(offlineProncnFileName):
                         onlineProncnURL = "[Online Dictionary Pronunciation URL]"
                         onlineProncnForm = "[Online Dictionary Pronunciation Form]"
                         onlineProncnSpell = "[Online Dictionary Pronunciation Spelling]"
@@ -571,7 +827,12 @@ class SpellingBee(object):
 
         # Pass #6: Check for dictionary pronunciation override
         coutput.print_debug("Pass #6: Check for dictionary pronunciation override")
-        overrideProncnFileName = cfile.find_file(cfile.cleanse_filename(SB_DICT_OVERRIDE_CLIP.format(WORD=self.activeWordAlternatives)), SB_DICT_OVERRIDE_DIR_LIST)
+        # Words in the audio pack are resolved from its index, without searching override directories
+        packedClip = self.audioPack.get_entry(self.activeWordAlternatives) if self.audioPack is not None else None
+        if packedClip is not None:
+            overrideProncnFileName = packedClip['path'] if packedClip['source'] == SB_CLIP_SOURCE_OVERRIDE else None
+        else:
+            overrideProncnFileName = cfile.find_file(cfile.cleanse_filename(SB_DICT_OVERRIDE_CLIP.format(WORD=self.activeWordAlternatives)), SB_DICT_OVERRIDE_DIR_LIST)
         coutput.print_watcher('overrideProncnFileName')
 
         #if os.path.isfile(overrideProncnFileName) and os.path.getsize(overrideProncnFileName) > 0:
@@ -621,13 +882,13 @@ class SpellingBee(object):
 
     def lookup_all_dictionaries_by_word(self, word):
 
-        cdictall.lookup_word(self.connectionPool, SB_AUDIO_OUTPUT, SB_REPEAT_COUNT, SB_REPEAT_DELAY, word)
+        cdictall.lookup_word(self.get_connection_pool(), SB_AUDIO_OUTPUT, SB_REPEAT_COUNT, SB_REPEAT_DELAY, word)
 
 
     def mask_active_word(self, word, text, mask_flag):
 
         if mask_flag:
-            return re.sub(word, SB_MASK_SYMBOL * len(word), text, flags=re.IGNORECASE)
+            return get_word_mask_pattern(word).sub(SB_MASK_SYMBOL * len(word), text)
         else:
             return text
 
@@ -646,17 +907,19 @@ class SpellingBee(object):
                 coutput.print_watcher('definition')
                                
                 # Ignore comments and info lines with # prefix
-                if re.match(r'^#', definition):
+                if definition.startswith('#'):
                     pass
                 else:
                     if definitionIndex >= SB_DEFINITION_COUNT:
                         break
 
                     # Mask definitions that contain the word itself and remove importance prefix "*"
-                    masked_definition = re.sub('^\*', SB_EMPTY_STRING, self.mask_active_word(word, definition, SB_DEFINITION_HIDE_EXPLICIT), flags=re.IGNORECASE)
+                    masked_definition = self.mask_active_word(word, definition, SB_DEFINITION_HIDE_EXPLICIT)
+                    if masked_definition.startswith('*'):
+                        masked_definition = masked_definition[1:]
 
                     # Check for override definitions from the word list prefixed with "*"
-                    if re.match(r'^\*', definition):
+                    if definition.startswith('*'):
                         coutput.print_color('cyan', SB_SPL_BULLET + masked_definition )
                     else:
                         print(SB_LIST_BULLET + masked_definition)
@@ -667,7 +930,7 @@ class SpellingBee(object):
             if dictEntry.etymology != SB_EMPTY_STRING:
                 coutput.print_color('cyan', 'Etymology: ' + dictEntry.etymology )
             if dictEntry.examples != SB_EMPTY_STRING:
-                coutput.print_color('white', 'Examples: ' + re.sub(';', ', ', dictEntry.examples) )
+                coutput.print_color('white', 'Examples: ' + dictEntry.examples.replace(';', ', ') )
 
             # Print info lines
             for definition in dictEntry.definitions:
@@ -678,9 +941,9 @@ class SpellingBee(object):
                     pass
 
                 # Print info with #! prefix
-                elif re.match(r'^#!', definition):
-                    infoText = re.sub('^#!', SB_EMPTY_STRING, definition, flags=re.IGNORECASE)
-                    reMatch = re.search(":[ ]*(.*)$", infoText, flags=re.M)
+                elif definition.startswith('#!'):
+                    infoText = definition[2:]
+                    reMatch = SB_INFO_VALUE_PATTERN.search(infoText)
 
                     # Ignore empty info lines
                     if reMatch.group(1) != SB_EMPTY_STRING:
@@ -724,12 +987,19 @@ class SpellingBee(object):
                    
                     self.dictAssist.compare_word_form(keyWord, entryWord)
                     
+                    # File playback runs in the background, and is stopped by the next keypress
                     if fileMode is True:
-                        coutput.print_debug("Executing cfile.play")
-                        cfile.play(dictEntry.pronunciation.audio_file, SB_AUDIO_OUTPUT, SB_REPEAT_COUNT, SB_REPEAT_DELAY)
+                        coutput.print_debug("Executing cfile.play_async")
+                        cfile.play_async(dictEntry.pronunciation.audio_file, SB_AUDIO_OUTPUT, SB_REPEAT_COUNT, SB_REPEAT_DELAY)
+                    # Online playback streams the clip in the background, and saves it offline for later lookups if not
+                    # already saved, once the whole clip has been received
                     else:
-                        coutput.print_debug("Executing cfile.play_url")
-                        cfile.play_url(self.connectionPool, dictEntry.pronunciation.audio_url, SB_AUDIO_OUTPUT, SB_REPEAT_COUNT, SB_REPEAT_DELAY)
+                        offlineProncnFileName = SB_DICT_OFFLINE_DIR + cfile.cleanse_filename(SB_DICT_OFFLINE_CLIP.format(WORD=word))
+                        if self.audioManifest.is_valid_clip(offlineProncnFileName) or not dictEntry.pronunciation.audio_url.lower().endswith(".wav"):
+                            offlineProncnFileName = None
+
+                        coutput.print_debug("Executing cfile.play_url_async")
+                        cfile.play_url_async(self.get_connection_pool(), dictEntry.pronunciation.audio_url, SB_AUDIO_OUTPUT, SB_REPEAT_COUNT, SB_REPEAT_DELAY, offlineProncnFileName)
 
 
     def print_word_tip(self, word):
@@ -744,9 +1014,9 @@ class SpellingBee(object):
 
     def print_word_rule(self, word):
         # Check for word rules
-        if word.lower() in self.ruleBook:
-            coutput.print_color('green', '\nRule Book: ' + self.ruleBook[word.lower()]['Category'])
-            for rule in self.ruleBook[word.lower()]['Rule']:
+        if word in self.ruleBook:
+            coutput.print_color('green', '\nRule Book: ' + self.ruleBook.get_category(word))
+            for rule in self.ruleBook.get_rules(word):
                 coutput.print_color('magenta', SB_LIST_BULLET + rule)
 
 
@@ -800,10 +1070,11 @@ class SpellingBee(object):
     def display_word_lookup(self, word, title, testMode):
 
         try:
-            entryData = self.dictAssist.download_entry(self.connectionPool, word)
-            dictEntry = cdictapi.DictionaryEntry(self.dictConfig, word, entryData).simplified_word_entry
+            entryData = self.dictAssist.download_entry(self.get_connection_pool(), word)
+            onlineDictEntry = cdictapi.DictionaryEntry(self.dictConfig, word, entryData)
+            dictEntry = onlineDictEntry.simplified_word_entry if onlineDictEntry.has_content() else None
         
-            if dictEntry.source == SB_EMPTY_STRING:
+            if dictEntry is None or dictEntry.source == SB_EMPTY_STRING:
                 coutput.print_err("Unable to lookup dictionary entry for " + word)
             else:    
                 coutput.print_color('green', title)
@@ -971,7 +1242,7 @@ class SpellingBee(object):
         # Print colorized test valuations
         coloredTestValuations = []
         for valuation in self.activeTestValuations:
-            if re.match('^' + SB_RIGHT_SYMBOL + '.*', valuation):
+            if valuation.startswith(SB_RIGHT_SYMBOL):
                 textColor = coutput.get_term_color('green', 'normal', 'normal')
             else:
                 textColor = coutput.get_term_color('red', 'normal', 'normal')
@@ -1016,6 +1287,7 @@ def init_app():
     cinput.set_term_input(False)
 
 
+
 def exit_app():
     # Resume input from stdin
     cinput.set_term_input(True)
@@ -1024,10 +1296,26 @@ def exit_app():
     exit()
 
 
+def get_user_keypress(prompt):
+    # Any keypress stops pronunciation audio still playing
+    userKeypress = cinput.get_keypress(prompt)
+    cfile.stop_audio()
+    return userKeypress
+
+
+def get_user_input(prompt):
+    # Entering a response stops pronunciation audio still playing
+    userInput = cinput.get_input(prompt)
+    cfile.stop_audio()
+    return userInput
+
+
 def display_help(runMode):
 
     if runMode.lower() == "test":
         print("\n{0} Keyboard Menu: {1}".format(runMode.title(), SB_TEST_KEYBOARD_MENU))
+    elif runMode.lower() == "listen":
+        print("\n{0} Keyboard Menu: {1}".format(runMode.title(), SB_LISTEN_KEYBOARD_MENU))
     elif runMode.lower() == "revise":
         print("\n{0} Keyboard Menu: {1}".format(runMode.title(), SB_REVISE_KEYBOARD_MENU))
     else:
@@ -1044,6 +1332,11 @@ def run_study(app, practiceMode):
     else:
         app.display_about()
     display_help(userPracticeMode)
+
+    # Open the audio output while the student gets ready
+    if not app.silentMode:
+        cfile.open_audio_output(SB_AUDIO_OUTPUT)
+
     userInput = cinput.get_keypress("\nReady to {0}? Press any key when ready ... ".format(userPracticeMode))
 
     activeWordIndex = 0
@@ -1072,7 +1365,7 @@ def run_study(app, practiceMode):
         app.display_word_cue(titleText, userPracticeMode)
 
         coutput.print_debug("Prompting for user keypress")
-        userInput = cinput.get_keypress(SB_PROMPT_SYMBOL).lower()
+        userInput = get_user_keypress(SB_PROMPT_SYMBOL).lower()
         print(SB_PRI_SEP_SYMBOL * SB_PRI_SEP_LEN)
 
         while True:
@@ -1134,7 +1427,7 @@ def run_study(app, practiceMode):
             # Prompt for user input
             print(SB_SEC_SEP_SYMBOL * SB_SEC_SEP_LEN)
             display_help(userPracticeMode)
-            userInput = cinput.get_keypress(SB_PROMPT_SYMBOL).lower()
+            userInput = get_user_keypress(SB_PROMPT_SYMBOL).lower()
             print(SB_PRI_SEP_SYMBOL * SB_PRI_SEP_LEN)
 
 
@@ -1142,6 +1435,11 @@ def run_test(app, practiceMode):
 
     userPracticeMode = practiceMode.strip().lower()
 
+    # Open the audio output and load the feedback sounds while the student gets ready,
+    # as feedback is played after every answer, even in silent mode
+    cfile.open_audio_output(SB_AUDIO_OUTPUT)
+    cfile.pin_audio([SB_FEEDBACK_RIGHT, SB_FEEDBACK_WRONG])
+
     if userPracticeMode == "test":
         app.display_about()
         display_help(userPracticeMode)
@@ -1180,13 +1478,13 @@ def run_test(app, practiceMode):
             print("\n" + SB_PRI_SEP_SYMBOL * SB_PRI_SEP_LEN)
             app.display_word_cue(titleText, userPracticeMode)
             print(SB_SEC_SEP_SYMBOL * SB_SEC_SEP_LEN)
-            userResponse = cinput.get_input("Enter spelling: ")
+            userResponse = get_user_input("Enter spelling: ")
         else:
             titleText = SB_STUDY_WORD_DEFN_TITLE.format(INDEX=wordIndex + 1, WORD=app.activeWordAlternatives, SEQ=activeWordIndex + 1, COUNT=len(app.activeWordIndexList))
             print("\n" + SB_PRI_SEP_SYMBOL * SB_PRI_SEP_LEN)
             app.display_word_cue(titleText, userPracticeMode)
             print(SB_SEC_SEP_SYMBOL * SB_SEC_SEP_LEN)
-            userResponse = cinput.get_keypress("Enter response: ")
+            userResponse = get_user_keypress("Enter response: ")
 
         # E[x]it test
         if userResponse.lower() == "x":
@@ -1320,6 +1618,9 @@ def run_scan(app):
     coutput.print_watcher('activeWordIndex')
     coutput.print_watcher('len(app.activeWordIndexList)')
 
+    # Parse offline entries of all words upfront, across processor cores
+    app.parse_offline_entries(app.activeWordIndexList)
+
     while True:
         if (activeWordIndex < 0) or (activeWordIndex >= len(app.activeWordIndexList)):
             break
@@ -1341,22 +1642,97 @@ def run_scan(app):
     print("\nError scan is complete. All errors logged to " + SB_ERR_LOG)
     
 
+def run_listen(app):
+
+    userPracticeMode = "listen"
+
+    app.display_about()
+    display_help(userPracticeMode)
+
+    # Open the audio output and render the playlist while the student gets ready
+    cfile.open_audio_output(SB_AUDIO_OUTPUT)
+    [playlistFileName, tracks] = app.render_listening_playlist()
+    coutput.print_watcher('playlistFileName')
+
+    if len(tracks) == 0:
+        coutput.print_err("Unable to locate pronunciations of the active words offline")
+        return
+
+    userInput = cinput.get_keypress("\nReady to listen? Press any key when ready ... ")
+
+    activeTrackIndex = 0
+
+    while True:
+        # Play continuously from the active word, tracking the position played to follow the word playing
+        trackStart = tracks[activeTrackIndex][1]
+        playbackStartTime = time.monotonic()
+        cfile.play_playlist_async(playlistFileName, SB_AUDIO_OUTPUT, trackStart)
+
+        coutput.print_debug("Prompting for user keypress")
+        userInput = cinput.get_keypress(SB_PROMPT_SYMBOL).lower()
+
+        while True:
+            playingTrackIndex = cplaylist.get_track_index(tracks, trackStart + time.monotonic() - playbackStartTime)
+            coutput.print_watcher('playingTrackIndex')
+
+            # Move to [n]ext word
+            if userInput == "n":
+                activeTrackIndex = min(playingTrackIndex + 1, len(tracks) - 1)
+                break
+            # Move to [p]revious word
+            elif userInput == "p":
+                activeTrackIndex = max(playingTrackIndex - 1, 0)
+                break
+            # [R]epeat current word
+            elif userInput == "r":
+                activeTrackIndex = playingTrackIndex
+                break
+            # [G]oto to word
+            elif userInput == "g":
+                nextWord = cinput.get_input("\nEnter goto word: ").strip().lower()
+                nextIndex = next((trackIndex for trackIndex, track in enumerate(tracks) if nextWord and track[0].lower().startswith(nextWord)), -1)
+                if nextIndex < 0:
+                    coutput.print_err("Unable to locate '{0}' in playlist".format(nextWord))
+                else:
+                    activeTrackIndex = nextIndex
+                    break
+            # [S]how current word spelling
+            elif userInput == "s":
+                print("\nWord [{0}/{1}]: {2}".format(playingTrackIndex + 1, len(tracks), tracks[playingTrackIndex][0]))
+            # Display [h]elp and statistics
+            elif userInput == "h":
+                print(SB_EMPTY_STRING)
+                app.display_about()
+                display_help(userPracticeMode)
+            # E[x]it application
+            elif userInput == "x":
+                cfile.stop_audio()
+                app.shut_down()
+                exit_app()
+            else:
+                print(SB_EMPTY_STRING)
+                coutput.print_err("Invalid response")
+
+            userInput = cinput.get_keypress(SB_PROMPT_SYMBOL).lower()
+
+
 ################################################################
 # Main Program
 ################################################################
 
 # Process command line arguments
 argParser = argparse.ArgumentParser()
-argParser.add_argument("runMode", type=str, choices=['study', 'practice', 'test', 'revise', 'scan'], help="is study, practice, test, or revise")
+argParser.add_argument("runMode", type=str, choices=['study', 'practice', 'test', 'revise', 'scan', 'listen'], help="is study, practice, test, revise, scan or listen")
 argParser.add_argument("contestList", type=str, help="is the word list identifier for the contest in YYYY[-language][-challenge] format")
 argParser.add_argument("mode", type=str, choices=['chapter', 'count', 'word', 'random'], nargs='?', default='count', help="is chapter, count, word or random")
 argParser.add_argument("selection", type=str, nargs='?', default='1', help="is the chapter number, word index range, word range or random sample size")
 argParser.add_argument("-s", "--silent", help="run in silent mode, without pronunciation", action="store_true")
 argParser.add_argument("-o", "--offline", help="run in offline mode", action="store_true")
+argParser.add_argument("-p", "--pack", help="build the audio pack of the word list before running", action="store_true")
 args = argParser.parse_args()
 
 # Setup Spelling Bee word list and run mode
-spellBee = SpellingBee(args.runMode, args.contestList, args.mode, args.selection, args.silent, args.offline)
+spellBee = SpellingBee(args.runMode, args.contestList, args.mode, args.selection, args.silent, args.offline, args.pack)
 spellBeeMode = args.runMode.lower()
 
 try:
@@ -1369,6 +1745,8 @@ try:
         run_test(spellBee, spellBeeMode)
     elif spellBeeMode == "scan":
         run_scan(spellBee)
+    elif spellBeeMode == "listen":
+        run_listen(spellBee)
 
     spellBee.shut_down()
     exit_app()
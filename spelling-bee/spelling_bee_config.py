@@ -0,0 +1,29 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+#--------------------------------------------------------------------------------------------------
+# File name   : spelling_bee_config.py
+# Description : Data directories and files shared by spelling_bee.py and its tools
+# Author      : Dito Manavalan
+# Date        : 2019/03/23
+#--------------------------------------------------------------------------------------------------
+
+################################################################
+# Application Directories
+################################################################
+
+SB_DATA_DIR = "data/"
+SB_DICT_OFFLINE_DIR = SB_DATA_DIR + 'dict/'
+
+# Override directories, searched in order for word definitions, clips and messages
+SB_DICT_OVERRIDE_DIR_LIST = [
+    SB_DICT_OFFLINE_DIR + 'override/test/',
+    SB_DICT_OFFLINE_DIR + 'override/spellpundit/',
+    SB_DATA_DIR + 'download/spellpundit/dict/'                  # Written by download_spellpundit_*.py
+]
+
+################################################################
+# Application Files
+################################################################
+
+SB_AUDIO_MANIFEST = SB_DICT_OFFLINE_DIR + "sb_audio_manifest.json"     # Maintained on download and by spellit_resample_audio.py
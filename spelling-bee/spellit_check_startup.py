@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################
+# Syntax :   python3 spellit_check_startup.py [contestList] [-b budget] [-r runs]
+# where      contestList is the word list to start spelling_bee.py with, in YYYY[-language][-challenge] format
+#            -b (--budget) is the time budget in milliseconds from launch to the first prompt
+#            -r (--runs) is the number of launches, of which the fastest is checked
+# Launches spelling_bee.py in offline and silent study mode under python3 -X importtime on a pseudo-terminal,
+# and times it to its first prompt. Fails if the time exceeds the budget, or if modules deferred to first use
+# (e.g. pygame, bs4, urllib3) are imported before the prompt.
+# Example:    python3 spellit_check_startup.py
+#             python3 spellit_check_startup.py 2016-scr-region-001-latin-basic -b 1500
+################################################################
+
+import sys
+import os
+import pty
+import time
+import select
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, "..")
+import common.rpimod.stdio.output as coutput
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+################################################################
+# Configuration variables
+################################################################
+
+APP_STARTUP_SCRIPT = "spelling_bee.py"
+APP_STARTUP_ARGS = ["chapter", "1", "--offline", "--silent"]
+APP_DEFAULT_LIST = "2016-scr-region-001-latin-basic"
+
+# Text of the first prompt, i.e. "Ready to study? Press any key when ready ..."
+APP_PROMPT_TEXT = b"Press any key when ready"
+
+# Budget for a Raspberry Pi 3, from launch to the first prompt
+APP_STARTUP_BUDGET_MS = 1500
+APP_STARTUP_TIMEOUT_SEC = 30
+APP_RUN_COUNT = 3
+
+# Modules deferred to first use, which are not to be imported before the first prompt in offline and silent mode
+APP_DEFERRED_MODULES = ['pygame', 'pydub', 'bs4', 'lxml', 'pkg_resources', 'urllib3', 'numpy']
+
+APP_SLOWEST_IMPORT_COUNT = 5
+
+
+################################################################
+# Application
+################################################################
+
+def parse_import_times(importTimeText):
+    # Returns the cumulative import time in microseconds of each top-level import, and the names of all modules imported
+    # Reference:
+    # https://docs.python.org/3/using/cmdline.html#cmdoption-X
+
+    importTimes = {}
+    moduleNames = set()
+
+    for importLine in importTimeText.splitlines():
+        importFields = importLine.split("|")
+        if not importLine.startswith("import time:") or len(importFields) < 3 or not importFields[1].strip().isdigit():
+            continue
+
+        moduleName = importFields[2].strip()
+        moduleNames.add(moduleName)
+        if not importFields[2].startswith("  "):
+            importTimes[moduleName] = int(importFields[1])
+
+    return [importTimes, moduleNames]
+
+
+def run_startup(contestList):
+    # Launches spelling_bee.py on a pseudo-terminal, as its prompts require one, and stops it at the first prompt
+    # Returns the time taken to the first prompt in seconds, None if not reached, and the import time trace
+
+    [masterFD, slaveFD] = pty.openpty()
+
+    with tempfile.TemporaryFile() as importTimeFile:
+        startTime = time.monotonic()
+        startupProcess = subprocess.Popen([sys.executable, "-X", "importtime", APP_STARTUP_SCRIPT, "study", contestList] + APP_STARTUP_ARGS,
+                                          stdin=slaveFD, stdout=slaveFD, stderr=importTimeFile)
+        os.close(slaveFD)
+
+        promptTime = None
+        outputData = b''
+
+        try:
+            while promptTime is None:
+                remainingTime = startTime + APP_STARTUP_TIMEOUT_SEC - time.monotonic()
+                if remainingTime <= 0 or not select.select([masterFD], [], [], remainingTime)[0]:
+                    break
+
+                # Reading fails once the process exits and the terminal closes
+                try:
+                    readData = os.read(masterFD, 4096)
+                except OSError:
+                    break
+                if len(readData) == 0:
+                    break
+
+                outputData += readData
+                if APP_PROMPT_TEXT in outputData:
+                    promptTime = time.monotonic() - startTime
+
+        finally:
+            startupProcess.kill()
+            startupProcess.wait()
+            os.close(masterFD)
+
+        coutput.print_debug(outputData.decode('utf-8', 'replace'))
+
+        importTimeFile.seek(0)
+        return [promptTime, importTimeFile.read().decode('utf-8', 'replace')]
+
+
+def check_startup(contestList, budgetMS, runCount):
+    # Returns True if the fastest launch reaches the first prompt within budget without importing deferred modules
+
+    promptTimes = []
+    importTimeText = ""
+
+    for runIndex in range(runCount):
+        [promptTime, runImportTimeText] = run_startup(contestList)
+        if promptTime is None:
+            coutput.print_err("Unable to reach the first prompt of {0} within {1}s".format(APP_STARTUP_SCRIPT, APP_STARTUP_TIMEOUT_SEC))
+            return False
+
+        print("Run #{0}: first prompt in {1:.0f}ms".format(runIndex + 1, promptTime * 1000))
+        if len(promptTimes) == 0 or promptTime < min(promptTimes):
+            importTimeText = runImportTimeText
+        promptTimes.append(promptTime)
+
+    [importTimes, moduleNames] = parse_import_times(importTimeText)
+
+    print("\nImports took {0:.0f}ms in total, of which the slowest were:".format(sum(importTimes.values()) / 1000))
+    for moduleName in sorted(importTimes, key=importTimes.get, reverse=True)[:APP_SLOWEST_IMPORT_COUNT]:
+        print("  {0:>6.0f}ms {1}".format(importTimes[moduleName] / 1000, moduleName))
+
+    checkPassed = True
+
+    deferredModules = sorted(moduleName for moduleName in APP_DEFERRED_MODULES if moduleName in moduleNames)
+    if len(deferredModules) > 0:
+        coutput.print_err("Modules deferred to first use were imported at startup: {0}".format(", ".join(deferredModules)))
+        checkPassed = False
+
+    startupTimeMS = min(promptTimes) * 1000
+    if startupTimeMS > budgetMS:
+        coutput.print_err("Startup took {0:.0f}ms, over the budget of {1}ms".format(startupTimeMS, budgetMS))
+        checkPassed = False
+    else:
+        print("\nStartup took {0:.0f}ms, within the budget of {1}ms".format(startupTimeMS, budgetMS))
+
+    return checkPassed
+
+
+################################################################
+# Main Program
+################################################################
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("contestList", type=str, nargs='?', default=APP_DEFAULT_LIST, help="is the word list identifier for the contest in YYYY[-language][-challenge] format")
+    argParser.add_argument("-b", "--budget", type=int, default=APP_STARTUP_BUDGET_MS, help="time budget in milliseconds from launch to the first prompt")
+    argParser.add_argument("-r", "--runs", type=int, default=APP_RUN_COUNT, help="number of launches, of which the fastest is checked")
+    args = argParser.parse_args()
+
+    if not check_startup(args.contestList, args.budget, args.runs):
+        sys.exit(1)
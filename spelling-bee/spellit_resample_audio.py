@@ -0,0 +1,218 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################
+# Syntax :   python3 spellit_resample_audio.py [-j processes] [-f] [-n]
+# where      -j (--processes) is the number of conversion processes, defaulting to the number of CPUs
+#            -f (--force) is to convert clips even if recorded as converted
+#            -n (--dry-run) is to list the clips to be converted without converting them
+# Converts the sb_*.wav clips in the offline and override directories to the playback sample rate and
+# channel count, and records them and the sb_*.mp3 clips in the audio manifest along with their speech
+# bounds and gain, which are applied at playback.
+# MP3 clips are not re-encoded, as each pass loses quality; they are decoded into the PCM clip cache on
+# first play instead.
+# Clips already converted, by manifest state or hash, are skipped.
+# Example:    python3 spellit_resample_audio.py
+#             python3 spellit_resample_audio.py -j 2 -n
+################################################################
+
+import sys
+import os
+import glob
+import time
+import wave
+import argparse
+import subprocess
+import multiprocessing
+
+sys.path.insert(0, "..")
+import common.rpimod.stdio.output as coutput
+import common.rpimod.stdio.audioplayer as caudio
+import common.rpimod.stdio.audiomanifest as cmanifest
+import common.rpimod.stdio.audiolevel as clevel
+import spelling_bee_config as sbconfig
+
+# Set to True to turn debug messages on
+#APP_DEBUG_MODE_ENABLED = True
+APP_DEBUG_MODE_ENABLED = False
+
+################################################################
+# Configuration variables
+################################################################
+
+APP_CLIP_DIR_LIST = [sbconfig.SB_DICT_OFFLINE_DIR] + sbconfig.SB_DICT_OVERRIDE_DIR_LIST
+APP_CLIP_PATTERN_LIST = ["sb_*.wav", "sb_*.mp3"]
+
+APP_AUDIO_MANIFEST = sbconfig.SB_AUDIO_MANIFEST
+
+# Target format, matching the playback format so that clips are played without resampling
+APP_TARGET_SAMPLE_RATE = caudio.AUDIO_SAMPLE_RATE
+APP_TARGET_CHANNELS = caudio.AUDIO_CHANNELS
+
+# Encoder settings by container, of the containers converted in place, i.e. those not lossy to re-encode
+APP_ENCODER_ARGS = {
+    'wav': ["-c:a", "pcm_s16le"]
+}
+
+# Number of clips sent to a worker at a time, and number of results between manifest saves
+APP_CHUNK_SIZE = 8
+APP_SAVE_INTERVAL = 100
+
+
+################################################################
+# Conversion Worker
+################################################################
+
+def get_clip_format(fileName):
+    return os.path.splitext(fileName)[1].lower().lstrip('.')
+
+
+def probe_clip(fileName):
+    # Returns the (sample rate, channels) of a clip, reading WAV headers in process
+
+    if get_clip_format(fileName) == 'wav':
+        try:
+            with wave.open(fileName, 'rb') as wavFile:
+                if wavFile.getsampwidth() == caudio.AUDIO_SAMPLE_WIDTH:
+                    return (wavFile.getframerate(), wavFile.getnchannels())
+                return (None, None)
+        except (wave.Error, EOFError):
+            return (None, None)
+
+    probeCommand = ["ffprobe", "-v", "quiet", "-select_streams", "a:0", "-show_entries", "stream=sample_rate,channels", "-of", "csv=p=0", fileName]
+    probeResult = subprocess.run(probeCommand, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, universal_newlines=True)
+    try:
+        [sampleRate, channels] = probeResult.stdout.strip().split(',')[:2]
+        return (int(sampleRate), int(channels))
+    except ValueError:
+        return (None, None)
+
+
+def convert_clip(fileName):
+    # Converts a clip in place, writing to a temporary file that replaces the clip only once complete
+
+    clipFormat = get_clip_format(fileName)
+    tempFileName = fileName + ".tmp"
+
+    convertCommand = ["ffmpeg", "-y", "-loglevel", "quiet", "-i", fileName,
+                      "-ac", str(APP_TARGET_CHANNELS), "-ar", str(APP_TARGET_SAMPLE_RATE)] + APP_ENCODER_ARGS[clipFormat] + ["-f", clipFormat, tempFileName]
+
+    try:
+        subprocess.run(convertCommand, stdin=subprocess.DEVNULL, check=True)
+        os.replace(tempFileName, fileName)
+    finally:
+        if os.path.isfile(tempFileName):
+            os.remove(tempFileName)
+
+
+def is_convertible(fileName):
+    return get_clip_format(fileName) in APP_ENCODER_ARGS
+
+
+def resample_clip(clipTask):
+    # Accepts (file name, recorded hash, force flag) as input
+    # Returns (file name, status, manifest properties), where status is unchanged, converted, verified, analysed or failed
+
+    [fileName, recordedHash, forceFlag] = clipTask
+
+    try:
+        if not is_convertible(fileName):
+            clipStatus = "analysed"
+        elif cmanifest.hash_file(fileName) == recordedHash and not forceFlag:
+            clipStatus = "unchanged"
+        else:
+            if probe_clip(fileName) == (APP_TARGET_SAMPLE_RATE, APP_TARGET_CHANNELS) and not forceFlag:
+                clipStatus = "verified"
+            else:
+                convert_clip(fileName)
+                clipStatus = "converted"
+
+        clipProperties = cmanifest.read_clip_properties(fileName)
+        if is_convertible(fileName):
+            clipProperties.update({'sample_rate': APP_TARGET_SAMPLE_RATE, 'channels': APP_TARGET_CHANNELS})
+        else:
+            [clipProperties['sample_rate'], clipProperties['channels']] = probe_clip(fileName)
+        clipProperties.update(clevel.analyse_pcm(caudio.decode_file(fileName), APP_TARGET_SAMPLE_RATE, APP_TARGET_CHANNELS))
+        return (fileName, clipStatus, clipProperties)
+
+    except (OSError, subprocess.CalledProcessError) as e:
+        return (fileName, "failed", {'error': str(e)})
+
+
+################################################################
+# Application
+################################################################
+
+def find_clips(dirList):
+    clipFileNames = []
+    for clipDir in dirList:
+        for clipPattern in APP_CLIP_PATTERN_LIST:
+            clipFileNames.extend(sorted(glob.glob(os.path.join(clipDir, clipPattern))))
+    return clipFileNames
+
+
+def is_resampled(audioManifest, fileName):
+    # Returns True if the clip is unchanged since it was last converted or verified, if convertible, and analysed
+
+    clipEntry = audioManifest.get_entry(fileName)
+    return (audioManifest.is_current(fileName)
+            and 'gain' in clipEntry
+            and (not is_convertible(fileName) or (clipEntry.get('sample_rate') == APP_TARGET_SAMPLE_RATE
+                                                  and clipEntry.get('channels') == APP_TARGET_CHANNELS)))
+
+
+def run_resample(processCount, forceFlag, dryRunFlag):
+
+    audioManifest = cmanifest.AudioManifest(APP_AUDIO_MANIFEST)
+    clipFileNames = find_clips(APP_CLIP_DIR_LIST)
+
+    clipTasks = []
+    for fileName in clipFileNames:
+        if forceFlag or not is_resampled(audioManifest, fileName):
+            clipEntry = audioManifest.get_entry(fileName) or {}
+            clipTasks.append((fileName, clipEntry.get('sha1'), forceFlag))
+
+    print("Found {0} clips, {1} to be checked".format(len(clipFileNames), len(clipTasks)))
+
+    if dryRunFlag:
+        for clipTask in clipTasks:
+            print(clipTask[0])
+        return
+
+    statusCounts = {}
+    startTime = time.time()
+
+    with multiprocessing.Pool(processCount) as workerPool:
+        for resultIndex, [fileName, clipStatus, clipProperties] in enumerate(workerPool.imap_unordered(resample_clip, clipTasks, chunksize=APP_CHUNK_SIZE), 1):
+            statusCounts[clipStatus] = statusCounts.get(clipStatus, 0) + 1
+
+            if clipStatus == "failed":
+                coutput.print_err("Unable to convert {0} :: {1}".format(fileName, clipProperties['error']))
+            else:
+                coutput.print_debug("{0} :: {1}".format(fileName, clipStatus))
+                audioManifest.set_entry(fileName, clipProperties)
+
+            if resultIndex % APP_SAVE_INTERVAL == 0:
+                print("Processed {0} of {1} clips".format(resultIndex, len(clipTasks)))
+                audioManifest.save()
+
+    audioManifest.save()
+
+    print("Processed {0} clips in {1:.1f}s :: {2}".format(len(clipTasks), time.time() - startTime,
+          ", ".join("{0} {1}".format(count, status) for [status, count] in sorted(statusCounts.items()))))
+
+
+################################################################
+# Main Program
+################################################################
+
+if __name__ == '__main__':
+
+    # Process command line arguments
+    argParser = argparse.ArgumentParser()
+    argParser.add_argument("-j", "--processes", type=int, default=os.cpu_count(), help="number of conversion processes")
+    argParser.add_argument("-f", "--force", help="convert clips even if recorded as converted", action="store_true")
+    argParser.add_argument("-n", "--dry-run", help="list the clips to be converted without converting them", action="store_true")
+    args = argParser.parse_args()
+
+    run_resample(args.processes, args.force, args.dry_run)